@@ -0,0 +1,147 @@
+# ------------------------------------------------------
+# Respuestas precalculadas para las preguntas sugeridas
+# ------------------------------------------------------
+# Las listas hayek_questions / hazlitt_questions / mises_questions son fijas y
+# los botones de sugerencias son la entrada más usada. Con temperature 0.0 la
+# respuesta a una sugerencia en una sesión nueva es prácticamente la misma para
+# todos, así que warm_answer_cache.py la calcula una vez por base de
+# conocimientos (respuesta + documentos recuperados) y la guarda aquí.
+#
+# Cada archivo answer_cache/<knowledge_base_id>.json lleva una versión derivada
+# de la KB, el modelo, sus parámetros, el system prompt, los resultados por
+# búsqueda y el reranking; si la página cambia cualquiera de ellos, la versión
+# ya no coincide y las respuestas no se sirven hasta volver a correr el job.
+
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+import time
+
+from langchain_core.documents import Document
+
+from metrics import counters
+
+
+ANSWER_CACHE_DIR = os.environ.get("CHH_ANSWER_CACHE_DIR", "answer_cache")
+
+# Simular el streaming al servir una respuesta precalculada: segundos por palabra
+# (0 = mostrarla de una vez) y tope de toda la respuesta, para que una respuesta
+# larga de la cache no tarde lo mismo que generarla
+ANSWER_CACHE_STREAM_DELAY = float(os.environ.get("CHH_ANSWER_CACHE_STREAM_DELAY", "0"))
+ANSWER_CACHE_STREAM_MAX_SECONDS = float(os.environ.get("CHH_ANSWER_CACHE_STREAM_MAX_SECONDS", "1.0"))
+
+# Cambia si cambia el formato del archivo o las etapas fijas entre el retriever y el prompt
+ANSWER_CACHE_FORMAT = 2
+
+_WHITESPACE_RE = re.compile(r"\s+")
+
+logger = logging.getLogger(__name__)
+
+_lock = threading.Lock()
+_loaded = {}
+_metrics = counters("answer_cache", "hits", "misses", "stale")
+
+
+def normalize_question(question: str) -> str:
+    """Llave de búsqueda: minúsculas y espacios colapsados."""
+    return _WHITESPACE_RE.sub(" ", question).strip().casefold()
+
+
+def answer_cache_version(knowledge_base_id: str, model_id: str, model_kwargs: dict, system_prompt: str,
+                         number_of_results: int = 20, per_author_quota: int = None,
+                         rerank_settings: dict = None) -> str:
+    """
+    Versión de las respuestas: cambia con la KB, el modelo, sus parámetros, el
+    prompt, los resultados por búsqueda (y la cuota por autor) o el reranking.
+    """
+    payload = json.dumps(
+        [ANSWER_CACHE_FORMAT, knowledge_base_id, model_id, model_kwargs, system_prompt, number_of_results,
+         per_author_quota, rerank_settings],
+        sort_keys=True, ensure_ascii=False,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+
+
+def cache_path(knowledge_base_id: str, cache_dir: str = None) -> str:
+    return os.path.join(cache_dir or ANSWER_CACHE_DIR, f"{knowledge_base_id}.json")
+
+
+def load_answer_cache(knowledge_base_id: str, cache_dir: str = None) -> dict:
+    """Contenido del archivo de la KB; se relee solo si el archivo cambió en disco."""
+    path = cache_path(knowledge_base_id, cache_dir)
+    try:
+        mtime = os.path.getmtime(path)
+    except OSError:
+        return {}
+
+    with _lock:
+        loaded = _loaded.get(path)
+        if loaded and loaded[0] == mtime:
+            return loaded[1]
+
+    with open(path, encoding="utf-8") as file:
+        data = json.load(file)
+    with _lock:
+        _loaded[path] = (mtime, data)
+    return data
+
+
+def save_answer_cache(knowledge_base_id: str, version: str, answers: dict, cache_dir: str = None, **meta):
+    """Escribe el archivo completo de la KB de forma atómica (tmp + replace)."""
+    path = cache_path(knowledge_base_id, cache_dir)
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    data = {
+        "format": ANSWER_CACHE_FORMAT,
+        "version": version,
+        "knowledge_base_id": knowledge_base_id,
+        "created": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        **meta,
+        "answers": answers,
+    }
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as file:
+        json.dump(data, file, ensure_ascii=False, indent=1, default=str)
+    os.replace(tmp_path, path)
+    return path
+
+
+def lookup_answer(knowledge_base_id: str, question: str, version: str):
+    """Entrada {"question", "answer", "context"} si hay respuesta vigente para la pregunta."""
+    data = load_answer_cache(knowledge_base_id)
+    if data and data.get("version") != version:
+        _metrics.add(stale=1)
+        logger.info("Respuestas precalculadas de %s desactualizadas (%s != %s)",
+                    knowledge_base_id, data.get("version"), version)
+        return None
+
+    entry = data.get("answers", {}).get(normalize_question(question))
+    _metrics.add(**{"hits" if entry else "misses": 1})
+    return entry
+
+
+# ------------------------------------------------------
+# Documentos y respuesta
+
+def serialize_documents(documents) -> list:
+    return [{"page_content": doc.page_content, "metadata": doc.metadata} for doc in documents]
+
+
+def cached_documents(entry) -> list:
+    """Documentos recuperados guardados -> Document, igual que la rama "context" de la cadena."""
+    return [Document(page_content=doc["page_content"], metadata=doc["metadata"]) for doc in entry["context"]]
+
+
+def replay_answer(text: str, delay: float = None):
+    """Entrega la respuesta por palabras, como el stream del modelo (en a lo sumo ANSWER_CACHE_STREAM_MAX_SECONDS)."""
+    delay = ANSWER_CACHE_STREAM_DELAY if delay is None else delay
+    if delay <= 0:
+        yield text
+        return
+    pieces = re.findall(r"\S+\s*|\s+", text)
+    delay = min(delay, ANSWER_CACHE_STREAM_MAX_SECONDS / max(len(pieces), 1))
+    for piece in pieces:
+        yield piece
+        time.sleep(delay)
@@ -0,0 +1,167 @@
+# ------------------------------------------------------
+# Registro de recursos AWS / LangChain compartidos por proceso
+# ------------------------------------------------------
+# Streamlit vuelve a ejecutar la página completa en cada interacción, pero los
+# módulos importados se quedan en memoria durante toda la vida del proceso.
+# Aquí se construyen una sola vez los clientes de Bedrock y DynamoDB, los
+# retrievers de las bases de conocimiento, los modelos y las cadenas, y se
+# reutilizan entre reruns y entre sesiones de distintos usuarios.
+
+import json
+import logging
+import os
+import threading
+
+import boto3
+from botocore.config import Config
+
+from lazy_imports import lazy_module
+from metrics import counters, register_gauge
+
+# langchain_aws tarda ~1 s en importarse y solo hace falta al construir el primer
+# retriever / modelo / embeddings, no para dibujar la página (ver lazy_imports.py)
+langchain_aws = lazy_module("langchain_aws")
+
+
+REGION_NAME = "us-east-1"
+
+# Permite apuntar a DynamoDB Local (p. ej. http://localhost:8000) para pruebas y benchmarks
+DYNAMODB_ENDPOINT_URL = os.environ.get("DYNAMODB_ENDPOINT_URL")
+
+logger = logging.getLogger(__name__)
+
+_lock = threading.RLock()
+_registry = {}
+# Fábricas que reemplazan a las de AWS por tipo de recurso (ver override_resource)
+_overrides = {}
+
+
+def _freeze(value):
+    """Convierte dicts/listas de configuración en una llave hashable y estable."""
+    if isinstance(value, (str, int, float, bool)) or value is None:
+        return value
+    return json.dumps(value, sort_keys=True, default=str)
+
+
+def get_or_create(kind: str, key, factory):
+    """Devuelve el objeto registrado para (kind, key) o lo construye con factory()."""
+    full_key = (kind, _freeze(key))
+    # Aciertos / construcciones por tipo (registry.<kind>): confirman en
+    # producción que los clientes y cadenas se reutilizan entre reruns
+    stats = counters(f"registry.{kind}", "hits", "misses")
+    with _lock:
+        if full_key in _registry:
+            stats.add(hits=1)
+            return _registry[full_key]
+
+        stats.add(misses=1)
+        logger.info("Construyendo recurso compartido %s %s", kind, full_key[1])
+        # El lock es reentrante: una cadena puede pedir su modelo y retriever aquí dentro
+        override = _overrides.get(kind)
+        obj = override(key) if override else factory()
+        _registry[full_key] = obj
+        return obj
+
+
+def _registry_gauge() -> dict:
+    with _lock:
+        return {"objects": len(_registry)}
+
+
+register_gauge("registry", _registry_gauge)
+
+
+def override_resource(kind: str, factory):
+    """
+    Construye los recursos de kind con factory(key) en lugar de la fábrica de AWS
+    (p. ej. "chat_model" -> modelo falso en los benchmarks sin red, ver chhbench);
+    factory=None quita el reemplazo. Los ya construidos se descartan.
+    """
+    with _lock:
+        if factory is None:
+            _overrides.pop(kind, None)
+        else:
+            _overrides[kind] = factory
+        clear_registry(kind)
+
+
+def clear_registry(kind: str = None):
+    """Elimina los recursos registrados (todos o solo los de un tipo)."""
+    with _lock:
+        for full_key in list(_registry):
+            if kind is None or full_key[0] == kind:
+                del _registry[full_key]
+
+
+# ------------------------------------------------------
+# Amazon Bedrock / DynamoDB
+
+def get_bedrock_runtime(region_name: str = REGION_NAME):
+    return get_or_create(
+        "bedrock_runtime", region_name,
+        lambda: boto3.client(service_name="bedrock-runtime", region_name=region_name),
+    )
+
+
+def get_s3_client(region_name: str = REGION_NAME):
+    # Firma s3v4 con la región del bucket: las URL prefirmadas se generan localmente
+    return get_or_create(
+        "s3_client", region_name,
+        lambda: boto3.client(
+            "s3", region_name=region_name,
+            config=Config(signature_version="s3v4", max_pool_connections=32),
+        ),
+    )
+
+
+def get_dynamodb_resource(region_name: str = REGION_NAME):
+    # Las operaciones de Table (get_item, put_item, query...) delegan en el
+    # cliente de botocore, que es thread-safe; el recurso solo se comparte para lectura.
+    return get_or_create(
+        "dynamodb_resource", (region_name, DYNAMODB_ENDPOINT_URL),
+        lambda: boto3.resource("dynamodb", region_name=region_name, endpoint_url=DYNAMODB_ENDPOINT_URL),
+    )
+
+
+def get_dynamodb_table(table_name: str, region_name: str = REGION_NAME):
+    return get_or_create(
+        "dynamodb_table", (region_name, table_name),
+        lambda: get_dynamodb_resource(region_name).Table(table_name),
+    )
+
+
+# ------------------------------------------------------
+# LangChain
+
+def get_retriever(knowledge_base_id: str, number_of_results: int = 20):
+    """Retriever de Knowledge Bases for Amazon Bedrock, uno por (KB, numberOfResults)."""
+    return get_or_create(
+        "kb_retriever", (knowledge_base_id, number_of_results),
+        lambda: langchain_aws.AmazonKnowledgeBasesRetriever(
+            knowledge_base_id=knowledge_base_id,
+            retrieval_config={"vectorSearchConfiguration": {"numberOfResults": number_of_results}},
+        ),
+    )
+
+
+def get_chat_model(model_id: str, model_kwargs: dict, region_name: str = REGION_NAME):
+    return get_or_create(
+        "chat_model", (region_name, model_id, model_kwargs),
+        lambda: langchain_aws.ChatBedrock(
+            client=get_bedrock_runtime(region_name),
+            model_id=model_id,
+            model_kwargs=model_kwargs,
+        ),
+    )
+
+
+def get_embeddings(model_id: str, region_name: str = REGION_NAME):
+    return get_or_create(
+        "embeddings", (region_name, model_id),
+        lambda: langchain_aws.BedrockEmbeddings(client=get_bedrock_runtime(region_name), model_id=model_id),
+    )
+
+
+def get_chain(key, builder):
+    """Cadena RAG registrada bajo key (autor, KB, modelo y su configuración)."""
+    return get_or_create("chain", key, builder)
@@ -0,0 +1,101 @@
+# ------------------------------------------------------
+# Benchmark de punta a punta sin AWS
+# ------------------------------------------------------
+# Recorre la app como lo haría cada usuario, sin navegador y sin red (ver
+# chhbench/): login en app_autores2.py, una sugerencia y --turns preguntas
+# libres con todos los autores, y lo mismo en cada página de autor. Bedrock
+# es un modelo falso que responde por stream con --ttft-ms y
+# --tokens-per-second; cada KB es un corpus local con --retrieval-ms de
+# latencia; DynamoDB es moto (o DynamoDB Local con DYNAMODB_ENDPOINT_URL).
+#
+# Reporta por página p50/p95/p99 de cada etapa de la respuesta (retrieval,
+# primer token, generación, total, espera en cola), de la duración del rerun
+# de cada paso, llamadas a DynamoDB y bytes enviados al navegador por paso.
+#
+#   python bench_e2e.py --sessions 5 --turns 2
+#   python bench_e2e.py --sessions 20 --ttft-ms 800 --tokens-per-second 40 --json bench_e2e.json
+#   python bench_e2e.py --corpus hayek=rerank_hayek.jsonl --pages hayek
+
+import argparse
+import json
+import os
+import random
+import warnings
+
+# Antes de importar streamlit: sin los avisos de cada rerun en la salida del benchmark
+os.environ.setdefault("STREAMLIT_LOGGER_LEVEL", "error")
+
+from chhbench.backends import BENCH_PASSWORD, StandInSettings, dynamodb_backend, install_stand_ins, users_file
+from chhbench.questions import free_questions
+from chhbench.report import print_summary, summarize
+from chhbench.session import BenchSession, install_counters
+from chhcore.registry import AUTHORS
+
+
+def session_questions(author, rng, count: int) -> list:
+    """Preguntas libres de la sesión, sin repetir hasta agotar las de la página (ver chhbench/questions.py)."""
+    questions = list(free_questions(author))
+    rng.shuffle(questions)
+    return [questions[i % len(questions)] for i in range(count)]
+
+
+def run_session(index: int, pages: list, turns: int) -> BenchSession:
+    rng = random.Random(index)
+    session = BenchSession(f"bench-{index}")
+    session.open()
+    session.login(f"bench-{index}@ufm.edu", BENCH_PASSWORD)
+    for author in pages:
+        if author.page != session.page:
+            session.switch_page(author)
+        session.click_suggestion(author, rng.randrange(4))
+        for question in session_questions(author, rng, turns):
+            session.ask(question)
+    return session
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de punta a punta con Bedrock, KB y DynamoDB locales")
+    parser.add_argument("--sessions", type=int, default=5, help="Usuarios que recorren la app, uno tras otro")
+    parser.add_argument("--turns", type=int, default=2, help="Preguntas libres por página después de la sugerencia")
+    parser.add_argument("--pages", nargs="+", choices=list(AUTHORS), default=list(AUTHORS))
+    parser.add_argument("--ttft-ms", type=float, default=400.0)
+    parser.add_argument("--tokens-per-second", type=float, default=80.0)
+    parser.add_argument("--answer-tokens", type=int, default=250)
+    parser.add_argument("--retrieval-ms", type=float, default=250.0, help="Latencia de la API Retrieve de cada KB")
+    parser.add_argument("--corpus", action="append", default=[], metavar="AUTOR=ARCHIVO",
+                        help="Fragmentos guardados con bench_rerank.py --collect (si no, corpus sintético)")
+    parser.add_argument("--json", metavar="ARCHIVO", help="Guarda los pasos y el resumen")
+    args = parser.parse_args()
+
+    settings = StandInSettings(
+        ttft_ms=args.ttft_ms, tokens_per_second=args.tokens_per_second, answer_tokens=args.answer_tokens,
+        retrieval_ms=args.retrieval_ms, corpus_files=dict(item.split("=", 1) for item in args.corpus),
+    )
+    # app_autores2.py (todos los autores) va primero: es la página a la que entra el login
+    pages = sorted((AUTHORS[key] for key in args.pages), key=lambda author: author.key != "todos")
+    warnings.filterwarnings("ignore", category=DeprecationWarning)
+
+    # Antes del backend: install_stand_ins() descarta los recursos ya construidos
+    install_stand_ins(settings)
+    with dynamodb_backend(), users_file(f"bench-{i}@ufm.edu" for i in range(args.sessions)):
+        install_counters()
+        steps = []
+        for index in range(args.sessions):
+            steps.extend(run_session(index, pages, args.turns).steps)
+
+    print(f"{args.sessions} sesiones, {args.turns} preguntas libres por página, TTFT={args.ttft_ms:.0f} ms, "
+          f"{args.tokens_per_second:.0f} tokens/s, retrieval={args.retrieval_ms:.0f} ms")
+    summaries = {}
+    for page in dict.fromkeys(step["page"] for step in steps):
+        print(f"\n== {page}")
+        summaries[page] = summarize([step for step in steps if step["page"] == page])
+        print_summary(summaries[page])
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as file:
+            json.dump({"settings": vars(args), "summary": summaries, "steps": steps},
+                      file, ensure_ascii=False, indent=2, default=str)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+# ------------------------------------------------------
+# Benchmark: persistencia de un turno (pregunta + respuesta) en DynamoDB
+# ------------------------------------------------------
+# Compara el esquema original (get_item + put_item del History completo, dos
+# veces por turno) con commit_turn() sobre la tabla de un item por mensaje.
+#
+# Por defecto usa moto como DynamoDB local en memoria; con DYNAMODB_ENDPOINT_URL
+# definido (p. ej. http://localhost:8000) usa DynamoDB Local.
+#
+#   python bench_history_writes.py --turns 50
+
+import argparse
+import contextlib
+import os
+import statistics
+import time
+import uuid
+
+from botocore.exceptions import ClientError
+
+from aws_resources import get_dynamodb_resource
+from chat_history_store import (
+    LEGACY_TABLE_NAME,
+    MESSAGE_TABLE_NAME,
+    AppendOnlyDynamoDBChatMessageHistory,
+    create_message_table,
+)
+
+
+def fake_turn(turn: int, citations: int = 20):
+    question = {"data": {"content": f"Pregunta {turn}", "type": "human", "id": str(uuid.uuid4())}, "type": "human"}
+    answer = {
+        "data": {
+            "content": "Respuesta " * 200,
+            "type": "ai",
+            "id": str(uuid.uuid4()),
+            "citations": [
+                {"page_content": "Fragmento de la base de conocimientos " * 30,
+                 "metadata": {"source": f"libro-{i}.pdf", "score": "0.5"}}
+                for i in range(citations)
+            ],
+        },
+        "type": "ai",
+    }
+    return question, answer
+
+
+class LegacyHistory:
+    """Réplica de CustomDynamoDBChatMessageHistory (lee y reescribe el item completo)."""
+
+    def __init__(self, table, session_id):
+        self.table = table
+        self.session_id = session_id
+
+    def get_history(self):
+        response = self.table.get_item(Key={"SessionId": self.session_id})
+        return response.get("Item", {"SessionId": self.session_id, "History": []})
+
+    def update_history(self, new_message):
+        current_history = self.get_history()
+        current_history["History"].append(new_message)
+        self.table.put_item(Item=current_history)
+
+
+def count_calls(client):
+    """Cuenta las llamadas a la API de DynamoDB hechas con client."""
+    counter = {"calls": 0}
+
+    def _count(**kwargs):
+        counter["calls"] += 1
+
+    client.meta.events.register("before-call.dynamodb.*", _count)
+    return counter
+
+
+def run(label, turns, persist, counter):
+    latencies = []
+    start_calls = counter["calls"]
+    for turn in range(turns):
+        human, ai = fake_turn(turn)
+        start = time.perf_counter()
+        try:
+            persist(human, ai)
+        except ClientError as error:
+            # El esquema original termina chocando con el límite de 400 KB por item
+            print(f"{label:<14} falló en el turno {turn + 1}: {error.response['Error']['Message']}")
+            break
+        latencies.append((time.perf_counter() - start) * 1000)
+    calls = (counter["calls"] - start_calls) / max(len(latencies), 1)
+    print(f"{label:<14} p50={statistics.median(latencies):7.2f} ms  "
+          f"max={max(latencies):7.2f} ms  llamadas/turno={calls:.1f}")
+    return statistics.median(latencies)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Latencia por turno: read-modify-write vs commit_turn")
+    parser.add_argument("--turns", type=int, default=30)
+    args = parser.parse_args()
+
+    if os.environ.get("DYNAMODB_ENDPOINT_URL"):
+        backend = contextlib.nullcontext()
+    else:
+        from moto import mock_aws
+        os.environ.setdefault("AWS_ACCESS_KEY_ID", "testing")
+        os.environ.setdefault("AWS_SECRET_ACCESS_KEY", "testing")
+        backend = mock_aws()
+
+    with backend:
+        dynamodb = get_dynamodb_resource()
+        suffix = uuid.uuid4().hex[:8]
+        legacy_table = dynamodb.create_table(
+            TableName=f"{LEGACY_TABLE_NAME}-bench-{suffix}",
+            KeySchema=[{"AttributeName": "SessionId", "KeyType": "HASH"}],
+            AttributeDefinitions=[{"AttributeName": "SessionId", "AttributeType": "S"}],
+            BillingMode="PAY_PER_REQUEST",
+        )
+        legacy_table.wait_until_exists()
+        message_table = create_message_table(dynamodb, f"{MESSAGE_TABLE_NAME}-bench-{suffix}")
+        counter = count_calls(dynamodb.meta.client)
+
+        legacy = LegacyHistory(legacy_table, "bench-legacy")
+
+        def persist_legacy(human, ai):
+            legacy.update_history(human)
+            legacy.update_history(ai)
+
+        store = AppendOnlyDynamoDBChatMessageHistory(message_table.name, "bench-append", legacy_table_name=None)
+        store.get_history()
+
+        legacy_p50 = run("legacy", args.turns, persist_legacy, counter)
+        commit_p50 = run("commit_turn", args.turns, store.commit_turn, counter)
+        print(f"reducción p50: {100 * (1 - commit_p50 / legacy_p50):.0f}%")
+
+        legacy_table.delete()
+        message_table.delete()
+
+
+if __name__ == "__main__":
+    main()
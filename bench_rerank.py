@@ -0,0 +1,152 @@
+# ------------------------------------------------------
+# Benchmark offline del reranking de fragmentos
+# ------------------------------------------------------
+# Usa como conjunto fijo de preguntas las sugerencias de cada página. Primero se
+# guardan una vez los 20 fragmentos que devuelve la KB para cada pregunta
+# (requiere credenciales de AWS); después el benchmark corre sin red sobre ese
+# archivo y compara los métodos de rerank.py: tokens de contexto antes/después,
+# latencia del reranking y coincidencia de los fragmentos conservados con los
+# del cross-encoder (o BM25 si no está instalado), después de quitar duplicados.
+#
+# Con --answers mide también la calidad de las respuestas (requiere Bedrock): el
+# modelo de la página responde cada pregunta con todos los fragmentos y con los
+# que conserva cada método, y el mismo modelo puntúa de 1 a 5 cuánto de la
+# respuesta completa conserva la recortada.
+#
+#   python bench_rerank.py --page hayek --collect rerank_hayek.jsonl
+#   python bench_rerank.py --page hayek --input rerank_hayek.jsonl
+#   python bench_rerank.py --page hayek --input rerank_hayek.jsonl --top-k 6 --token-budget 2000
+#   python bench_rerank.py --page hayek --input rerank_hayek.jsonl --answers
+
+import argparse
+import json
+import re
+import statistics
+
+from langchain_core.documents import Document
+from langchain_core.output_parsers import StrOutputParser
+from langchain_core.prompts import ChatPromptTemplate
+
+from answer_cache import serialize_documents
+from aws_resources import get_chat_model
+from dedup import deduplicate_documents
+from rerank import RERANK_SETTING_DEFAULTS, cross_encoder_available, rerank_documents
+from chhcore import AUTHORS, AuthorConfig, get_author_retriever
+from chhcore.pipeline import create_prompt_template
+
+
+JUDGE_PROMPT = ChatPromptTemplate.from_messages([("human", """\
+Pregunta: {question}
+
+Respuesta de referencia:
+{reference}
+
+Respuesta a evaluar:
+{candidate}
+
+Del 1 al 5, ¿cuánto del contenido de la respuesta de referencia conserva la respuesta a evaluar, \
+sin agregar errores? 5: todo; 1: casi nada. Responde solo con el número.""")])
+
+
+def collect(author: AuthorConfig, path: str):
+    retriever = get_author_retriever(author, cached=False)
+    with open(path, "w", encoding="utf-8") as file:
+        for question in author.questions:
+            documents = retriever.invoke(question)
+            file.write(json.dumps({"question": question, "documents": serialize_documents(documents)},
+                                  ensure_ascii=False, default=str) + "\n")
+            print(f"{len(documents):3d} fragmentos  {question}")
+
+
+def load(path: str):
+    with open(path, encoding="utf-8") as file:
+        for line in file:
+            row = json.loads(line)
+            yield row["question"], [Document(page_content=d["page_content"], metadata=d["metadata"]) for d in row["documents"]]
+
+
+def percentile(values, p):
+    values = sorted(values)
+    return values[min(int(len(values) * p), len(values) - 1)]
+
+
+class AnswerJudge:
+    """Responde con el prompt y el modelo de la página y puntúa respuestas recortadas contra la completa."""
+
+    def __init__(self, author: AuthorConfig):
+        model = get_chat_model(author.model_id, author.model_kwargs)
+        self._history_key = author.history_key
+        self._answer = create_prompt_template(author) | model | StrOutputParser()
+        self._judge = JUDGE_PROMPT | model | StrOutputParser()
+
+    def answer(self, question: str, documents: list) -> str:
+        return self._answer.invoke({"question": question, "context": documents, self._history_key: []})
+
+    def score(self, question: str, reference: str, candidate: str) -> int:
+        verdict = self._judge.invoke({"question": question, "reference": reference, "candidate": candidate})
+        match = re.search(r"[1-5]", verdict)
+        return int(match.group()) if match else 1
+
+
+def run(path: str, top_k: int, token_budget: int, judge: AnswerJudge = None):
+    methods = ["none", "bm25"] + (["cross-encoder"] if cross_encoder_available() else [])
+    reference = methods[-1]
+    rows = list(load(path))
+    kept = {method: [] for method in methods}
+    reports = {method: [] for method in methods}
+    quality = {method: [] for method in methods}
+
+    for question, documents in rows:
+        # Mismo orden que la cadena: primero se quitan los casi duplicados
+        documents, _ = deduplicate_documents(documents)
+        full_answer = judge.answer(question, documents) if judge else None
+        for method in methods:
+            # Copias: rerank_documents agrega rerank_score a la metadata
+            docs = [Document(page_content=d.page_content, metadata=dict(d.metadata)) for d in documents]
+            result, report = rerank_documents(question, docs, method=method, top_k=top_k, token_budget=token_budget)
+            kept[method].append({d.page_content for d in result})
+            reports[method].append(report)
+            if judge:
+                quality[method].append(judge.score(question, full_answer, judge.answer(question, result)))
+
+    print(f"{len(rows)} preguntas, top_k={top_k}, token_budget={token_budget}, referencia={reference}")
+    for method in methods:
+        r = reports[method]
+        before = sum(x["tokens_before"] for x in r)
+        after = sum(x["tokens_after"] for x in r)
+        overlap = statistics.mean(
+            len(a & b) / len(b) if b else 1.0 for a, b in zip(kept[method], kept[reference])
+        )
+        print(f"{method:<14} tokens/pregunta {before / len(r):7.0f} -> {after / len(r):6.0f} "
+              f"({100 * (1 - after / before if before else 0):3.0f}% menos)  "
+              f"p50={percentile([x['ms'] for x in r], 0.5):7.1f} ms  p95={percentile([x['ms'] for x in r], 0.95):7.1f} ms  "
+              f"coincidencia con {reference}={overlap:.2f}"
+              + (f"  calidad={statistics.mean(quality[method]):.2f}/5" if judge else ""))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark offline del reranking de fragmentos")
+    parser.add_argument("--page", choices=sorted(AUTHORS), required=True)
+    parser.add_argument("--collect", metavar="ARCHIVO", help="Guarda los fragmentos de la KB para cada pregunta")
+    parser.add_argument("--input", metavar="ARCHIVO", help="Fragmentos guardados con --collect")
+    parser.add_argument("--top-k", type=int)
+    parser.add_argument("--token-budget", type=int)
+    parser.add_argument("--answers", action="store_true",
+                        help="Puntúa las respuestas con cada método contra la respuesta con todos los fragmentos (Bedrock)")
+    args = parser.parse_args()
+
+    author = AUTHORS[args.page]
+    if args.collect:
+        collect(author, args.collect)
+    if args.input:
+        rerank_settings = author.rerank_settings or {}
+        run(args.input,
+            args.top_k or rerank_settings.get("top_k", RERANK_SETTING_DEFAULTS["top_k"]),
+            args.token_budget or rerank_settings.get("token_budget", RERANK_SETTING_DEFAULTS["token_budget"]),
+            AnswerJudge(author) if args.answers else None)
+    if not (args.collect or args.input):
+        parser.error("indica --collect o --input")
+
+
+if __name__ == "__main__":
+    main()
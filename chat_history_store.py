@@ -0,0 +1,383 @@
+# ------------------------------------------------------
+# Historial de chat en DynamoDB: un item por mensaje
+# ------------------------------------------------------
+# La tabla original (CHHSessionTable) guarda toda la conversación en un único
+# item {"SessionId", "History": [...]}, que se lee y reescribe completo por cada
+# mensaje y termina chocando con el límite de 400 KB por item.
+#
+# El nuevo layout (CHHMessageTable) usa:
+#   SessionId  (S, partition key)  -> "usuario-autor"
+#   MessageSeq (N, sort key)       -> 1, 2, 3... en orden de la conversación
+#   Format     (N)                 -> 2, formato compacto de message_codec.py
+#   Msg (M) o Codec (S) + Body (B) -> el mensaje compacto, comprimido si es grande
+# de forma que agregar un mensaje es un único put, sin leer lo anterior. Los
+# items escritos antes del formato compacto guardan el mensaje completo en
+# Message (M) y se siguen leyendo igual.
+#
+# El item con MessageSeq = 0 es la cabecera de la sesión; guarda LastSeq, el
+# último número de secuencia escrito, y sirve como versión para detectar
+# escritores concurrentes (dos pestañas abiertas en la misma sesión). También
+# guarda el resumen acumulado de la conversación (Summary) y cuántos mensajes
+# iniciales cubre (SummarySeq), ver history_window.py.
+
+import logging
+import random
+import time
+
+from boto3.dynamodb.conditions import Key
+from botocore.exceptions import ClientError
+
+from aws_resources import get_dynamodb_table
+from message_codec import decode_item, encode_message
+
+
+MESSAGE_TABLE_NAME = "CHHMessageTable"
+LEGACY_TABLE_NAME = "CHHSessionTable"
+HEAD_SEQ = 0
+
+# Espera base (s) antes de reintentar un turno que chocó con otra sesión en un
+# fragmento compartido; se duplica en cada intento y se elige al azar entre 0 y
+# ese valor, para que las sesiones que chocaron no vuelvan a chocar
+CHUNK_CONFLICT_BACKOFF = 0.05
+
+logger = logging.getLogger(__name__)
+
+
+def create_message_table(dynamodb, table_name: str = MESSAGE_TABLE_NAME):
+    """Crea la tabla de mensajes (on-demand) y espera a que esté activa."""
+    table = dynamodb.create_table(
+        TableName=table_name,
+        KeySchema=[
+            {"AttributeName": "SessionId", "KeyType": "HASH"},
+            {"AttributeName": "MessageSeq", "KeyType": "RANGE"},
+        ],
+        AttributeDefinitions=[
+            {"AttributeName": "SessionId", "AttributeType": "S"},
+            {"AttributeName": "MessageSeq", "AttributeType": "N"},
+        ],
+        BillingMode="PAY_PER_REQUEST",
+    )
+    table.wait_until_exists()
+    return table
+
+
+def message_items(session_id: str, messages, first_seq: int = 1):
+    """Convierte mensajes formateados (format_message) en items de la tabla nueva."""
+    return [
+        {"SessionId": session_id, "MessageSeq": seq, **encode_message(message)}
+        for seq, message in enumerate(messages, start=first_seq)
+    ]
+
+
+def head_item(session_id: str, last_seq: int):
+    return {"SessionId": session_id, "MessageSeq": HEAD_SEQ, "LastSeq": last_seq}
+
+
+class ConcurrentWriteError(Exception):
+    """Otro escritor avanzó la sesión y no se pudo confirmar el turno tras reintentar."""
+
+
+class AppendOnlyDynamoDBChatMessageHistory:
+    """Historial de una sesión guardado como un item por mensaje."""
+
+    def __init__(self, table_name, session_id, legacy_table_name=LEGACY_TABLE_NAME, stats=None):
+        self.table = get_dynamodb_table(table_name)
+        self.session_id = session_id
+        self.legacy_table_name = legacy_table_name
+        self.last_seq = None  # se conoce después de leer o escribir
+        self.has_head = False
+        self.summary = {"text": "", "covered": 0}
+        self.conflicts = 0
+        # Contadores de llamadas a DynamoDB; puede ser un dict del session_state
+        self.stats = stats if stats is not None else {}
+
+    def _count(self, kind: str):
+        self.stats[kind] = self.stats.get(kind, 0) + 1
+
+    def _query_items(self):
+        items = []
+        kwargs = {
+            "KeyConditionExpression": Key("SessionId").eq(self.session_id) & Key("MessageSeq").gte(HEAD_SEQ),
+            "ScanIndexForward": True,
+        }
+        while True:
+            response = self.table.query(**kwargs)
+            self._count("reads")
+            items.extend(response.get("Items", []))
+            if "LastEvaluatedKey" not in response:
+                return items
+            kwargs["ExclusiveStartKey"] = response["LastEvaluatedKey"]
+
+    def _sync_last_seq(self):
+        """Lee la cabecera (o el último mensaje, si la sesión no tiene cabecera)."""
+        head = self.table.get_item(
+            Key={"SessionId": self.session_id, "MessageSeq": HEAD_SEQ},
+            ConsistentRead=True,
+        ).get("Item")
+        self._count("reads")
+        if head:
+            self.has_head = True
+            self.last_seq = int(head["LastSeq"])
+            return
+
+        response = self.table.query(
+            KeyConditionExpression=Key("SessionId").eq(self.session_id) & Key("MessageSeq").gt(HEAD_SEQ),
+            ScanIndexForward=False,
+            Limit=1,
+            ProjectionExpression="MessageSeq",
+            ConsistentRead=True,
+        )
+        self._count("reads")
+        items = response.get("Items", [])
+        self.has_head = False
+        self.last_seq = int(items[0]["MessageSeq"]) if items else 0
+
+    def get_history(self):
+        """Obtiene el historial completo, con el mismo formato que la tabla original."""
+        items = self._query_items()
+        head = items.pop(0) if items and int(items[0]["MessageSeq"]) == HEAD_SEQ else None
+
+        if not items and head is None and self.legacy_table_name:
+            # Sesión todavía no migrada: se copia una sola vez desde la tabla original
+            messages = migrate_session(
+                get_dynamodb_table(self.legacy_table_name), self.table, self.session_id
+            )
+            self._count("reads")
+            # La migración escribe la cabecera aunque el historial esté vacío
+            self.has_head = messages is not None
+            messages = messages or []
+            self.last_seq = len(messages)
+            return {"SessionId": self.session_id, "History": messages}
+
+        self.has_head = head is not None
+        self.last_seq = int(head["LastSeq"]) if head else (int(items[-1]["MessageSeq"]) if items else 0)
+        if head and "Summary" in head:
+            self.summary = {"text": head["Summary"], "covered": int(head["SummarySeq"])}
+        return {"SessionId": self.session_id, "History": [decode_item(item) for item in items]}
+
+    def add_messages(self, messages):
+        """Agrega mensajes al final del historial en un solo BatchWriteItem, sin control de concurrencia."""
+        if self.last_seq is None:
+            self._sync_last_seq()
+
+        items = message_items(self.session_id, messages, first_seq=self.last_seq + 1)
+        self.last_seq += len(items)
+        with self.table.batch_writer() as batch:
+            for item in items:
+                batch.put_item(Item=item)
+        # La cabecera se actualiza (no se reemplaza) para no perder el resumen
+        self.table.update_item(
+            Key={"SessionId": self.session_id, "MessageSeq": HEAD_SEQ},
+            UpdateExpression="SET LastSeq = :last",
+            ExpressionAttributeValues={":last": self.last_seq},
+        )
+        self._count("writes")
+        self.has_head = True
+
+    def update_history(self, new_message):
+        """Agrega un mensaje (compatible con CustomDynamoDBChatMessageHistory)."""
+        self.add_messages([new_message])
+
+    def _transact_append(self, messages, extra_items=()):
+        expected = self.last_seq
+        new_last_seq = expected + len(messages)
+
+        if self.has_head:
+            condition = "LastSeq = :expected"
+            values = {":new": new_last_seq, ":expected": expected}
+        else:
+            condition = "attribute_not_exists(LastSeq)"
+            values = {":new": new_last_seq}
+
+        transact_items = [{
+            "Update": {
+                "TableName": self.table.name,
+                "Key": {"SessionId": self.session_id, "MessageSeq": HEAD_SEQ},
+                "UpdateExpression": "SET LastSeq = :new",
+                "ConditionExpression": condition,
+                "ExpressionAttributeValues": values,
+            }
+        }]
+        for item in message_items(self.session_id, messages, first_seq=expected + 1):
+            transact_items.append({
+                "Put": {
+                    "TableName": self.table.name,
+                    "Item": item,
+                    "ConditionExpression": "attribute_not_exists(MessageSeq)",
+                }
+            })
+        transact_items.extend(extra_items)
+
+        # El cliente del recurso serializa los tipos de Python igual que Table.put_item
+        self._count("writes")
+        self.table.meta.client.transact_write_items(TransactItems=transact_items)
+        self.last_seq = new_last_seq
+        self.has_head = True
+
+    def commit_turn(self, human_message, ai_message, max_retries: int = 3, extra_items=()) -> bool:
+        """
+        Guarda la pregunta y la respuesta de un turno en una sola transacción,
+        junto con extra_items (p. ej. los fragmentos citados, ver chunk_store.py).
+
+        La cabecera de la sesión funciona como versión: si otra pestaña escribió
+        desde la última lectura, la condición falla, se vuelve a leer LastSeq y el
+        turno se agrega después de los mensajes ajenos en lugar de pisarlos.
+        Devuelve True si se detectó un escritor concurrente.
+        """
+        if self.last_seq is None:
+            self._sync_last_seq()
+
+        conflict = False
+        for attempt in range(max_retries + 1):
+            try:
+                self._transact_append([human_message, ai_message], extra_items)
+                return conflict
+            except ClientError as error:
+                code = error.response.get("Error", {}).get("Code")
+                if code not in ("TransactionCanceledException", "TransactionConflictException"):
+                    raise
+                reasons = error.response.get("CancellationReasons") or []
+                if reasons and reasons[0].get("Code") in (None, "None"):
+                    # La cabecera no cambió: chocó con otra sesión que guardaba el mismo fragmento
+                    logger.warning("Transacción del turno cancelada en %s (%s), reintentando",
+                                   self.session_id, [r.get("Code") for r in reasons])
+                    time.sleep(random.uniform(0, CHUNK_CONFLICT_BACKOFF * 2 ** attempt))
+                    continue
+                conflict = True
+                self.conflicts += 1
+                logger.warning("Escritura concurrente en la sesión %s, reintentando", self.session_id)
+                self._sync_last_seq()
+
+        raise ConcurrentWriteError(f"No se pudo guardar el turno en la sesión {self.session_id}")
+
+    def save_summary(self, text: str, covered: int) -> bool:
+        """
+        Guarda el resumen acumulado que cubre los primeros `covered` mensajes.
+        Solo avanza: si otra pestaña ya guardó un resumen más largo, no se pisa.
+        """
+        try:
+            self._count("writes")
+            self.table.update_item(
+                Key={"SessionId": self.session_id, "MessageSeq": HEAD_SEQ},
+                UpdateExpression="SET Summary = :text, SummarySeq = :covered",
+                ConditionExpression="attribute_exists(LastSeq) AND "
+                                    "(attribute_not_exists(SummarySeq) OR SummarySeq < :covered)",
+                ExpressionAttributeValues={":text": text, ":covered": covered},
+            )
+        except ClientError as error:
+            if error.response.get("Error", {}).get("Code") != "ConditionalCheckFailedException":
+                raise
+            return False
+        self.summary = {"text": text, "covered": covered}
+        return True
+
+
+class SessionHistoryCache:
+    """
+    Copia en memoria (session_state) del historial de una sesión de DynamoDB.
+
+    Se hidrata con una sola lectura al entrar a la página, se actualiza en el
+    lugar con commit_turn y solo se vuelve a leer si se invalida explícitamente
+    (o si commit_turn detecta que otra pestaña escribió en la misma sesión).
+    """
+
+    def __init__(self, store, state, key=None):
+        self.store = store
+        self.state = state
+        self.key = key or f"history_cache_{store.session_id}"
+        # Las lecturas y escrituras de DynamoDB se acumulan por sesión de Streamlit
+        self.store.stats = self.state.setdefault("dynamodb_stats", {"reads": 0, "writes": 0})
+
+    def _entry(self):
+        entry = self.state.get(self.key)
+        if entry is None or entry.get("stale"):
+            history = self.store.get_history().get("History", [])
+            entry = {
+                "messages": list(history),
+                "last_seq": self.store.last_seq,
+                "has_head": self.store.has_head,
+                "summary": self.store.summary,
+            }
+            self.state[self.key] = entry
+        else:
+            # Cada rerun crea un store nuevo; se le pasa la versión conocida para no releerla
+            self.store.last_seq = entry["last_seq"]
+            self.store.has_head = entry["has_head"]
+        return entry
+
+    def messages(self):
+        """Mensajes guardados (formato format_message) de la sesión."""
+        return self._entry()["messages"]
+
+    def commit_turn(self, human_message, ai_message, extra_items=()) -> bool:
+        entry = self._entry()
+        concurrent_write = self.store.commit_turn(human_message, ai_message, extra_items=extra_items)
+        if concurrent_write:
+            self.invalidate()
+        else:
+            entry["messages"].extend([human_message, ai_message])
+            entry["last_seq"] = self.store.last_seq
+            entry["has_head"] = self.store.has_head
+        return concurrent_write
+
+    def summary(self) -> dict:
+        """Resumen acumulado {"text", "covered"} de los mensajes más antiguos."""
+        return self._entry()["summary"]
+
+    def save_summary(self, text: str, covered: int):
+        entry = self._entry()
+        if self.store.save_summary(text, covered):
+            entry["summary"] = self.store.summary
+        else:
+            # Otra pestaña resumió más mensajes; se relee en el próximo acceso
+            self.invalidate()
+
+    def invalidate(self):
+        entry = self.state.pop(self.key, None)
+        if entry is not None:
+            # Las copias de detached() comparten la entrada y también la releen
+            entry["stale"] = True
+
+    def detached(self):
+        """
+        Copia para otro hilo (el servicio de generación), que no puede leer
+        st.session_state: comparte la entrada y los contadores de la sesión.
+        """
+        return SessionHistoryCache(self.store, {self.key: self._entry(), "dynamodb_stats": self.store.stats}, self.key)
+
+    @property
+    def reads(self) -> int:
+        return self.store.stats.get("reads", 0)
+
+
+def migrate_session(legacy_table, message_table, session_id: str, overwrite: bool = False):
+    """
+    Copia el item {"History": [...]} de una sesión al layout de un item por
+    mensaje. Devuelve los mensajes, o None si la sesión no existía en la tabla
+    original (entonces no se escribe nada, tampoco la cabecera).
+    """
+    legacy_item = legacy_table.get_item(Key={"SessionId": session_id}).get("Item")
+    if not legacy_item:
+        return None
+    return migrate_item(legacy_item, message_table, overwrite=overwrite)
+
+
+def migrate_item(legacy_item: dict, message_table, overwrite: bool = False):
+    """Escribe los mensajes de un item de CHHSessionTable en la tabla nueva."""
+    session_id = legacy_item["SessionId"]
+    messages = legacy_item.get("History", [])
+
+    if not overwrite:
+        existing = message_table.query(
+            KeyConditionExpression=Key("SessionId").eq(session_id) & Key("MessageSeq").gte(HEAD_SEQ),
+            Limit=1,
+        )
+        if existing.get("Items"):
+            logger.info("Sesión %s ya migrada, se omite", session_id)
+            return messages
+
+    with message_table.batch_writer(overwrite_by_pkeys=["SessionId", "MessageSeq"]) as batch:
+        for item in message_items(session_id, messages):
+            batch.put_item(Item=item)
+        batch.put_item(Item=head_item(session_id, len(messages)))
+    return messages
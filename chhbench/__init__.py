@@ -0,0 +1,17 @@
+# ------------------------------------------------------
+# Benchmarks de la app sin AWS
+# ------------------------------------------------------
+# Piezas para correr las páginas de punta a punta sin red:
+#
+#   fakes.py     ChatBedrock falso (TTFT y tokens/s configurables) y retriever
+#                sobre un corpus local en lugar de la KB
+#   backends.py  DynamoDB en moto / DynamoDB Local, registro de los reemplazos
+#                en aws_resources y usuarios de prueba para el autenticador
+#   session.py   una sesión de Streamlit sin navegador (AppTest): login,
+#                sugerencias, preguntas y cambio de página, con bytes enviados
+#                y llamadas a DynamoDB por paso
+#   questions.py preguntas libres por página, distintas de las sugerencias
+#
+# bench_e2e.py las usa para medir latencias por etapa y load_test.py para la
+# carga con usuarios concurrentes; los módulos se importan por separado
+# (fakes.py carga langchain_core).
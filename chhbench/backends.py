@@ -0,0 +1,156 @@
+# ------------------------------------------------------
+# Entorno sin AWS para los benchmarks
+# ------------------------------------------------------
+#   - dynamodb_backend(): DynamoDB Local (DYNAMODB_ENDPOINT_URL) o moto en
+#     memoria, con las tablas de mensajes, fragmentos y sesiones anteriores
+#     (con moto, la espera por su lock queda en MOTO_METRICS);
+#   - install_stand_ins(): registra en aws_resources los reemplazos de
+#     ChatBedrock, del retriever de cada KB y de los embeddings (ver
+#     fakes.py), así las páginas corren sin cambios;
+#   - users_file(): archivo de usuarios del autenticador (CHH_USERS_CONFIG) con
+#     usuarios de prueba.
+
+import contextlib
+import os
+import tempfile
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Dict
+
+from aws_resources import clear_registry, get_dynamodb_resource, override_resource
+from metrics import counters
+
+
+# Llamadas a moto, espera por su lock y tiempo atendiendo (ms)
+MOTO_METRICS = counters("moto_dynamodb", "calls", "wait_ms", "busy_ms")
+
+# Contraseña de los usuarios que crea users_file()
+BENCH_PASSWORD = "chhbench"
+
+
+@dataclass
+class StandInSettings:
+    """Latencias y tamaño de las respuestas de los reemplazos de Bedrock y de las KB."""
+
+    ttft_ms: float = 400.0
+    tokens_per_second: float = 80.0
+    answer_tokens: int = 250
+    retrieval_ms: float = 250.0
+    # autor -> archivo de bench_rerank.py --collect; los demás usan un corpus sintético
+    corpus_files: Dict[str, str] = field(default_factory=dict)
+
+
+@contextlib.contextmanager
+def dynamodb_backend():
+    """DynamoDB Local (DYNAMODB_ENDPOINT_URL) o moto en memoria con las tablas del chat creadas."""
+    os.environ.setdefault("AWS_ACCESS_KEY_ID", "testing")
+    os.environ.setdefault("AWS_SECRET_ACCESS_KEY", "testing")
+    os.environ.setdefault("AWS_DEFAULT_REGION", "us-east-1")
+    if os.environ.get("DYNAMODB_ENDPOINT_URL"):
+        yield get_dynamodb_resource()
+        return
+
+    from moto import mock_aws
+    from moto.dynamodb.responses import DynamoHandler
+
+    from chat_history_store import LEGACY_TABLE_NAME, create_message_table
+    from chunk_store import create_chunk_table
+
+    # moto no es thread-safe (transact_write_items copia la tabla mientras otro
+    # hilo escribe): con sesiones concurrentes las llamadas se atienden de una en
+    # una. La espera por ese lock es del benchmark y no de la app: se cuenta
+    # aparte en metrics.snapshot("moto_dynamodb") para descontarla
+    call_action = DynamoHandler.call_action
+    lock = threading.Lock()
+
+    def serialized_call_action(handler):
+        start = time.perf_counter()
+        with lock:
+            acquired = time.perf_counter()
+            try:
+                return call_action(handler)
+            finally:
+                MOTO_METRICS.add(calls=1, wait_ms=(acquired - start) * 1000,
+                                 busy_ms=(time.perf_counter() - acquired) * 1000)
+
+    with mock_aws():
+        DynamoHandler.call_action = serialized_call_action
+        # Los clientes creados antes de moto apuntarían a AWS
+        clear_registry("dynamodb_resource")
+        clear_registry("dynamodb_table")
+        clear_registry("s3_client")
+        dynamodb = get_dynamodb_resource()
+        create_message_table(dynamodb)
+        create_chunk_table(dynamodb)
+        # Sesiones del esquema anterior, que el historial migra en la primera lectura
+        dynamodb.create_table(
+            TableName=LEGACY_TABLE_NAME,
+            KeySchema=[{"AttributeName": "SessionId", "KeyType": "HASH"}],
+            AttributeDefinitions=[{"AttributeName": "SessionId", "AttributeType": "S"}],
+            BillingMode="PAY_PER_REQUEST",
+        )
+        try:
+            yield dynamodb
+        finally:
+            DynamoHandler.call_action = call_action
+
+
+def install_stand_ins(settings: StandInSettings = None):
+    """Reemplaza Bedrock, las KB y los embeddings en todo el proceso."""
+    # fakes.py importa langchain_core: se carga aquí para que startup_profile.py pueda
+    # usar dynamodb_backend() sin importarlo antes del render que mide
+    from langchain_core.embeddings import DeterministicFakeEmbedding
+
+    from chhbench.fakes import FakeStreamingChatModel, LocalCorpusRetriever, load_collected_corpus, synthetic_corpus
+    from chhcore.registry import AUTHORS
+
+    settings = settings or StandInSettings()
+    corpora = {}
+    for author in AUTHORS.values():
+        if author.knowledge_bases:
+            continue
+        path = settings.corpus_files.get(author.key)
+        corpora[author.knowledge_base_id] = (load_collected_corpus(path) if path
+                                             else synthetic_corpus(author.knowledge_base_id, author.questions))
+
+    # Las llaves son las de aws_resources: (región, modelo, kwargs), (KB, numberOfResults), (región, modelo)
+    override_resource("chat_model", lambda key: FakeStreamingChatModel(
+        ttft_ms=settings.ttft_ms, tokens_per_second=settings.tokens_per_second, answer_tokens=settings.answer_tokens))
+    override_resource("kb_retriever", lambda key: LocalCorpusRetriever(
+        documents=corpora[key[0]], number_of_results=key[1], latency_ms=settings.retrieval_ms))
+    override_resource("embeddings", lambda key: DeterministicFakeEmbedding(size=256))
+    # Las cadenas y cachés ya construidas tienen los recursos de AWS
+    clear_registry()
+    return corpora
+
+
+@contextlib.contextmanager
+def users_file(usernames):
+    """Usuarios de prueba (contraseña BENCH_PASSWORD) en un CHH_USERS_CONFIG temporal."""
+    import streamlit_authenticator as stauth
+    import yaml
+
+    # Un solo hash para todos: bcrypt tarda ~0.25 s por contraseña
+    password = stauth.Hasher.hash(BENCH_PASSWORD)
+    config = {
+        "credentials": {"usernames": {
+            username: {"email": username, "first_name": username.split("@")[0], "last_name": "Bench",
+                       "password": password}
+            for username in usernames
+        }},
+        # La llave firma el JWT de la cookie: con menos de 32 bytes PyJWT avisa en cada login
+        "cookie": {"name": "chhbench", "key": "chhbench-cookie-key-for-local-runs", "expiry_days": 1},
+    }
+    previous = os.environ.get("CHH_USERS_CONFIG")
+    with tempfile.NamedTemporaryFile("w", suffix=".yaml", delete=False) as file:
+        yaml.dump(config, file)
+    os.environ["CHH_USERS_CONFIG"] = file.name
+    try:
+        yield file.name
+    finally:
+        if previous is None:
+            del os.environ["CHH_USERS_CONFIG"]
+        else:
+            os.environ["CHH_USERS_CONFIG"] = previous
+        os.remove(file.name)
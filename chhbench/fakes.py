@@ -0,0 +1,169 @@
+# ------------------------------------------------------
+# Reemplazos locales de Bedrock y de las Knowledge Bases
+# ------------------------------------------------------
+# FakeStreamingChatModel toma el lugar de ChatBedrock: responde un texto
+# determinista (mismo prompt -> misma respuesta) por tokens, con un tiempo al
+# primer token y una velocidad configurables, y reporta usage_metadata como
+# Bedrock. LocalCorpusRetriever toma el lugar de AmazonKnowledgeBasesRetriever:
+# puntúa con BM25 (rerank.bm25_scores) los fragmentos de un corpus local y
+# devuelve los mejores con la metadata de la KB (score, location.s3Location.uri).
+#
+# El corpus de cada KB sale de un archivo de bench_rerank.py --collect (los
+# fragmentos reales que devolvió la KB para las sugerencias) o, sin archivo, se
+# genera a partir de las preguntas sugeridas del autor.
+
+import asyncio
+import hashlib
+import json
+import random
+import time
+from typing import Any, AsyncIterator, Iterator, List, Optional
+
+from langchain_core.callbacks import CallbackManagerForRetrieverRun
+from langchain_core.documents import Document
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+from langchain_core.retrievers import BaseRetriever
+
+from history_window import approx_token_count
+from rerank import bm25_scores, tokenize
+
+
+# Palabras de las respuestas falsas (texto en español con el largo típico de una respuesta)
+ANSWER_VOCABULARY = (
+    "el mercado orden espontáneo precios conocimiento disperso planificación central inflación "
+    "dinero crédito ahorro inversión capital interés salarios empleo gasto público impuestos "
+    "libertad individual estado derecho competencia empresarial cálculo económico ciclo "
+    "económico intervención consecuencias largo plazo grupos efectos invisibles según autor "
+    "obra capítulo argumenta sostiene explica propone critica señala"
+).split()
+
+# Fragmentos por KB cuando no hay archivo de corpus
+SYNTHETIC_FRAGMENTS_PER_QUESTION = 6
+SYNTHETIC_FRAGMENT_WORDS = 180
+
+
+def message_text(message: BaseMessage) -> str:
+    """Texto de un mensaje, también cuando el contenido son bloques (prompt caching)."""
+    if isinstance(message.content, str):
+        return message.content
+    return "".join(block.get("text", "") if isinstance(block, dict) else str(block) for block in message.content)
+
+
+def fake_answer(prompt: str, tokens: int) -> List[str]:
+    """Tokens de una respuesta determinista para el prompt, con párrafos de ~60 tokens."""
+    rng = random.Random(hashlib.sha256(prompt.encode("utf-8")).hexdigest())
+    pieces = []
+    for i in range(tokens):
+        word = rng.choice(ANSWER_VOCABULARY)
+        if i and i % 60 == 0:
+            pieces.append(".\n\n" + word.capitalize())
+        else:
+            pieces.append((" " if i else "") + word)
+    pieces.append(".")
+    return pieces
+
+
+class FakeStreamingChatModel(BaseChatModel):
+    """ChatBedrock falso: ttft_ms hasta el primer token y luego tokens_per_second."""
+
+    ttft_ms: float = 400.0
+    tokens_per_second: float = 80.0
+    answer_tokens: int = 250
+
+    @property
+    def _llm_type(self) -> str:
+        return "chhbench-fake-bedrock"
+
+    def _pieces(self, messages: List[BaseMessage]):
+        prompt = "\n".join(message_text(message) for message in messages)
+        return prompt, fake_answer(prompt, self.answer_tokens)
+
+    def _usage(self, prompt: str, pieces: List[str]) -> dict:
+        input_tokens = approx_token_count(prompt)
+        output_tokens = len(pieces)
+        return {"input_tokens": input_tokens, "output_tokens": output_tokens,
+                "total_tokens": input_tokens + output_tokens}
+
+    def _generate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                  run_manager=None, **kwargs: Any) -> ChatResult:
+        prompt, pieces = self._pieces(messages)
+        time.sleep(self.ttft_ms / 1000 + len(pieces) / self.tokens_per_second)
+        message = AIMessage(content="".join(pieces), usage_metadata=self._usage(prompt, pieces))
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    def _delays(self, count: int) -> Iterator[float]:
+        """Espera antes de cada token; contra el reloj, para que las esperas cortas no se acumulen."""
+        start = time.perf_counter()
+        for i in range(count):
+            yield max(start + self.ttft_ms / 1000 + i / self.tokens_per_second - time.perf_counter(), 0)
+
+    def _stream(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                run_manager=None, **kwargs: Any) -> Iterator[ChatGenerationChunk]:
+        prompt, pieces = self._pieces(messages)
+        for piece, delay in zip(pieces, self._delays(len(pieces))):
+            time.sleep(delay)
+            yield ChatGenerationChunk(message=AIMessageChunk(content=piece))
+        yield ChatGenerationChunk(message=AIMessageChunk(content="", usage_metadata=self._usage(prompt, pieces)))
+
+    async def _astream(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                       run_manager=None, **kwargs: Any) -> AsyncIterator[ChatGenerationChunk]:
+        # El servicio de generación corre las cadenas en un event loop: aquí no se bloquea
+        prompt, pieces = self._pieces(messages)
+        for piece, delay in zip(pieces, self._delays(len(pieces))):
+            await asyncio.sleep(delay)
+            yield ChatGenerationChunk(message=AIMessageChunk(content=piece))
+        yield ChatGenerationChunk(message=AIMessageChunk(content="", usage_metadata=self._usage(prompt, pieces)))
+
+
+class LocalCorpusRetriever(BaseRetriever):
+    """AmazonKnowledgeBasesRetriever falso sobre un corpus local, con latencia simulada."""
+
+    documents: List[Document]
+    number_of_results: int = 20
+    latency_ms: float = 250.0
+
+    def _get_relevant_documents(self, query: str, *, run_manager: CallbackManagerForRetrieverRun) -> List[Document]:
+        start = time.perf_counter()
+        scores = bm25_scores(query, [doc.page_content for doc in self.documents])
+        ranked = sorted(zip(scores, range(len(self.documents))), key=lambda pair: (-pair[0], pair[1]))
+        top = ranked[:self.number_of_results]
+        best = top[0][0] if top and top[0][0] > 0 else 1.0
+        results = [
+            Document(page_content=self.documents[i].page_content,
+                     metadata={**self.documents[i].metadata, "score": round(score / best, 4)})
+            for score, i in top
+        ]
+        # La API Retrieve tarda lo mismo aunque el corpus local sea pequeño
+        time.sleep(max(self.latency_ms / 1000 - (time.perf_counter() - start), 0))
+        return results
+
+
+def kb_metadata(knowledge_base_id: str, source: str) -> dict:
+    return {"location": {"type": "S3", "s3Location": {"uri": f"s3://chhbench-{knowledge_base_id.lower()}/{source}"}}}
+
+
+def synthetic_corpus(knowledge_base_id: str, questions) -> List[Document]:
+    """Fragmentos deterministas que comparten vocabulario con las preguntas sugeridas."""
+    rng = random.Random(knowledge_base_id)
+    documents = []
+    for q, question in enumerate(questions):
+        words = tokenize(question) or ["economía"]
+        for f in range(SYNTHETIC_FRAGMENTS_PER_QUESTION):
+            text = " ".join(rng.choice(words) if rng.random() < 0.15 else rng.choice(ANSWER_VOCABULARY)
+                            for _ in range(SYNTHETIC_FRAGMENT_WORDS))
+            documents.append(Document(page_content=text.capitalize() + ".",
+                                      metadata=kb_metadata(knowledge_base_id, f"libro-{q % 7}.pdf")))
+    return documents
+
+
+def load_collected_corpus(path: str) -> List[Document]:
+    """Fragmentos únicos de un archivo de bench_rerank.py --collect."""
+    documents = {}
+    with open(path, encoding="utf-8") as file:
+        for line in file:
+            for doc in json.loads(line)["documents"]:
+                documents.setdefault(doc["page_content"], Document(page_content=doc["page_content"],
+                                                                   metadata=doc["metadata"]))
+    return list(documents.values())
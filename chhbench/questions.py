@@ -0,0 +1,59 @@
+# ------------------------------------------------------
+# Preguntas libres de los benchmarks
+# ------------------------------------------------------
+# Las preguntas que bench_e2e.py y load_test.py escriben en el chat_input. No
+# son las sugerencias de authors.yaml: esas tienen respuesta precalculada
+# (warm_answer_cache.py) y entrada en la cache semántica después del primer
+# clic, así que medirían las caches y no la cadena. free_questions() falla si
+# alguna coincide con una sugerencia de la página.
+
+from typing import Tuple
+
+from chhcore.registry import AuthorConfig
+
+
+FREE_QUESTIONS = {
+    "hayek": (
+        "qué quiso decir hayek con la fatal arrogancia",
+        "cómo critica hayek la idea de justicia social",
+        "qué papel tienen los precios en la transmisión del conocimiento disperso",
+        "por qué hayek desconfiaba del monopolio estatal del dinero",
+        "qué propuso hayek en la desnacionalización del dinero",
+        "cómo influyó camino de servidumbre en la política de posguerra",
+        "qué diferencia hay entre el liberalismo de hayek y el conservadurismo",
+        "qué relación ve hayek entre el estado de derecho y la igualdad ante la ley",
+    ),
+    "hazlitt": (
+        "qué es la falacia de la ventana rota y cómo la explica hazlitt",
+        "qué opina hazlitt sobre los aranceles y el proteccionismo",
+        "cómo analiza hazlitt el salario mínimo",
+        "qué dice hazlitt sobre el control de precios y de alquileres",
+        "por qué hazlitt critica los subsidios a la agricultura",
+        "qué piensa hazlitt de las obras públicas como fuente de empleo",
+        "cómo ve hazlitt el papel del ahorro en la economía",
+        "qué papel tiene el sistema de precios en economía en una lección",
+    ),
+    "mises": (
+        "qué es la teoría austriaca del ciclo económico en la obra de mises",
+        "por qué mises sostiene que el socialismo no puede calcular",
+        "qué es el teorema de la regresión del dinero",
+        "cómo explica mises el interés originario y la preferencia temporal",
+        "qué papel tiene el empresario en la teoría de mises",
+        "qué es la soberanía del consumidor según mises",
+        "cómo entiende mises la división del trabajo",
+        "qué diferencia hace mises entre burocracia y gestión empresarial",
+    ),
+}
+
+
+def free_questions(author: AuthorConfig) -> Tuple[str, ...]:
+    """Preguntas libres de la página; las de todos los autores para la página federada."""
+    if author.key in FREE_QUESTIONS:
+        questions = FREE_QUESTIONS[author.key]
+    else:
+        questions = tuple(question for page in FREE_QUESTIONS.values() for question in page)
+    suggestions = {question.strip("¿?").lower() for question in author.questions}
+    overlap = [question for question in questions if question in suggestions]
+    if overlap:
+        raise ValueError(f"Preguntas libres de {author.key} que también son sugerencias: {overlap}")
+    return questions
@@ -0,0 +1,91 @@
+# ------------------------------------------------------
+# Resumen de los pasos de BenchSession
+# ------------------------------------------------------
+# Percentiles p50/p95/p99 por tipo de paso (duración del rerun, bytes enviados,
+# llamadas a DynamoDB) y, para los pasos con pregunta, por etapa de la
+# respuesta (turn_timing: retrieval, ttft, generation, total; generation_service:
+# espera en cola), separando las respuestas de la cadena de las de la caché.
+
+from collections import defaultdict
+
+
+PERCENTILES = (0.5, 0.95, 0.99)
+
+# Etapas de una pregunta: (nombre, reporte de session_state, llave)
+TURN_STAGES = (
+    ("retrieval_ms", "latency", "retrieval_ms"),
+    ("ttft_ms", "latency", "ttft_ms"),
+    ("generation_ms", "latency", "generation_ms"),
+    ("total_ms", "latency", "total_ms"),
+    ("queue_ms", "generation", "queue_ms"),
+)
+
+
+def percentile(values, p):
+    values = sorted(values)
+    return values[min(int(len(values) * p), len(values) - 1)]
+
+
+def distribution(values) -> dict:
+    values = [value for value in values if value is not None]
+    if not values:
+        return {}
+    summary = {f"p{round(p * 100)}": round(percentile(values, p), 1) for p in PERCENTILES}
+    summary["n"] = len(values)
+    summary["mean"] = round(sum(values) / len(values), 1)
+    return summary
+
+
+def step_kind(step: dict) -> str:
+    # Los cambios de página se agrupan: todos hacen lo mismo con distinto autor
+    return "page" if step["step"].startswith("page:") else step["step"]
+
+
+def summarize(steps: list) -> dict:
+    """{"steps": por tipo de paso, "turns": por origen de la respuesta y etapa}."""
+    by_kind = defaultdict(list)
+    for step in steps:
+        by_kind[step_kind(step)].append(step)
+
+    summary = {"steps": {}, "turns": {}, "errors": [error for step in steps for error in step["errors"]]}
+    for kind, group in by_kind.items():
+        summary["steps"][kind] = {
+            "wall_ms": distribution(step["wall_ms"] for step in group),
+            "bytes": distribution(step["bytes"] for step in group),
+            "dynamodb_calls": distribution(step["dynamodb_calls"] for step in group),
+        }
+
+    turns = defaultdict(list)
+    for step in steps:
+        if step.get("latency"):
+            turns[step["latency"]["source"]].append(step)
+    for source, group in turns.items():
+        summary["turns"][source] = {
+            name: distribution((step.get(report) or {}).get(key) for step in group)
+            for name, report, key in TURN_STAGES
+        }
+        summary["turns"][source]["bytes_sent"] = distribution(
+            (step.get("render") or {}).get("bytes_sent") for step in group)
+    return summary
+
+
+def _line(label: str, values: dict, unit: str = "") -> str:
+    if not values:
+        return f"  {label:<16} -"
+    return (f"  {label:<16} p50={values['p50']:>9.1f}{unit}  p95={values['p95']:>9.1f}{unit}  "
+            f"p99={values['p99']:>9.1f}{unit}  (n={values['n']})")
+
+
+def print_summary(summary: dict):
+    for kind, metrics in summary["steps"].items():
+        calls = metrics["dynamodb_calls"]
+        print(f"{kind}: {metrics['wall_ms'].get('n', 0)} pasos, "
+              f"DynamoDB/paso={calls.get('mean', 0):.1f}, bytes/paso={metrics['bytes'].get('mean', 0):.0f}")
+        print(_line("rerun", metrics["wall_ms"], " ms"))
+    for source, stages in summary["turns"].items():
+        print(f"respuestas de {source}:")
+        for name, _, _ in TURN_STAGES:
+            print(_line(name, stages[name], " ms"))
+        print(_line("markdown", stages["bytes_sent"], " B"))
+    for error in summary["errors"][:10]:
+        print(f"ERROR: {error}")
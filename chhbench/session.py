@@ -0,0 +1,238 @@
+# ------------------------------------------------------
+# Sesión de Streamlit sin navegador
+# ------------------------------------------------------
+# BenchSession recorre la app como un usuario con AppTest (el mismo ScriptRunner
+# que usa el servidor, sin websocket): login en app_autores2.py, clic en una
+# sugerencia, pregunta libre y cambio de página. Cada paso devuelve un reporte:
+#
+#   - wall_ms: duración del rerun completo del script;
+#   - bytes / messages: ForwardMsg que el rerun envió al navegador;
+#   - dynamodb_calls: lecturas y escrituras del historial de la sesión en DynamoDB
+#     (st.session_state["dynamodb_stats"]), incluido el guardado del turno que
+#     hace el servicio de generación fuera del hilo del script;
+#   - latency / generation / render / prompt_cache: los reportes de la pregunta
+#     que la página deja en session_state (turn_timing, generation_service,
+#     stream_renderer, prompt_cache), si el paso hizo una pregunta.
+#
+# Los bytes se atribuyen a la sesión por la llave SESSION_KEY de su
+# session_state, así que varias sesiones pueden correr en paralelo en hilos
+# (con allow_concurrent_sessions(), ver load_test.py).
+
+import os
+import threading
+import time
+
+from streamlit.runtime.scriptrunner_utils.script_run_context import ScriptRunContext, get_script_run_ctx
+from streamlit.testing.v1 import AppTest
+
+from chhcore.registry import AuthorConfig
+
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Script con el que se levanta la app (streamlit run app_autores2.py)
+ENTRYPOINT = "app_autores2.py"
+
+# session_state[SESSION_KEY] = nombre de la sesión, para atribuirle los bytes
+SESSION_KEY = "chhbench_session"
+
+# Reportes de la última pregunta que deja la página en session_state
+TURN_REPORTS = ("latency", "generation", "render", "prompt_cache", "rerank")
+
+# Versión de Streamlit (mayor, menor) en la que se revisaron los internos que
+# reemplaza allow_concurrent_sessions(); con otra hay que volver a revisarlos
+CONCURRENT_SESSIONS_STREAMLIT = (1, 65)
+
+_lock = threading.Lock()
+_counters = {}
+_installed = set()
+
+
+def _session_name():
+    ctx = get_script_run_ctx(suppress_warning=True)
+    if ctx is None:
+        return None
+    try:
+        return ctx.session_state[SESSION_KEY] if SESSION_KEY in ctx.session_state else None
+    except Exception:
+        return None
+
+
+def _count(name, **deltas):
+    if name is None:
+        return
+    with _lock:
+        counters = _counters.setdefault(name, {"bytes": 0, "messages": 0})
+        for key, value in deltas.items():
+            counters[key] += value
+
+
+def install_counters():
+    """Cuenta por sesión los ForwardMsg enviados al navegador."""
+    with _lock:
+        if "forward_msg" not in _installed:
+            enqueue = ScriptRunContext.enqueue
+
+            def counting_enqueue(ctx, msg):
+                enqueue(ctx, msg)
+                _count(_session_name(), bytes=msg.ByteSize(), messages=1)
+
+            ScriptRunContext.enqueue = counting_enqueue
+            _installed.add("forward_msg")
+
+
+def allow_concurrent_sessions():
+    """
+    Permite correr varias BenchSession en hilos. AppTest está pensado para tests
+    secuenciales y cada run toca estado global de Streamlit:
+
+      - al empezar recalcula PagesManager.uses_pages_directory desde None: un
+        run que empieza en ese momento en otro hilo ejecuta app_autores2.py en
+        vez de la página de pages/;
+      - al terminar deja Runtime._instance = None: un run de otro hilo que lo
+        lee en ese momento falla antes de ejecutar la página;
+      - compila el script en un ScriptCache nuevo: varias compilaciones a la
+        vez fallan en CPython 3.11 ("AST constructor recursion depth mismatch").
+
+    Todas las sesiones corren la misma app, así que el ScriptRunner lee
+    uses_pages_directory de una subclase con el valor fijo, Runtime.instance()
+    devuelve el último Runtime de prueba cuando otro run ya lo quitó y los runs
+    comparten un ScriptCache, como las sesiones del servidor.
+
+    Son atributos privados de Streamlit: con una versión distinta de
+    CONCURRENT_SESSIONS_STREAMLIT, o si falta alguno, falla con RuntimeError en
+    lugar de correr con sesiones que se pisan.
+    """
+    import streamlit
+    from streamlit.runtime.pages_manager import PagesManager
+    from streamlit.runtime.runtime import Runtime
+    from streamlit.runtime.scriptrunner import script_runner
+    from streamlit.runtime.scriptrunner.script_cache import ScriptCache
+    from streamlit.testing.v1 import app_test
+
+    version = tuple(int(part) for part in streamlit.__version__.split(".")[:2])
+    if version != CONCURRENT_SESSIONS_STREAMLIT:
+        raise RuntimeError(
+            f"allow_concurrent_sessions() se revisó con Streamlit {'.'.join(map(str, CONCURRENT_SESSIONS_STREAMLIT))}.x "
+            f"y está instalado {streamlit.__version__}: revisar los internos que reemplaza y actualizar "
+            "CONCURRENT_SESSIONS_STREAMLIT"
+        )
+    internals = {
+        "script_runner.PagesManager": hasattr(script_runner, "PagesManager"),
+        "PagesManager.uses_pages_directory": "uses_pages_directory" in vars(PagesManager),
+        "Runtime._instance": hasattr(Runtime, "_instance"),
+        "Runtime.instance": hasattr(Runtime, "instance"),
+        "Runtime.exists": hasattr(Runtime, "exists"),
+        "app_test.ScriptCache": hasattr(app_test, "ScriptCache"),
+    }
+    missing = [name for name, present in internals.items() if not present]
+    if missing:
+        raise RuntimeError(f"Streamlit {streamlit.__version__} no tiene los internos que reemplaza "
+                           f"allow_concurrent_sessions(): {', '.join(missing)}")
+
+    with _lock:
+        if "concurrent_sessions" in _installed:
+            return
+        uses_pages_directory = os.path.isdir(os.path.join(REPO_DIR, "pages"))
+        script_runner.PagesManager = type("PinnedPagesManager", (PagesManager,),
+                                          {"uses_pages_directory": uses_pages_directory})
+
+        instance = Runtime.instance.__func__
+        latest = []
+
+        def last_instance(cls):
+            if cls._instance is not None:
+                latest[:] = [cls._instance]
+            return latest[0] if latest else instance(cls)
+
+        Runtime.instance = classmethod(last_instance)
+        Runtime.exists = classmethod(lambda cls: cls._instance is not None or bool(latest))
+
+        script_cache = ScriptCache()
+        app_test.ScriptCache = lambda: script_cache
+        _installed.add("concurrent_sessions")
+
+
+def session_counters(name: str) -> dict:
+    with _lock:
+        return dict(_counters.get(name, {"bytes": 0, "messages": 0}))
+
+
+class BenchSession:
+    """Un usuario de la app manejado con AppTest."""
+
+    def __init__(self, name: str, timeout: float = 300):
+        self.name = name
+        self.app = AppTest.from_file(os.path.join(REPO_DIR, ENTRYPOINT), default_timeout=timeout)
+        self.app.session_state[SESSION_KEY] = name
+        self.page = ENTRYPOINT
+        self.steps = []
+
+    # --------------------------------------------------
+    # Pasos
+
+    def open(self) -> dict:
+        """Primera carga de la página actual (el login si no hay sesión)."""
+        return self._step("open", self.app.run)
+
+    def login(self, username: str, password: str) -> dict:
+        """Llena el formulario de stauth.Authenticate.login de app_autores2.py y lo envía."""
+        inputs = {widget.label: widget for widget in self.app.text_input}
+        inputs["Email"].input(username)
+        inputs["Contraseña"].input(password)
+        submit = next(button for button in self.app.button if button.label == "Iniciar sesión")
+        report = self._step("login", submit.click().run)
+        if not self.app.session_state["authentication_status"]:
+            report["errors"].append(f"login rechazado para {username}")
+        return report
+
+    def sign_in(self, username: str):
+        """Sesión iniciada sin pasar por el formulario (como una cookie de login válida)."""
+        self.app.session_state["authentication_status"] = True
+        self.app.session_state["username"] = username
+        self.app.session_state["name"] = username
+
+    def switch_page(self, author: AuthorConfig) -> dict:
+        self.page = author.page
+        self.app.switch_page(author.page)
+        return self._step(f"page:{author.key}", self.app.run)
+
+    def click_suggestion(self, author: AuthorConfig, index: int = 0) -> dict:
+        """Clic en la sugerencia index de la página (lleva a la pregunta en el mismo rerun)."""
+        button = self.app.button(key=f"{author.suggestions_prefix}_q_{index}")
+        # El clic guarda la pregunta y hace st.rerun(): AppTest sigue hasta el final de la respuesta
+        return self._step("suggestion", button.click().run, turn=True)
+
+    def ask(self, question: str) -> dict:
+        return self._step("question", self.app.chat_input[0].set_value(question).run, turn=True)
+
+    # --------------------------------------------------
+
+    def _dynamodb_calls(self) -> int:
+        stats = self.app.session_state["dynamodb_stats"] if "dynamodb_stats" in self.app.session_state else {}
+        return stats.get("reads", 0) + stats.get("writes", 0)
+
+    def _step(self, kind: str, run, turn: bool = False) -> dict:
+        if turn:
+            for key in TURN_REPORTS:
+                if key in self.app.session_state:
+                    del self.app.session_state[key]
+        before = {**session_counters(self.name), "dynamodb_calls": self._dynamodb_calls()}
+        start = time.perf_counter()
+        run()
+        wall_ms = (time.perf_counter() - start) * 1000
+        after = {**session_counters(self.name), "dynamodb_calls": self._dynamodb_calls()}
+
+        report = {
+            "session": self.name,
+            "step": kind,
+            "page": self.page,
+            "wall_ms": round(wall_ms, 1),
+            **{key: after[key] - before[key] for key in after},
+            "errors": [str(exception.value) for exception in self.app.exception],
+        }
+        if turn:
+            for key in TURN_REPORTS:
+                report[key] = self.app.session_state[key] if key in self.app.session_state else None
+        self.steps.append(report)
+        return report
@@ -0,0 +1,40 @@
+# ------------------------------------------------------
+# Núcleo compartido del chatbot CHH
+# ------------------------------------------------------
+# El pipeline que cada página tenía copiado (prompt, cadena RAG, historial,
+# format_message, citas, streaming de la respuesta) vive aquí una sola vez:
+#
+#   registry.py  autores desde authors.yaml: KB, prompt, sugerencias, sufijos
+#   messages.py  format_message, Citation / extract_citations, format_citations
+#   pipeline.py  cadena RAG y cadena con historial de un autor
+#   chat.py      chat de Streamlit de una página (render_header, run_chat)
+#   layout.py    menú, botón de imprimir, autenticador y cierre de sesión
+#
+# Una página es su AuthorConfig y su login:
+#
+#   from chhcore import get_author
+#   from chhcore.chat import render_header, run_chat
+#
+#   AUTHOR = get_author("hayek")
+#   render_header(st, AUTHOR)
+#   run_chat(st, AUTHOR)
+#
+# chat y layout importan streamlit y se importan aparte; este paquete solo
+# expone lo que también usan los jobs sin UI (warm_answer_cache.py).
+#
+# pipeline.py (langchain_core.runnables / output_parsers, las cadenas) se importa
+# en el primer acceso a uno de sus nombres: una página lo necesita al responder,
+# no para dibujar el login o las sugerencias (ver startup_profile.py).
+
+from chhcore.messages import Citation, extract_citations, format_citations, format_message
+from chhcore.registry import AUTHORS, MODEL_ID, MODEL_KWARGS, AuthorConfig, get_author, load_registry
+
+
+_PIPELINE_NAMES = ("answers_version", "get_author_chain", "get_author_retriever", "get_chain_with_history")
+
+
+def __getattr__(name):
+    if name in _PIPELINE_NAMES:
+        from chhcore import pipeline
+        return getattr(pipeline, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,358 @@
+# ------------------------------------------------------
+# Chat de una página de autor en Streamlit
+# ------------------------------------------------------
+# Todo lo que va después del login en app_autores2.py y pages/*.py:
+# sugerencias, historial de la barra lateral, transcript, la pregunta en
+# streaming y el guardado del turno. Las páginas pasan su alias de streamlit
+# (st, st1, ...) y su AuthorConfig; las llaves de session_state salen del
+# registro (chhcore/registry.py), así que cada página conserva las suyas.
+
+import random
+import weakref
+
+from langchain_community.chat_message_histories import StreamlitChatMessageHistory
+
+from answer_cache import cached_documents, lookup_answer, replay_answer, serialize_documents
+from chat_history_store import MESSAGE_TABLE_NAME, AppendOnlyDynamoDBChatMessageHistory, SessionHistoryCache
+from chunk_store import get_chunk_store
+from generation_service import get_generation_service
+from history_window import HISTORY_TOKEN_BUDGET, get_summarizer, to_chat_messages, update_rolling_summary
+from presigned_urls import presigned_urls_for
+from prompt_cache import PromptCacheUsage
+from semantic_cache import get_semantic_cache
+from sidebar_history import history_html
+from stream_renderer import StreamingMarkdown
+from transcript import lazy_expander, render_transcript
+from lazy_imports import lazy_module
+from turn_timing import TurnTimer
+
+from chhcore.messages import extract_citations, format_citations, format_message, session_messages
+from chhcore.registry import AUTHORS, AuthorConfig
+
+# La cadena solo hace falta al responder (ver lazy_imports.py)
+pipeline = lazy_module("chhcore.pipeline")
+
+
+# Sugerencias que se muestran por sesión
+SUGGESTION_COUNT = 4
+
+
+def render_header(st, author: AuthorConfig):
+    """Título de la página y sugerencias de preguntas (elegidas una vez por sesión)."""
+    st.subheader(f"{author.title} 🔗", divider="rainbow")
+
+    if author.suggestions_key not in st.session_state:
+        st.session_state[author.suggestions_key] = random.sample(list(author.questions), SUGGESTION_COUNT)
+
+    # Mostrar los botones de sugerencias
+    st.markdown("##### 💬 Sugerencias de preguntas")
+    cols = st.columns(SUGGESTION_COUNT)
+    for i, question in enumerate(st.session_state[author.suggestions_key]):
+        with cols[i]:
+            if st.button(question, key=f"{author.suggestions_prefix}_q_{i}"):
+                st.session_state["suggested_prompt"] = question
+                st.rerun()
+
+
+def render_citations(st, documents) -> list:
+    """Muestra las referencias en un expander y las devuelve con el formato que guarda format_message."""
+    formatted_citations = format_citations(extract_citations(documents))
+    # Las fuentes de toda la respuesta se firman de una vez (ver presigned_urls.py)
+    urls = presigned_urls_for(citation["metadata"]["uri"] for citation in formatted_citations)
+    with st.expander("Mostrar referencias >"):
+        for citation in formatted_citations:
+            st.write("**Contenido:** ", citation["page_content"])
+            key = citation["metadata"]["source"]
+            if not citation["metadata"]["uri"]:
+                st.write("**Fuente:** No disponible")
+            elif urls.get(citation["metadata"]["uri"]):
+                st.write(f"**Fuente**: [{key}]({urls[citation['metadata']['uri']]}) ")
+            else:
+                st.write(f"**Fuente**: *{key}* ")
+            st.write("--------------")
+    return formatted_citations
+
+
+def render_sidebar(st, author: AuthorConfig, history, history_cache):
+    """Historial de la barra lateral y carga de los mensajes de la sesión (una vez por sesión)."""
+    with st.sidebar:
+        st.divider()
+        st.title(f"{author.title} 🔗")
+
+        # Llenando el history local (esto es lo que se envía al LLM, sin referencias)
+        fill_history(history, history_cache)
+
+        # Collapsed por defecto: el historial solo se dibuja con el expander abierto.
+        # El rerun al abrirlo no corta una respuesta en curso: sigue desde lo ya generado
+        history_expander, history_open = lazy_expander(st, "Ver historial de conversación", author.sidebar_history_key)
+        if history_open:
+            with history_expander:
+                # Un solo st.markdown; el HTML se arma una vez por mensaje (ver sidebar_history.py)
+                st.markdown(history_html(history_cache.messages(), author.assistant_label), unsafe_allow_html=True)
+
+        st.divider()
+
+        # Llenando el session_state local con los mensajes guardados en DynamoDB
+        if author.messages_key not in st.session_state:
+            st.session_state[author.messages_key] = session_messages(history_cache.messages())
+
+
+class PendingAnswer:
+    """
+    Pregunta de la página que se está respondiendo, guardada en session_state.
+    La generación y el guardado del turno siguen aunque el script se interrumpa
+    (rerun, expander, otra pregunta); se cancela al salir de la página o cuando
+    Streamlit descarta la sesión.
+    """
+
+    def __init__(self, prompt: str, job):
+        self.prompt = prompt
+        self.job = job
+        # El job no apunta a este objeto: al descartarse el session_state se cancela
+        weakref.finalize(self, job.cancel).atexit = False
+
+
+def save_turn(author: AuthorConfig, history_cache, prompt: str, response: str, formatted_citations: list) -> dict:
+    """Guarda el turno en DynamoDB; devuelve el mensaje del asistente para session_state."""
+    human_message = format_message(prompt, "human")
+    # Crear el mensaje del asistente con citas; el texto de cada fragmento se guarda
+    # una sola vez en la tabla de fragmentos y el mensaje lleva su hash (ver chunk_store.py)
+    chunk_store = get_chunk_store()
+    refs, pending_chunks = chunk_store.prepare_citations(formatted_citations)
+    ai_message = format_message(response, "ai", refs)
+
+    # Ambos mensajes del turno y los fragmentos nuevos se guardan en una sola
+    # transacción; si otra pestaña escribió en la misma sesión, el turno se
+    # agrega después de sus mensajes
+    concurrent_write = history_cache.commit_turn(human_message, ai_message,
+                                                 extra_items=chunk_store.transact_items(pending_chunks))
+    chunk_store.stored(pending_chunks)
+
+    return {
+        "concurrent_write": concurrent_write,
+        # session_state con referencias
+        "message": {
+            "role": "assistant",
+            "content": response,
+            "id": ai_message["data"]["id"],
+            "citations": formatted_citations,
+        },
+    }
+
+
+def turn_saver(author: AuthorConfig, history_cache, prompt: str, cache_usage, first_turn: bool):
+    """on_complete del job: arma la respuesta con los chunks recibidos y guarda el turno."""
+    # Corre en el servicio de generación, sin st.session_state: la copia del
+    # historial comparte la entrada de la sesión (ver SessionHistoryCache.detached)
+    history_cache = history_cache.detached()
+    version = pipeline.answers_version(author)
+
+    def _save(job) -> dict:
+        timer = TurnTimer(start=job.submitted)
+        full_response = ""
+        full_context = []
+        for arrival, chunk in job.received():
+            if "context" in chunk:
+                timer.mark("context", arrival)
+                full_context = chunk["context"]
+            if "response" in chunk:
+                timer.mark("first_token", arrival)
+                full_response += chunk["response"]
+        # Tiempo hasta el contexto / primer token / fin de la respuesta de esta pregunta
+        latency = timer.report()
+
+        saved = save_turn(author, history_cache, prompt, full_response,
+                          format_citations(extract_citations(full_context)))
+        if first_turn:
+            get_semantic_cache().store(author.knowledge_base_id, prompt, full_response,
+                                       serialize_documents(full_context), version)
+        return {**saved, "latency": latency, "prompt_cache": cache_usage.report}
+
+    return _save
+
+
+def show_saved(st, author: AuthorConfig, history_cache, saved: dict):
+    """Agrega la respuesta guardada al chat de la página."""
+    if saved["concurrent_write"]:
+        # El session_state ya no refleja DynamoDB: se recarga en el próximo rerun
+        history_cache.invalidate()
+        st.session_state.pop(author.messages_key, None)
+        return
+    st.session_state[author.messages_key].append(saved["message"])
+    # Los turnos que ya no caben en la ventana se integran al resumen de la sesión,
+    # en el servicio de generación: la respuesta ya está en pantalla y un error
+    # del resumen solo queda en el log
+    get_generation_service().run_background(
+        update_rolling_summary, history_cache.detached(), get_summarizer(author.model_id), HISTORY_TOKEN_BUDGET)
+
+
+def drop_pending(st, author: AuthorConfig):
+    """Quita la pregunta en curso de la página; el chat se vuelve a leer de DynamoDB."""
+    pending = st.session_state.pop(author.pending_answer_key, None)
+    if pending is not None:
+        pending.job.cancel()
+        st.session_state.pop(author.messages_key, None)
+
+
+def answer_from_cache(st, author: AuthorConfig, prompt: str, cached_answer: dict, history_cache):
+    """Respuesta precalculada o de la caché semántica: sin retrieval ni modelo."""
+    timer = TurnTimer("cache")
+    with st.chat_message("assistant"):
+        placeholder = StreamingMarkdown(st.container())
+        references = st.container()
+        full_context = cached_documents(cached_answer)
+        timer.mark("context")
+        with references:
+            formatted_citations = render_citations(st, full_context)
+        # El turno se guarda antes de simular el streaming: un rerun a mitad no lo pierde
+        show_saved(st, author, history_cache,
+                   save_turn(author, history_cache, prompt, cached_answer["answer"], formatted_citations))
+        full_response = ""
+        for piece in replay_answer(cached_answer["answer"]):
+            timer.mark("first_token")
+            full_response += piece
+            placeholder.markdown(full_response)
+        st.session_state["render"] = placeholder.close()
+    st.session_state["prompt_cache"] = None
+    st.session_state["latency"] = timer.report()
+
+
+def stream_answer(st, author: AuthorConfig, pending: PendingAnswer, history_cache):
+    """
+    Muestra la respuesta en curso desde su primer chunk hasta que el turno queda
+    guardado. Si un rerun interrumpe el script, el siguiente vuelve a llamarla.
+    """
+    job = pending.job
+    with st.chat_message("assistant"):
+        # Dibuja la respuesta por tandas y reenvía solo el párrafo en curso (ver stream_renderer.py)
+        placeholder = StreamingMarkdown(st.container())
+        # Las referencias se muestran debajo de la respuesta apenas llega el contexto,
+        # mientras la respuesta sigue llegando
+        references = st.container()
+        full_response = ""
+        try:
+            for chunk in job.chunks():
+                if "context" in chunk:
+                    # Llega antes que el primer token: las referencias se muestran ya
+                    with references:
+                        render_citations(st, chunk["context"])
+                if "response" in chunk:
+                    full_response += chunk["response"]
+                    placeholder.markdown(full_response)
+                if "history_window" in chunk:
+                    # Tokens del historial que quedaron fuera de la ventana en esta pregunta
+                    st.session_state["history_window"] = chunk["history_window"]
+                if "dedup" in chunk:
+                    # Fragmentos unidos / duplicados que no llegan al prompt ni a las referencias
+                    st.session_state["dedup"] = chunk["dedup"]
+                if "rerank" in chunk:
+                    # Fragmentos y tokens de contexto que quitó el reranking
+                    st.session_state["rerank"] = chunk["rerank"]
+        except TimeoutError:
+            # El modelo dejó de responder: el turno no quedó en DynamoDB
+            drop_pending(st, author)
+            st.error("La respuesta tardó demasiado y se canceló. Vuelve a enviar tu pregunta.")
+            return
+        except Exception:
+            # La generación o el guardado fallaron: el turno no quedó en DynamoDB
+            drop_pending(st, author)
+            raise
+        # Última tanda pendiente; bytes de markdown enviados frente al render completo por chunk
+        st.session_state["render"] = placeholder.close()
+
+    # Espera en cola, duración y caracteres generados de esta pregunta
+    st.session_state["generation"] = job.report()
+    if job.result is None:
+        # Cancelada: no hay turno que mostrar
+        drop_pending(st, author)
+        return
+    st.session_state.pop(author.pending_answer_key, None)
+    st.session_state["prompt_cache"] = job.result["prompt_cache"]
+    st.session_state["latency"] = job.result["latency"]
+    show_saved(st, author, history_cache, job.result)
+
+
+def answer(st, author: AuthorConfig, prompt: str, from_suggestion: bool, history, chat_history, history_cache):
+    """Responde en streaming la pregunta; el turno se guarda en DynamoDB aunque el script se interrumpa."""
+    knowledge_base_id = author.knowledge_base_id
+    version = pipeline.answers_version(author)
+
+    # Primer turno de la sesión: respuesta precalculada (sugerencias) o de la caché
+    # semántica, sin retrieval ni modelo
+    first_turn = not history_cache.messages()
+    cached_answer = None
+    if first_turn and from_suggestion:
+        cached_answer = lookup_answer(knowledge_base_id, prompt, version)
+    if first_turn and not cached_answer:
+        cached_answer = get_semantic_cache().lookup(knowledge_base_id, prompt, version)
+    if cached_answer:
+        answer_from_cache(st, author, prompt, cached_answer, history_cache)
+        return
+
+    # Uso de tokens de entrada (leídos de la caché / sin caché) de esta pregunta
+    cache_usage = PromptCacheUsage()
+    config = {"configurable": {"chat_history": history}, "callbacks": [cache_usage]}
+    # La cadena corre en el servicio de generación (generation_service.py), que
+    # también guarda el turno al terminar; la pregunta queda en session_state
+    # para que el próximo rerun vuelva a mostrarla si este se interrumpe
+    job = get_generation_service().submit(
+        pipeline.get_chain_with_history(author),
+        {"question": prompt, author.history_key: chat_history, "summary": history_cache.summary()},
+        config,
+        on_complete=turn_saver(author, history_cache, prompt, cache_usage, first_turn),
+    )
+    pending = PendingAnswer(prompt, job)
+    st.session_state[author.pending_answer_key] = pending
+    stream_answer(st, author, pending, history_cache)
+
+
+def fill_history(history, history_cache):
+    """Llena el history local (lo que se envía al LLM, sin referencias) con los mensajes guardados."""
+    history.clear()
+    history.add_messages(to_chat_messages(history_cache.messages()))
+
+
+def run_chat(st, author: AuthorConfig):
+    """Chat de la página para el usuario autenticado (st.session_state.username)."""
+    history = StreamlitChatMessageHistory(key=author.chat_messages_key)
+
+    # Salir de una página cancela la respuesta que quedó en curso en ella
+    for other in AUTHORS.values():
+        if other.pending_answer_key != author.pending_answer_key:
+            drop_pending(st, other)
+
+    # Historial en DynamoDB: un item por mensaje (ver chat_history_store.py), con una copia en
+    # session_state leída una sola vez por sesión (st.session_state["dynamodb_stats"])
+    session_id = f"{st.session_state.username}-{author.session_suffix}"
+    chat_history = AppendOnlyDynamoDBChatMessageHistory(table_name=MESSAGE_TABLE_NAME, session_id=session_id)
+    history_cache = SessionHistoryCache(chat_history, st.session_state)
+
+    render_sidebar(st, author, history, history_cache)
+
+    # Mostrar historial de chat con referencias: solo los últimos turnos, las
+    # referencias se construyen al abrir su expander (ver transcript.py)
+    render_transcript(st, st.session_state[author.messages_key], author.messages_key)
+
+    prompt = st.chat_input("Escribe tu mensaje aquí...")
+
+    # Usar la pregunta sugerida si existe
+    from_suggestion = False
+    if not prompt and "suggested_prompt" in st.session_state:
+        prompt = st.session_state.pop("suggested_prompt")  # eliminarla tras usarla
+        from_suggestion = True
+
+    # Respuesta de un rerun anterior que sigue en curso: se vuelve a mostrar desde
+    # lo ya generado, y la pregunta nueva (si hay) espera a que termine
+    pending = st.session_state.get(author.pending_answer_key)
+    if pending is not None:
+        stream_answer(st, author, pending, history_cache)
+        if prompt:
+            fill_history(history, history_cache)
+
+    if prompt:
+        if author.messages_key not in st.session_state:
+            st.session_state[author.messages_key] = session_messages(history_cache.messages())
+        st.session_state[author.messages_key].append({"role": "user", "content": prompt})
+        with st.chat_message("user"):
+            st.write(prompt)
+        answer(st, author, prompt, from_suggestion, history, chat_history, history_cache)
@@ -0,0 +1,104 @@
+# ------------------------------------------------------
+# Elementos comunes de las páginas
+# ------------------------------------------------------
+# Menú de navegación, botón de imprimir, CSS que oculta el menú de Streamlit,
+# autenticador y cierre de sesión, que cada página tenía copiados.
+
+import os
+
+import streamlit.components.v1 as components
+import streamlit_authenticator as stauth
+import yaml
+from streamlit_cookies_controller import CookieController
+from yaml.loader import SafeLoader
+
+from chhcore.registry import AUTHORS
+
+
+# Usuarios del autenticador (CHH_USERS_CONFIG: otro archivo, p. ej. para startup_profile.py)
+USERS_CONFIG = os.environ.get("CHH_USERS_CONFIG", "userschh.yaml")
+
+HIDE_MENU_CSS = """
+    <style>
+        /* Ocultar el menú de los tres puntos */
+        #MainMenu {
+            visibility: hidden;
+        }
+
+        /* Ocultar el botón "Deploy" */
+        .stAppDeployButton {
+            visibility: hidden;
+        }
+    </style>
+    """
+
+PRINT_BUTTON_HTML = """
+        <style>
+            .btn-print {
+                background-color: #ffffff;
+                color: #262730;
+                border: 1px solid rgba(49, 51, 63, 0.2);
+                border-radius: 0.5rem;
+                padding: 0.45rem 1rem;
+                font-size: 1rem;
+                font-weight: 500;
+                cursor: pointer;
+                width: 100%;
+                transition: background-color 0.2s ease, box-shadow 0.2s ease;
+                box-shadow: 0 1px 2px rgba(0, 0, 0, 0.04);
+            }
+
+            .btn-print:hover {
+                background-color: #f0f2f6;
+                box-shadow: 0 2px 4px rgba(0, 0, 0, 0.06);
+            }
+        </style>
+
+        <button class="btn-print" onclick="window.top.print()">🖨️ Print</button>
+    """
+
+
+def hide_menu(st):
+    st.markdown(HIDE_MENU_CSS, unsafe_allow_html=True)
+
+
+def print_button(st):
+    with st.sidebar:
+        components.html(PRINT_BUTTON_HTML, height=50)
+
+
+def authenticated_menu(st):
+    # Mostrar un menú de navegación para usuarios autenticados (una entrada por autor del registro)
+    st.sidebar.success(f"Usuario: {st.session_state.username}")
+    for author in AUTHORS.values():
+        st.sidebar.page_link(author.page, label=author.title)
+
+
+def load_users(path: str = USERS_CONFIG) -> dict:
+    with open(path) as file:
+        return yaml.load(file, Loader=SafeLoader)
+
+
+def save_users(config: dict, path: str = USERS_CONFIG):
+    # Guardar la nueva configuración (usuarios registrados, logins con Google)
+    with open(path, "w") as file:
+        yaml.dump(config, file, default_flow_style=False)
+
+
+def create_authenticator(config: dict):
+    return stauth.Authenticate(
+        config['credentials'],
+        config['cookie']['name'],
+        config['cookie']['key'],
+        config['cookie']['expiry_days']
+    )
+
+
+def logout_callback(st, cookie_key: str):
+    """Callback de authenticator.logout: avisa del cierre y borra la cookie del usuario de la página."""
+    def callbackclear(params=None):
+        controller = CookieController(key=cookie_key)
+        st.success("Sesión cerrada correctamente")
+        st.markdown("<br>" * 63, unsafe_allow_html=True)
+        controller.remove('id_usuario')
+    return callbackclear
@@ -0,0 +1,96 @@
+# ------------------------------------------------------
+# Mensajes guardados y citas
+# ------------------------------------------------------
+# format_message es el formato con el que se guarda cada mensaje en DynamoDB
+# (ver chat_history_store.py y message_codec.py); Citation / extract_citations
+# y format_citations convierten los documentos de la KB en las citas que se
+# muestran y se guardan con la respuesta.
+
+import uuid
+from typing import Dict, List
+
+from pydantic import BaseModel
+
+from presigned_urls import parse_s3_uri
+
+
+# Primer mensaje de una sesión sin historial
+GREETING = "Pregúntame sobre economía"
+
+
+# Función para crear el formato de mensaje
+def format_message(content, message_type="human", citations=None):
+    """Crea un mensaje formateado con la estructura deseada."""
+    data = {
+        "additional_kwargs": {},
+        "content": content,
+        "example": False,
+        "id": str(uuid.uuid4()),  # Genera un ID único para cada mensaje
+        "name": None,
+        "response_metadata": {},
+        "type": message_type,
+    }
+
+    # Campos específicos para mensajes del asistente (AI)
+    if message_type == "ai":
+        data.update({
+            "invalid_tool_calls": [],
+            "tool_calls": [],
+            "usage_metadata": None,
+        })
+
+    # Añadir citas si existen
+    if citations:
+        data["citations"] = citations
+
+    return {"data": data, "type": message_type}
+
+
+# ------------------------------------------------------
+# Pydantic data model and helper function for Citations
+
+class Citation(BaseModel):
+    page_content: str
+    metadata: Dict
+
+
+def extract_citations(response: List[Dict]) -> List[Citation]:
+    return [Citation(page_content=doc.page_content, metadata=doc.metadata) for doc in response]
+
+
+def citation_uri(metadata: dict) -> str:
+    """URI de S3 de la fuente de un documento de la KB ("" si no la trae)."""
+    location = metadata.get("location") or {}
+    return location.get("s3Location", {}).get("uri", "")
+
+
+def format_citations(citations: List[Citation]) -> list:
+    """Citas con el formato que guarda format_message: contenido y {source, score, uri}."""
+    formatted = []
+    for citation in citations:
+        uri = citation_uri(citation.metadata)
+        formatted.append({
+            "page_content": citation.page_content,
+            "metadata": {
+                "source": parse_s3_uri(uri)[1] if uri else "",
+                "score": str(citation.metadata["score"]) if uri else "",
+                "uri": uri,
+            },
+        })
+    return formatted
+
+
+def session_messages(stored_messages) -> list:
+    """Mensajes guardados -> mensajes del chat en session_state (rol user / assistant, con sus citas)."""
+    if not stored_messages:
+        # Si no hay historial, mostrar mensaje inicial del asistente
+        return [{"role": "assistant", "content": GREETING}]
+    return [
+        {
+            "role": "user" if msg["data"]["type"] == "human" else "assistant",
+            "content": msg["data"]["content"],
+            "id": msg["data"].get("id"),
+            "citations": msg["data"].get("citations", []),
+        }
+        for msg in stored_messages
+    ]
@@ -0,0 +1,103 @@
+# ------------------------------------------------------
+# Cadena RAG de un autor
+# ------------------------------------------------------
+# La misma cadena que armaba cada página, construida desde su AuthorConfig:
+#
+#   ventana del historial | retrieval en paralelo | dedup | rerank | prompt | modelo
+#
+# Se registra una vez por proceso con la misma llave que usaban las páginas
+# (aws_resources.get_chain), así que la comparten todas las sesiones.
+
+from operator import itemgetter
+
+from langchain_core.output_parsers import StrOutputParser
+from langchain_core.runnables import RunnableParallel
+from langchain_core.runnables.history import RunnableWithMessageHistory
+
+from answer_cache import answer_cache_version
+from aws_resources import get_chain, get_chat_model, get_retriever
+from dedup import deduplicator
+from federated_retriever import get_federated_retriever
+from generation_service import CHAT_HISTORY_CONFIG
+from history_window import HISTORY_TOKEN_BUDGET, history_window
+from prompt_cache import create_cached_prompt_template, prompt_cache_enabled
+from rerank import reranker
+from retrieval_cache import get_cached_retriever
+
+from chhcore.registry import AuthorConfig
+
+
+def get_author_retriever(author: AuthorConfig, cached: bool = True):
+    """Retriever de la KB del autor, o el federado si la página consulta varias KB."""
+    if author.knowledge_bases:
+        return get_federated_retriever(author.knowledge_bases, number_of_results=author.number_of_results,
+                                       per_author_quota=author.per_author_quota)
+    if cached:
+        # Guarda los documentos por pregunta (ver retrieval_cache.py)
+        return get_cached_retriever(author.knowledge_base_id, number_of_results=author.number_of_results)
+    return get_retriever(author.knowledge_base_id, number_of_results=author.number_of_results)
+
+
+# Instrucciones fijas como prefijo (cacheable) y base de conocimientos como sufijo (ver prompt_cache.py)
+def create_prompt_template(author: AuthorConfig):
+    return create_cached_prompt_template(author.system_prompt, author.history_key,
+                                         cache_prefix=prompt_cache_enabled(author.model_id))
+
+
+def build_chain(author: AuthorConfig):
+    retriever = get_author_retriever(author)
+    model = get_chat_model(author.model_id, author.model_kwargs)
+    prompt = create_prompt_template(author)
+
+    # El historial se recorta a un presupuesto de tokens antes de llegar al prompt;
+    # los fragmentos recuperados se compactan (dedup.py), reordenan y recortan (rerank.py)
+    return (
+        history_window(author.history_key, HISTORY_TOKEN_BUDGET)
+        | RunnableParallel({
+            "context": itemgetter("question") | retriever,
+            "question": itemgetter("question"),
+            author.history_key: itemgetter(author.history_key),
+            "history_window": itemgetter("history_window"),
+        })
+        | deduplicator()
+        | reranker(author.rerank_settings)
+        .assign(response = prompt | model | StrOutputParser())
+        .pick(["response", "context", "history_window", "dedup", "rerank"])
+    )
+
+
+def _chain_key(author: AuthorConfig, name: str) -> tuple:
+    return (name, author.knowledge_base_id, author.model_id, author.model_kwargs, HISTORY_TOKEN_BUDGET,
+            prompt_cache_enabled(author.model_id), author.rerank_settings)
+
+
+def get_author_chain(author: AuthorConfig):
+    return get_chain(_chain_key(author, author.chain_name), lambda: build_chain(author))
+
+
+def get_chain_with_history(author: AuthorConfig):
+    """
+    Cadena con historial. El historial de la sesión actual llega en la config de
+    cada llamada ({"configurable": {"chat_history": ...}}), por eso la cadena
+    envuelta también se comparte entre sesiones y corre en los hilos del
+    servicio de generación (ver generation_service.py).
+    """
+    return get_chain(
+        _chain_key(author, f"{author.chain_name}_with_history"),
+        lambda: RunnableWithMessageHistory(
+            get_author_chain(author),
+            lambda chat_history: chat_history,
+            input_messages_key="question",
+            history_messages_key=author.history_key,
+            output_messages_key="response",
+            history_factory_config=CHAT_HISTORY_CONFIG,
+        ),
+    )
+
+
+def answers_version(author: AuthorConfig) -> str:
+    """Versión de las respuestas precalculadas de la página (ver warm_answer_cache.py)."""
+    return answer_cache_version(author.knowledge_base_id, author.model_id, author.model_kwargs, author.system_prompt,
+                                number_of_results=author.number_of_results,
+                                per_author_quota=author.per_author_quota if author.knowledge_bases else None,
+                                rerank_settings=author.rerank_settings)
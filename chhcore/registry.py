@@ -0,0 +1,134 @@
+# ------------------------------------------------------
+# Registro de autores
+# ------------------------------------------------------
+# Cada página de chat (app_autores2.py, pages/*.py y las variantes de login)
+# tenía su copia del modelo, la KB, el system prompt, las sugerencias y las
+# llaves de session_state. Ahora salen de authors.yaml (o del archivo en
+# CHH_AUTHORS_CONFIG), que se lee una sola vez por proceso al importar el
+# módulo. Los prompts están en prompts/ tal como estaban en las páginas: la
+# versión de las respuestas precalculadas (answer_cache.py) depende del texto
+# exacto.
+
+import os
+from dataclasses import dataclass
+from typing import Dict, Optional, Tuple
+
+import yaml
+
+from federated_retriever import federated_knowledge_base_id
+
+
+AUTHORS_CONFIG = os.environ.get(
+    "CHH_AUTHORS_CONFIG", os.path.join(os.path.dirname(os.path.abspath(__file__)), "authors.yaml")
+)
+
+
+@dataclass(frozen=True)
+class AuthorConfig:
+    """Configuración de una página de chat (un autor o varios en paralelo)."""
+
+    key: str
+    title: str
+    page: str
+    model_id: str
+    model_kwargs: dict
+    knowledge_base_id: str  # en páginas federadas, la llave compuesta de sus KB
+    system_prompt: str
+    session_suffix: str
+    state_suffix: str
+    chain_name: str
+    suggestions_prefix: str
+    questions: Tuple[str, ...]
+    knowledge_bases: Optional[Dict[str, str]] = None
+    rerank_settings: Optional[dict] = None
+    cookie_key: Optional[str] = None
+    number_of_results: int = 20
+    per_author_quota: int = 10
+
+    # Llaves de session_state de la página (sufijo "" en la principal, 1/2/3 en pages/)
+    @property
+    def history_key(self) -> str:
+        return f"history{self.state_suffix}"
+
+    @property
+    def messages_key(self) -> str:
+        return f"messages{self.state_suffix}"
+
+    @property
+    def chat_messages_key(self) -> str:
+        return f"chat_messages{self.state_suffix}"
+
+    @property
+    def sidebar_history_key(self) -> str:
+        return f"sidebar_history{self.state_suffix}"
+
+    @property
+    def pending_answer_key(self) -> str:
+        return f"pending_answer{self.state_suffix}"
+
+    @property
+    def suggestions_key(self) -> str:
+        return f"{self.suggestions_prefix}_suggested_questions"
+
+    @property
+    def assistant_label(self) -> str:
+        return f"Chatbot ({self.title})"
+
+
+def _read_prompt(config_path: str, name: str) -> str:
+    path = os.path.join(os.path.dirname(config_path), "prompts", name)
+    with open(path, encoding="utf-8", newline="") as file:
+        return file.read()
+
+
+def load_registry(path: str = AUTHORS_CONFIG) -> dict:
+    """Lee el archivo de autores: {"model_id", "model_kwargs", "authors": {llave: AuthorConfig}}."""
+    with open(path, encoding="utf-8") as file:
+        config = yaml.safe_load(file)
+
+    model = config["model"]
+    entries = config["authors"]
+    authors = {}
+    for key, entry in entries.items():
+        questions = list(entry.get("questions", []))
+        for other in entry.get("questions_from", []):
+            questions.extend(entries[other].get("questions", []))
+
+        knowledge_bases = entry.get("knowledge_bases")
+        authors[key] = AuthorConfig(
+            key=key,
+            title=entry["title"],
+            page=entry["page"],
+            model_id=entry.get("model_id", model["model_id"]),
+            model_kwargs=entry.get("model_kwargs", model["model_kwargs"]),
+            knowledge_base_id=(
+                federated_knowledge_base_id(knowledge_bases) if knowledge_bases else entry["knowledge_base_id"]
+            ),
+            system_prompt=_read_prompt(path, entry["prompt"]),
+            session_suffix=entry["session_suffix"],
+            state_suffix=str(entry.get("state_suffix", "")),
+            chain_name=entry.get("chain_name", key),
+            suggestions_prefix=entry.get("suggestions_prefix", key),
+            questions=tuple(questions),
+            knowledge_bases=knowledge_bases,
+            rerank_settings=entry.get("rerank"),
+            cookie_key=entry.get("cookie_key"),
+            number_of_results=entry.get("number_of_results", 20),
+            per_author_quota=entry.get("per_author_quota", 10),
+        )
+    return {"model_id": model["model_id"], "model_kwargs": model["model_kwargs"], "authors": authors}
+
+
+_registry = load_registry()
+
+MODEL_ID = _registry["model_id"]
+MODEL_KWARGS = _registry["model_kwargs"]
+# Llave -> AuthorConfig, en el orden del archivo (el del menú de la barra lateral)
+AUTHORS = _registry["authors"]
+
+
+def get_author(key: str) -> AuthorConfig:
+    try:
+        return AUTHORS[key]
+    except KeyError:
+        raise KeyError(f"Autor desconocido: {key} (autores: {', '.join(AUTHORS)})") from None
@@ -0,0 +1,275 @@
+# ------------------------------------------------------
+# Fragmentos citados guardados una sola vez (direccionados por contenido)
+# ------------------------------------------------------
+# Cada respuesta guardada con format_message(full_response, "ai", citations)
+# llevaba el page_content completo de sus ~20 fragmentos, y los fragmentos más
+# populares se repetían en miles de sesiones. Ahora el mensaje guarda solo
+# referencias:
+#
+#   {"ref": <sha256 del contenido>, "metadata": {"source": ..., "score": ...}}
+#
+# y el texto vive una vez en CHHChunkTable:
+#   ChunkHash (S, partition key) -> hash del contenido
+#   Content   (S)                -> page_content
+#   Source    (S)                -> fuente del primer mensaje que lo citó
+#
+# Los fragmentos nuevos de una respuesta se escriben en la misma transacción que
+# el turno (commit_turn(..., extra_items=store.transact_items(pending))).
+# La UI resuelve el texto solo al abrir las referencias de un mensaje, con un
+# BatchGetItem por mensaje y un LRU del proceso. Las citas antiguas (con
+# page_content) se leen igual. CHH_CHUNK_STORE=off vuelve a guardar el texto.
+#
+#   python chunk_store.py --create-table
+#   python chunk_store.py --compact --dry-run      # mide el ahorro en CHHMessageTable
+#   python chunk_store.py --compact
+
+import argparse
+import hashlib
+import json
+import logging
+import os
+import threading
+from collections import OrderedDict
+
+from aws_resources import get_dynamodb_resource, get_dynamodb_table, get_or_create
+from message_codec import decode_item, encode_message
+from metrics import counters, register_gauge
+
+
+CHUNK_TABLE_NAME = os.environ.get("CHH_CHUNK_TABLE", "CHHChunkTable")
+CHUNK_STORE_ENABLED = os.environ.get("CHH_CHUNK_STORE", "on").lower() != "off"
+CHUNK_CACHE_SIZE = int(os.environ.get("CHH_CHUNK_CACHE_SIZE", "4096"))
+
+# Límite de llaves por BatchGetItem
+BATCH_GET_LIMIT = 100
+# Fragmentos por transacción de turno: TransactWriteItems admite 100 items y el
+# turno ya usa 3 (cabecera, pregunta y respuesta)
+TRANSACT_CHUNK_LIMIT = 97
+MISSING_CHUNK = "(Fragmento no disponible)"
+
+logger = logging.getLogger(__name__)
+
+
+def create_chunk_table(dynamodb, table_name: str = CHUNK_TABLE_NAME):
+    """Crea la tabla de fragmentos (on-demand) y espera a que esté activa."""
+    table = dynamodb.create_table(
+        TableName=table_name,
+        KeySchema=[{"AttributeName": "ChunkHash", "KeyType": "HASH"}],
+        AttributeDefinitions=[{"AttributeName": "ChunkHash", "AttributeType": "S"}],
+        BillingMode="PAY_PER_REQUEST",
+    )
+    table.wait_until_exists()
+    return table
+
+
+def chunk_hash(page_content: str) -> str:
+    """128 bits del sha256 del contenido: suficiente contra colisiones y más corto en cada cita."""
+    return hashlib.sha256(page_content.encode("utf-8")).hexdigest()[:32]
+
+
+class ChunkStore:
+    """Tabla de fragmentos por hash con un LRU en memoria delante."""
+
+    def __init__(self, table_name: str = CHUNK_TABLE_NAME, cache_size: int = CHUNK_CACHE_SIZE):
+        self.table_name = table_name
+        self.cache_size = cache_size
+        self._cache = OrderedDict()  # hash -> contenido; también indica que ya está guardado
+        self._lock = threading.Lock()
+        self._metrics = counters("chunk_store", "hits", "misses", "batch_gets", "puts", "not_found")
+        register_gauge("chunk_store", self._gauge)
+
+    @property
+    def table(self):
+        return get_dynamodb_table(self.table_name)
+
+    def _remember(self, key: str, content: str):
+        with self._lock:
+            self._cache[key] = content
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+    def _cached(self, key: str):
+        with self._lock:
+            content = self._cache.get(key)
+            if content is not None:
+                self._cache.move_to_end(key)
+            return content
+
+    def prepare_citations(self, citations: list):
+        """
+        Referencias para format_message y los fragmentos {hash: item} que aún no
+        están en la tabla. No escribe nada: ver transact_items y compact_citations.
+        """
+        if not CHUNK_STORE_ENABLED or not citations:
+            return citations, {}
+
+        refs = []
+        pending = {}
+        for citation in citations:
+            if "ref" in citation:
+                refs.append(citation)
+                continue
+            key = chunk_hash(citation["page_content"])
+            if self._cached(key) is None:
+                pending[key] = {"ChunkHash": key, "Content": citation["page_content"],
+                                "Source": citation["metadata"].get("source", "")}
+            refs.append({"ref": key, "metadata": citation["metadata"]})
+        return refs, pending
+
+    def transact_items(self, pending: dict) -> list:
+        """
+        Updates para TransactWriteItems: los fragmentos de una respuesta se guardan
+        en la misma transacción que el turno (ver commit_turn), así no quedan
+        fragmentos huérfanos ni hace falta otra llamada a DynamoDB. if_not_exists
+        deja igual un fragmento que otra sesión ya guardó.
+        """
+        keys = list(pending)
+        if len(keys) > TRANSACT_CHUNK_LIMIT:
+            # No caben en la transacción: el resto se guarda antes, por separado
+            logger.warning("%d fragmentos no caben en la transacción del turno", len(keys) - TRANSACT_CHUNK_LIMIT)
+            self._put({key: pending[key] for key in keys[TRANSACT_CHUNK_LIMIT:]})
+            keys = keys[:TRANSACT_CHUNK_LIMIT]
+        return [{
+            "Update": {
+                "TableName": self.table_name,
+                "Key": {"ChunkHash": key},
+                # Source es palabra reservada de DynamoDB
+                "UpdateExpression": "SET Content = if_not_exists(Content, :c), #s = if_not_exists(#s, :s)",
+                "ExpressionAttributeNames": {"#s": "Source"},
+                "ExpressionAttributeValues": {":c": pending[key]["Content"], ":s": pending[key]["Source"]},
+            }
+        } for key in keys]
+
+    def stored(self, pending: dict):
+        """Registra los fragmentos ya confirmados en la tabla."""
+        for key, item in pending.items():
+            self._remember(key, item["Content"])
+        self._metrics.add(puts=len(pending))
+
+    def _put(self, pending: dict):
+        # El put es idempotente: el mismo hash siempre tiene el mismo contenido
+        with self.table.batch_writer(overwrite_by_pkeys=["ChunkHash"]) as batch:
+            for item in pending.values():
+                batch.put_item(Item=item)
+        self.stored(pending)
+
+    def compact_citations(self, citations: list) -> list:
+        """
+        Guarda el texto de las citas que aún no están en la tabla con BatchWriteItem
+        y devuelve las referencias (compactación de mensajes ya guardados).
+        """
+        refs, pending = self.prepare_citations(citations)
+        if pending:
+            self._put(pending)
+        return refs
+
+    def fetch(self, keys) -> dict:
+        """Contenido de cada hash: primero el LRU, el resto con BatchGetItem de a 100."""
+        found = {}
+        missing = []
+        for key in dict.fromkeys(keys):
+            content = self._cached(key)
+            if content is None:
+                missing.append(key)
+            else:
+                found[key] = content
+        self._metrics.add(hits=len(found), misses=len(missing))
+
+        resource = get_dynamodb_resource()
+        for start in range(0, len(missing), BATCH_GET_LIMIT):
+            request = {self.table_name: {
+                "Keys": [{"ChunkHash": key} for key in missing[start:start + BATCH_GET_LIMIT]],
+                "ProjectionExpression": "ChunkHash, Content",
+            }}
+            while request:
+                response = resource.batch_get_item(RequestItems=request)
+                self._metrics.add(batch_gets=1)
+                for item in response.get("Responses", {}).get(self.table_name, []):
+                    found[item["ChunkHash"]] = item["Content"]
+                    self._remember(item["ChunkHash"], item["Content"])
+                request = response.get("UnprocessedKeys") or None
+
+        not_found = len(set(missing) - set(found))
+        if not_found:
+            self._metrics.add(not_found=not_found)
+            logger.warning("%d fragmentos citados no están en %s", not_found, self.table_name)
+        return found
+
+    def resolve(self, citations: list) -> list:
+        """Citas con page_content: resuelve las referencias, deja igual las citas antiguas."""
+        contents = self.fetch(c["ref"] for c in citations if "ref" in c)
+        return [
+            {"page_content": contents.get(c["ref"], MISSING_CHUNK), "metadata": c["metadata"]}
+            if "ref" in c else c
+            for c in citations
+        ]
+
+    def _gauge(self) -> dict:
+        with self._lock:
+            return {"entries": len(self._cache)}
+
+
+def get_chunk_store() -> ChunkStore:
+    return get_or_create("chunk_store", CHUNK_TABLE_NAME, lambda: ChunkStore(CHUNK_TABLE_NAME))
+
+
+# ------------------------------------------------------
+# Compactación de los mensajes ya guardados
+
+def compact_message_table(message_table, store: ChunkStore, dry_run: bool = False):
+    """Reescribe las respuestas guardadas con citas completas como referencias."""
+    kwargs = {}
+    messages = 0
+    bytes_before = 0
+    bytes_after = 0
+    while True:
+        response = message_table.scan(**kwargs)
+        for item in response.get("Items", []):
+            if int(item["MessageSeq"]) == 0:
+                continue  # cabecera de la sesión
+            message = decode_item(item)
+            data = message["data"]
+            citations = data.get("citations") or []
+            if not any("page_content" in c for c in citations):
+                continue
+            if dry_run:
+                refs = [{"ref": chunk_hash(c["page_content"]), "metadata": c["metadata"]} if "page_content" in c else c
+                        for c in citations]
+            else:
+                refs = store.compact_citations(citations)
+            bytes_before += len(json.dumps(message, ensure_ascii=False, default=str).encode("utf-8"))
+            data["citations"] = refs
+            bytes_after += len(json.dumps(message, ensure_ascii=False, default=str).encode("utf-8"))
+            messages += 1
+            if not dry_run:
+                # Se reescribe en el formato compacto (ver message_codec.py)
+                message_table.put_item(Item={"SessionId": item["SessionId"], "MessageSeq": item["MessageSeq"],
+                                             **encode_message(message)})
+        if "LastEvaluatedKey" not in response:
+            break
+        kwargs["ExclusiveStartKey"] = response["LastEvaluatedKey"]
+    return {"messages": messages, "bytes_before": bytes_before, "bytes_after": bytes_after}
+
+
+def main():
+    from chat_history_store import MESSAGE_TABLE_NAME
+
+    parser = argparse.ArgumentParser(description="Tabla de fragmentos citados y compactación del historial")
+    parser.add_argument("--create-table", action="store_true", help=f"Crea {CHUNK_TABLE_NAME}")
+    parser.add_argument("--compact", action="store_true", help="Reemplaza las citas completas guardadas por referencias")
+    parser.add_argument("--dry-run", action="store_true", help="Con --compact, solo mide el ahorro")
+    parser.add_argument("--messages-table", default=MESSAGE_TABLE_NAME)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s %(message)s")
+    dynamodb = get_dynamodb_resource()
+    if args.create_table:
+        create_chunk_table(dynamodb)
+    if args.compact:
+        report = compact_message_table(dynamodb.Table(args.messages_table), get_chunk_store(), dry_run=args.dry_run)
+        logging.info("%(messages)d respuestas, %(bytes_before)d -> %(bytes_after)d bytes", report)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,193 @@
+# ------------------------------------------------------
+# Eliminación de fragmentos casi duplicados antes del prompt
+# ------------------------------------------------------
+# La KB devuelve a menudo fragmentos que se solapan: el mismo pasaje indexado
+# dos veces, o fragmentos contiguos del mismo documento que comparten texto por
+# el solapamiento del chunking. Esta etapa va justo después del retriever (antes
+# del reranking y del prompt, y por lo tanto antes de formatted_citations):
+#
+#   1. fragmentos contiguos de la misma fuente (s3Location.uri) cuyo final y
+#      comienzo coinciden se unen en uno solo;
+#   2. de cada grupo de casi duplicados (Jaccard estimado por MinHash sobre
+#      shingles de palabras, o un fragmento contenido en otro) se conserva el
+#      de mejor puntuación.
+#
+# CHH_DEDUP=off la desactiva. El reporte sale de la cadena en la llave "dedup".
+
+import functools
+import logging
+import os
+import re
+import unicodedata
+import zlib
+
+from langchain_core.documents import Document
+from langchain_core.runnables import RunnableLambda
+
+from history_window import approx_token_count
+from lazy_imports import lazy_module
+from metrics import counters
+
+# numpy solo se importa al deduplicar la primera respuesta (ver lazy_imports.py)
+np = lazy_module("numpy")
+
+
+DEDUP_ENABLED = os.environ.get("CHH_DEDUP", "on").lower() != "off"
+
+SHINGLE_SIZE = 5
+NUM_PERMUTATIONS = 64
+
+# Jaccard estimado a partir del cual dos fragmentos se consideran el mismo pasaje
+DUPLICATE_THRESHOLD = 0.8
+# Proporción de los shingles de un fragmento presentes en otro para considerarlo contenido
+CONTAINMENT_THRESHOLD = 0.9
+# Palabras mínimas compartidas entre el final de un fragmento y el comienzo del siguiente
+MIN_OVERLAP_WORDS = 8
+
+# Hash universal (a * x + b) mod p con p primo de Mersenne; a * x cabe en uint64
+_PRIME = (1 << 31) - 1
+
+_WORD_RE = re.compile(r"\w+", re.UNICODE)
+
+logger = logging.getLogger(__name__)
+
+_metrics = counters("dedup", "requests", "duplicates", "merged", "tokens_saved")
+
+
+def words(text: str) -> list:
+    text = unicodedata.normalize("NFKD", text.casefold())
+    return _WORD_RE.findall("".join(c for c in text if not unicodedata.combining(c)))
+
+
+def shingles(text: str, size: int = SHINGLE_SIZE) -> set:
+    tokens = words(text)
+    if len(tokens) <= size:
+        return {" ".join(tokens)} if tokens else set()
+    return {" ".join(tokens[i:i + size]) for i in range(len(tokens) - size + 1)}
+
+
+@functools.lru_cache(maxsize=1)
+def _permutations():
+    """Coeficientes (a, b) de las permutaciones; se generan al primer uso."""
+    rng = np.random.default_rng(1899)  # semilla fija: firmas comparables entre procesos
+    return (rng.integers(1, _PRIME, NUM_PERMUTATIONS, dtype=np.uint64),
+            rng.integers(0, _PRIME, NUM_PERMUTATIONS, dtype=np.uint64))
+
+
+def minhash(shingle_set: set):
+    """Firma MinHash: el mínimo de cada permutación universal sobre los hashes de los shingles."""
+    if not shingle_set:
+        return np.full(NUM_PERMUTATIONS, _PRIME, dtype=np.uint64)
+    a, b = _permutations()
+    hashes = np.fromiter((zlib.crc32(s.encode("utf-8")) for s in shingle_set), dtype=np.uint64)
+    return ((hashes[:, None] * a + b) % _PRIME).min(axis=0)
+
+
+def estimated_jaccard(signature_a, signature_b) -> float:
+    return float(np.mean(signature_a == signature_b))
+
+
+def source_key(doc: Document) -> str:
+    location = doc.metadata.get("location") or {}
+    return (location.get("s3Location") or {}).get("uri") or doc.metadata.get("source") or ""
+
+
+def _overlap(first: str, second: str) -> int:
+    """
+    Caracteres al comienzo de second que repiten el final de first, o 0 si el
+    solapamiento tiene menos de MIN_OVERLAP_WORDS palabras.
+    """
+    tail = first.split()
+    head = second.split()
+    if len(head) < MIN_OVERLAP_WORDS:
+        return 0
+    start = head[:MIN_OVERLAP_WORDS]
+    for j in range(max(len(tail) - len(head), 0), len(tail) - MIN_OVERLAP_WORDS + 1):
+        if tail[j:j + MIN_OVERLAP_WORDS] == start and tail[j:] == head[:len(tail) - j]:
+            # Posición en second después de las palabras repetidas
+            return re.match(r"\s*(?:\S+\s+){%d}" % (len(tail) - j), second + " ").end()
+    return 0
+
+
+def merge_adjacent(documents: list):
+    """Une fragmentos de la misma fuente cuando uno continúa al otro. Devuelve (documentos, unidos)."""
+    merged = []
+    count = 0
+    for doc in documents:
+        key = source_key(doc)
+        for i, kept in enumerate(merged):
+            if not key or source_key(kept) != key:
+                continue
+            overlap = _overlap(kept.page_content, doc.page_content)
+            if overlap:
+                text = kept.page_content.rstrip() + " " + doc.page_content[overlap:]
+            else:
+                overlap = _overlap(doc.page_content, kept.page_content)
+                if not overlap:
+                    continue
+                text = doc.page_content.rstrip() + " " + kept.page_content[overlap:]
+            metadata = {**kept.metadata, "merged_chunks": kept.metadata.get("merged_chunks", 1) + 1}
+            merged[i] = Document(page_content=text.strip(), metadata=metadata)
+            count += 1
+            break
+        else:
+            merged.append(doc)
+    return merged, count
+
+
+def deduplicate_documents(documents: list):
+    """
+    Une fragmentos contiguos y quita casi duplicados conservando el orden (el
+    retriever entrega primero los de mejor puntuación). Devuelve (documentos, reporte).
+    """
+    tokens_before = sum(approx_token_count(doc.page_content) for doc in documents)
+    documents, merged = merge_adjacent(list(documents))
+
+    kept = []
+    signatures = []
+    duplicates = 0
+    for doc in documents:
+        doc_shingles = shingles(doc.page_content)
+        signature = minhash(doc_shingles)
+        duplicate = False
+        for (kept_shingles, kept_signature) in signatures:
+            if estimated_jaccard(signature, kept_signature) >= DUPLICATE_THRESHOLD:
+                duplicate = True
+            elif doc_shingles and len(doc_shingles & kept_shingles) / len(doc_shingles) >= CONTAINMENT_THRESHOLD:
+                duplicate = True
+            if duplicate:
+                break
+        if duplicate:
+            duplicates += 1
+            continue
+        kept.append(doc)
+        signatures.append((doc_shingles, signature))
+
+    tokens_after = sum(approx_token_count(doc.page_content) for doc in kept)
+    report = {
+        "candidates": len(documents) + merged,
+        "merged": merged,
+        "duplicates": duplicates,
+        "kept": len(kept),
+        "tokens_saved": tokens_before - tokens_after,
+    }
+    return kept, report
+
+
+def _record(report):
+    _metrics.add(requests=1, duplicates=report["duplicates"], merged=report["merged"],
+                 tokens_saved=report["tokens_saved"])
+    if report["duplicates"] or report["merged"]:
+        logger.info("Dedup: %(merged)d fragmentos unidos, %(duplicates)d duplicados, %(tokens_saved)d tokens menos", report)
+
+
+def deduplicator():
+    """Runnable que compacta inputs["context"] y agrega el reporte en inputs["dedup"]."""
+    def _apply(inputs: dict) -> dict:
+        if not DEDUP_ENABLED:
+            return {**inputs, "dedup": None}
+        kept, report = deduplicate_documents(inputs["context"])
+        _record(report)
+        return {**inputs, "context": kept, "dedup": report}
+
+    return RunnableLambda(_apply, name="Dedup")
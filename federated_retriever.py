@@ -0,0 +1,133 @@
+# ------------------------------------------------------
+# Retriever federado para "Todos los autores"
+# ------------------------------------------------------
+# En lugar de una KB combinada (WGUUTHDVPH) que duplica los documentos de las
+# KB de cada autor, se consultan en paralelo las KB de Hayek, Hazlitt y Mises y
+# se mezclan los resultados por el score de relevancia que devuelve cada KB
+# (todas usan el mismo modelo de embeddings, así que los scores se comparan). La
+# latencia queda acotada por la KB más lenta y no por un índice combinado más
+# grande.
+#
+# Cada KB devuelve number_of_results documentos y cada autor aporta como máximo
+# per_author_quota a la mezcla, para que un autor con muchos fragmentos
+# parecidos no desplace a los demás; como cada KB trae más que la cuota, los
+# lugares que un autor no llena los ocupa el siguiente mejor de otro. Si la KB
+# de un autor falla, se responde con las demás.
+
+import logging
+import math
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List
+
+from langchain_core.callbacks import CallbackManagerForRetrieverRun
+from langchain_core.documents import Document
+from langchain_core.retrievers import BaseRetriever
+from pydantic import ConfigDict, PrivateAttr
+
+from aws_resources import get_or_create
+from generation_service import GENERATION_CONCURRENCY
+from retrieval_cache import get_cached_retriever
+
+
+# Separador del identificador compuesto de una búsqueda federada ("KB1+KB2+KB3")
+FEDERATED_SEPARATOR = "+"
+
+logger = logging.getLogger(__name__)
+
+
+def federated_knowledge_base_id(knowledge_bases: Dict[str, str]) -> str:
+    """Identificador estable de la combinación de KB, para cachés y versiones."""
+    return FEDERATED_SEPARATOR.join(sorted(knowledge_bases.values()))
+
+
+def knowledge_base_ids(knowledge_base_id: str) -> List[str]:
+    """KB individuales de un identificador (simple o federado)."""
+    return knowledge_base_id.split(FEDERATED_SEPARATOR)
+
+
+def merge_by_score(results: Dict[str, List[Document]], number_of_results: int,
+                   per_author_quota: int) -> List[Document]:
+    """
+    Mezcla las listas de cada autor por el score de la KB; los empates se
+    resuelven por el puesto en su lista. Cada autor aporta a lo sumo per_author_quota.
+    """
+    candidates = []
+    for author, documents in results.items():
+        for rank, doc in enumerate(documents, 1):
+            candidates.append((float(doc.metadata.get("score") or 0.0), -rank, author, doc))
+    candidates.sort(key=lambda c: (c[0], c[1]), reverse=True)
+
+    merged = []
+    taken = {author: 0 for author in results}
+    for _, _, author, doc in candidates:
+        if taken[author] >= per_author_quota:
+            continue
+        taken[author] += 1
+        doc.metadata = {**doc.metadata, "author": author}
+        merged.append(doc)
+        if len(merged) == number_of_results:
+            break
+    return merged
+
+
+class FederatedRetriever(BaseRetriever):
+    """Consulta varios retrievers (uno por autor) en paralelo y fusiona sus resultados."""
+
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    retrievers: Dict[str, BaseRetriever]
+    number_of_results: int = 20
+    per_author_quota: int = 10
+    # Preguntas federadas a la vez: las que deja correr el servicio de generación
+    max_concurrent_queries: int = GENERATION_CONCURRENCY
+
+    _executor: ThreadPoolExecutor = PrivateAttr()
+
+    def __init__(self, **data):
+        super().__init__(**data)
+        # Un hilo por KB de cada pregunta en curso: una pregunta no espera a que
+        # terminen las consultas de otra sesión
+        self._executor = ThreadPoolExecutor(max_workers=self.max_concurrent_queries * len(self.retrievers),
+                                            thread_name_prefix="federated-kb")
+
+    def _get_relevant_documents(self, query: str, *, run_manager: CallbackManagerForRetrieverRun) -> List[Document]:
+        callbacks = run_manager.get_child()
+        futures = {
+            author: self._executor.submit(retriever.invoke, query, {"callbacks": callbacks})
+            for author, retriever in self.retrievers.items()
+        }
+
+        results = {}
+        errors = {}
+        for author, future in futures.items():
+            try:
+                results[author] = future.result()
+            except Exception as error:
+                logger.exception("Falló la búsqueda en la KB de %s", author)
+                errors[author] = error
+        if not results:
+            raise next(iter(errors.values()))
+
+        return merge_by_score(results, self.number_of_results, self.per_author_quota)
+
+
+def get_federated_retriever(knowledge_bases: Dict[str, str], number_of_results: int = 20,
+                            per_author_quota: int = None) -> FederatedRetriever:
+    """
+    Retriever federado sobre {autor: knowledge_base_id}. Cada KB devuelve
+    number_of_results resultados; la mezcla conserva number_of_results con a lo
+    sumo per_author_quota por autor (por defecto la mitad del total, redondeada
+    hacia arriba).
+    """
+    per_author_quota = per_author_quota or math.ceil(number_of_results / 2)
+    return get_or_create(
+        "federated_retriever", (knowledge_bases, number_of_results, per_author_quota),
+        lambda: FederatedRetriever(
+            retrievers={
+                author: get_cached_retriever(knowledge_base_id, number_of_results=number_of_results)
+                for author, knowledge_base_id in knowledge_bases.items()
+            },
+            number_of_results=number_of_results,
+            per_author_quota=per_author_quota,
+        ),
+    )
@@ -0,0 +1,285 @@
+# ------------------------------------------------------
+# Servicio de generación asíncrono, fuera del hilo del script de Streamlit
+# ------------------------------------------------------
+# chain_with_history.stream(...) corría dentro del script: el hilo de la sesión
+# quedaba ocupado durante toda la respuesta y la cadena no se enteraba si el
+# usuario cambiaba de página o hacía clic en otra sugerencia. Ahora las páginas
+# envían la pregunta a este servicio y solo leen los chunks:
+#
+#   - un event loop de asyncio en un hilo propio, compartido por el proceso,
+#     corre chain.astream(...) de cada pregunta;
+#   - un semáforo limita las generaciones simultáneas (CHH_GENERATION_CONCURRENCY);
+#     las demás esperan su turno y ese tiempo se mide como queue_ms;
+#   - los chunks quedan guardados en el job: si el script se interrumpe (rerun,
+#     expander, otra pregunta) la generación sigue y el rerun siguiente vuelve a
+#     leerlos desde el principio con job.chunks(). Solo job.cancel() la detiene;
+#   - on_complete(job) corre en el pool al terminar el stream, antes de avisar el
+#     fin a los lectores: ahí la página guarda el turno aunque nadie esté leyendo;
+#   - run_background(func, ...) corre en el mismo pool trabajo que nadie espera
+#     (el resumen del historial) y solo registra sus errores;
+#   - metrics.snapshot("generation") resume preguntas activas / en espera,
+#     completadas, canceladas y el throughput del proceso.
+#
+# Los hilos del servicio no tienen el contexto del script, así que no pueden leer
+# st.session_state: el StreamlitChatMessageHistory de la sesión se crea en el
+# script y viaja en la config ({"configurable": {"chat_history": ...}}, ver
+# CHAT_HISTORY_CONFIG).
+#
+#   job = get_generation_service().submit(chain, inputs, config, on_complete=save_turn)
+#   for chunk in job.chunks():
+#       ...
+
+import asyncio
+import logging
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+from langchain_core.chat_history import BaseChatMessageHistory
+from langchain_core.runnables import ConfigurableFieldSpec
+
+from aws_resources import get_or_create
+from metrics import counters, register_gauge
+
+
+GENERATION_CONCURRENCY = int(os.environ.get("CHH_GENERATION_CONCURRENCY", "8"))
+
+# Segundos sin recibir un chunk antes de abandonar la pregunta; se cuentan desde
+# que empieza a correr, no mientras espera su turno en la cola
+GENERATION_TIMEOUT = float(os.environ.get("CHH_GENERATION_TIMEOUT", "120"))
+
+# Ventana (segundos) sobre la que se calcula el throughput
+THROUGHPUT_WINDOW = 60
+
+# history_factory_config de RunnableWithMessageHistory: el historial llega ya resuelto
+CHAT_HISTORY_CONFIG = [
+    ConfigurableFieldSpec(
+        id="chat_history",
+        annotation=BaseChatMessageHistory,
+        name="Historial de la sesión",
+        description="Historial de mensajes de la sesión que hace la pregunta.",
+        default=None,
+        is_shared=True,
+    ),
+]
+
+logger = logging.getLogger(__name__)
+
+_DONE = object()
+
+
+class GenerationJob:
+    """Una pregunta enviada al servicio; los chunks quedan en el job y se leen con chunks()."""
+
+    def __init__(self, service, on_complete=None):
+        self._service = service
+        self._on_complete = on_complete
+        self._items = []
+        self._arrivals = []
+        self._changed = threading.Condition()
+        self._task = None
+        self._cancelled = False
+        self._finishing = False
+        self.status = "queued"
+        self.submitted = time.perf_counter()
+        self.started = None
+        self.finished = None
+        self.chunks_received = 0
+        self.chars = 0
+        self.result = None  # lo que devuelve on_complete
+
+    def _put(self, item):
+        with self._changed:
+            self._items.append(item)
+            self._arrivals.append(time.perf_counter())
+            self._changed.notify_all()
+
+    def chunks(self, timeout: float = GENERATION_TIMEOUT):
+        """
+        Chunks de la cadena desde el primero, a medida que llegan; en otro rerun se
+        puede volver a llamar y los ya recibidos se entregan de una vez. Relanza el
+        error si la generación falló; TimeoutError (y la cancela) si ya corriendo
+        pasan timeout segundos sin un chunk nuevo.
+        """
+        index = 0
+        while True:
+            with self._changed:
+                while index >= len(self._items):
+                    if self.started is None:
+                        # En cola: el semáforo la hace esperar sin límite
+                        self._changed.wait(timeout)
+                        continue
+                    last = max([self.started, *self._arrivals[-1:]])
+                    remaining = last + timeout - time.perf_counter()
+                    if remaining <= 0:
+                        self.cancel()
+                        raise TimeoutError(f"La generación no produjo datos en {timeout:.0f} s")
+                    self._changed.wait(remaining)
+                item = self._items[index]
+            index += 1
+            if item is _DONE:
+                return
+            if isinstance(item, BaseException):
+                raise item
+            yield item
+
+    def received(self) -> list:
+        """(momento de llegada, chunk) de los chunks recibidos hasta ahora."""
+        with self._changed:
+            return [(arrival, item) for arrival, item in zip(self._arrivals, self._items)
+                    if item is not _DONE and not isinstance(item, BaseException)]
+
+    @property
+    def done(self) -> bool:
+        return self.finished is not None
+
+    def cancel(self):
+        if self.finished is None and not self._cancelled:
+            self._cancelled = True
+            self._service._loop.call_soon_threadsafe(self._service._cancel, self)
+
+    def report(self) -> dict:
+        end = self.finished or time.perf_counter()
+        return {
+            "status": self.status,
+            "queue_ms": round(((self.started or end) - self.submitted) * 1000, 1),
+            "duration_ms": round((end - (self.started or end)) * 1000, 1),
+            "chunks": self.chunks_received,
+            "chars": self.chars,
+        }
+
+
+class GenerationService:
+    """Event loop en un hilo daemon que corre las cadenas con concurrencia limitada."""
+
+    def __init__(self, max_concurrency: int = GENERATION_CONCURRENCY):
+        self.max_concurrency = max_concurrency
+        self._loop = asyncio.new_event_loop()
+        # Las partes síncronas de la cadena (retriever, stream de Bedrock) corren en este pool
+        self._executor = ThreadPoolExecutor(max_workers=max_concurrency * 2, thread_name_prefix="generation")
+        self._loop.set_default_executor(self._executor)
+        self._thread = threading.Thread(target=self._loop.run_forever, name="generation-service", daemon=True)
+        self._thread.start()
+        self._semaphore = asyncio.run_coroutine_threadsafe(self._create_semaphore(), self._loop).result()
+
+        self._lock = threading.Lock()
+        self._active = 0
+        self._waiting = 0
+        self._peak_active = 0
+        self._metrics = counters("generation", "submitted", "completed", "cancelled", "failed",
+                                 "background", "background_failed")
+        self._finished = deque()  # (fin, chars, queue_ms) de las preguntas recientes
+        register_gauge("generation", self.stats)
+
+    async def _create_semaphore(self):
+        return asyncio.Semaphore(self.max_concurrency)
+
+    def submit(self, chain, inputs: dict, config: dict = None, on_complete=None) -> GenerationJob:
+        """
+        Envía una pregunta; los chunks de chain.astream(inputs, config) se leen del
+        job. on_complete(job) corre al terminar el stream y su resultado queda en job.result.
+        """
+        job = GenerationJob(self, on_complete)
+        self._metrics.add(submitted=1)
+        with self._lock:
+            self._waiting += 1
+        self._loop.call_soon_threadsafe(self._start, job, chain, inputs, config)
+        return job
+
+    def run_background(self, func, *args):
+        """
+        Corre func(*args) en el pool del servicio sin que nadie espere el resultado
+        (p. ej. el resumen del historial); los errores solo se registran en el log.
+        """
+        self._metrics.add(background=1)
+        self._executor.submit(self._background, func, args)
+
+    def _background(self, func, args):
+        try:
+            func(*args)
+        except Exception:
+            self._metrics.add(background_failed=1)
+            logger.exception("Error en la tarea en segundo plano %s", getattr(func, "__name__", func))
+
+    def _start(self, job, chain, inputs, config):
+        if job._cancelled:
+            job._task = None
+            self._record(job)
+            return
+        job._task = self._loop.create_task(self._run(job, chain, inputs, config))
+        # También corre si la tarea se cancela antes de empezar
+        job._task.add_done_callback(lambda _: self._record(job))
+
+    def _cancel(self, job):
+        # Si la tarea aún no existe, _start la descarta; con el stream terminado
+        # on_complete ya está guardando el resultado y no se interrumpe
+        if job._task is not None and not job._finishing:
+            job._task.cancel()
+
+    async def _run(self, job, chain, inputs, config):
+        acquired = False
+        try:
+            await self._semaphore.acquire()
+            acquired = True
+            job.started = time.perf_counter()
+            job.status = "running"
+            with self._lock:
+                self._waiting -= 1
+                self._active += 1
+                self._peak_active = max(self._peak_active, self._active)
+
+            async for chunk in chain.astream(inputs, config):
+                job.chunks_received += 1
+                if isinstance(chunk, dict) and isinstance(chunk.get("response"), str):
+                    job.chars += len(chunk["response"])
+                job._put(chunk)
+            if job._on_complete is not None:
+                job._finishing = True
+                job.result = await self._loop.run_in_executor(None, job._on_complete, job)
+            job.status = "completed"
+        except Exception as error:
+            job.status = "failed"
+            logger.exception("Error en la generación")
+            job._put(error)
+        finally:
+            if acquired:
+                with self._lock:
+                    self._active -= 1
+                self._semaphore.release()
+
+    def _record(self, job):
+        if job.status in ("queued", "running"):
+            job.status = "cancelled"
+        job.finished = time.perf_counter()
+        job._put(_DONE)
+        report = job.report()
+        self._metrics.add(**{job.status: 1})
+        with self._lock:
+            if job.started is None:
+                self._waiting -= 1
+            self._finished.append((job.finished, job.chars, report["queue_ms"]))
+            while self._finished and self._finished[0][0] < job.finished - THROUGHPUT_WINDOW:
+                self._finished.popleft()
+
+    def stats(self) -> dict:
+        """Estado actual del servicio (los totales están en los contadores "generation")."""
+        now = time.perf_counter()
+        with self._lock:
+            recent = [f for f in self._finished if f[0] >= now - THROUGHPUT_WINDOW]
+            queue_ms = sorted(f[2] for f in recent)
+            return {
+                "active": self._active,
+                "waiting": self._waiting,
+                "peak_active": self._peak_active,
+                "max_concurrency": self.max_concurrency,
+                "answers_per_minute": len(recent) * 60 / THROUGHPUT_WINDOW,
+                "chars_per_second": round(sum(f[1] for f in recent) / THROUGHPUT_WINDOW, 1),
+                "queue_ms_p95": queue_ms[min(int(len(queue_ms) * 0.95), len(queue_ms) - 1)] if queue_ms else None,
+            }
+
+
+def get_generation_service() -> GenerationService:
+    return get_or_create("generation_service", GENERATION_CONCURRENCY, lambda: GenerationService(GENERATION_CONCURRENCY))
+
@@ -0,0 +1,207 @@
+# ------------------------------------------------------
+# Ventana del historial de conversación con presupuesto de tokens
+# ------------------------------------------------------
+# RunnableWithMessageHistory inyecta TODO el historial de la sesión en el
+# prompt. Esta etapa va antes del prompt y conserva solo los turnos más
+# recientes que caben en el presupuesto, para que el tamaño del prompt (y el
+# costo / tiempo al primer token) no crezca sin límite con la conversación.
+#
+# Los turnos que salen de la ventana no se pierden: después de guardar un
+# turno, update_rolling_summary() los integra a un resumen acumulado que se
+# guarda en la cabecera de la sesión en DynamoDB y se inyecta al inicio de la
+# ventana en lugar de los mensajes originales. Resumir es otra llamada a
+# Bedrock, así que solo se hace cuando lo que desbordó llega a
+# SUMMARY_TRIGGER_TOKENS, y entonces se resume hasta dejar fuera del resumen
+# solo SUMMARY_KEEP_TOKENS de turnos recientes: el próximo resumen tarda varios
+# turnos en volver a hacer falta. Las páginas lo corren en segundo plano
+# (generation_service.run_background), nunca en el hilo del script.
+
+import logging
+import math
+import os
+import re
+
+from langchain_core.messages import AIMessage, HumanMessage
+from langchain_core.output_parsers import StrOutputParser
+from langchain_core.prompts import ChatPromptTemplate
+from langchain_core.runnables import RunnableLambda
+
+from aws_resources import get_chain, get_chat_model
+from metrics import counters
+
+
+# Presupuesto por defecto para el historial (no incluye system prompt ni contexto)
+HISTORY_TOKEN_BUDGET = int(os.environ.get("CHH_HISTORY_TOKEN_BUDGET", "3000"))
+
+# Tokens extra por mensaje (rol y separadores en el formato de Anthropic)
+MESSAGE_OVERHEAD_TOKENS = 4
+
+# Solo se resume cuando desborda al menos un turno completo (pregunta + respuesta)
+MIN_OVERFLOW_MESSAGES = 2
+
+# Tokens fuera de la ventana (y sin resumir) a partir de los que se resume
+SUMMARY_TRIGGER_TOKENS = int(os.environ.get("CHH_SUMMARY_TRIGGER_TOKENS", "1000"))
+# Tokens de turnos recientes que quedan sin resumir después de resumir
+SUMMARY_KEEP_TOKENS = int(os.environ.get("CHH_SUMMARY_KEEP_TOKENS", str(HISTORY_TOKEN_BUDGET // 2)))
+
+SUMMARY_MODEL_KWARGS = {
+    "max_tokens": 512,
+    "temperature": 0.0,
+}
+
+SUMMARY_PREFIX = "Resumen de nuestra conversación anterior:\n"
+SUMMARY_ACK = "Entendido, tendré en cuenta ese resumen de la conversación."
+
+SUMMARY_PROMPT = ChatPromptTemplate.from_messages(
+    [
+        ("system",
+         "Mantienes un resumen acumulado de una conversación entre un estudiante y un chatbot "
+         "sobre Hayek, Hazlitt y Mises. Integra los nuevos intercambios al resumen actual: conserva "
+         "los temas tratados, los conceptos explicados, las preguntas del usuario y las conclusiones, "
+         "y omite saludos y detalles de formato. Máximo 250 palabras. Responde solo con el resumen, "
+         "en el idioma de la conversación."),
+        ("human", "Resumen actual:\n{summary}\n\nNuevos intercambios:\n{conversation}"),
+    ]
+)
+
+_TOKEN_RE = re.compile(r"\w+|[^\w\s]", re.UNICODE)
+
+logger = logging.getLogger(__name__)
+
+_metrics = counters("history_window", "requests", "trimmed_requests", "dropped_messages", "dropped_tokens")
+
+
+def approx_token_count(text: str) -> int:
+    """Aproximación local del tokenizador: ~4 caracteres por token en cada palabra, 1 por signo."""
+    if not text:
+        return 0
+    return sum(math.ceil(len(piece) / 4) for piece in _TOKEN_RE.findall(text))
+
+
+def message_tokens(message) -> int:
+    content = message.content
+    if not isinstance(content, str):
+        # Contenido en bloques (listas de dicts con "text")
+        content = " ".join(block.get("text", "") if isinstance(block, dict) else str(block) for block in content)
+    return approx_token_count(content) + MESSAGE_OVERHEAD_TOKENS
+
+
+def summary_messages(summary_text: str):
+    """El resumen se inyecta como un par usuario/asistente para respetar la alternancia de roles."""
+    if not summary_text:
+        return []
+    return [HumanMessage(content=SUMMARY_PREFIX + summary_text), AIMessage(content=SUMMARY_ACK)]
+
+
+def window_messages(messages, max_tokens: int, summary: dict = None):
+    """
+    Devuelve (mensajes_conservados, reporte) tomando los mensajes más recientes
+    que caben en max_tokens. La ventana siempre empieza con un mensaje del
+    usuario, como exige la API de mensajes de Anthropic.
+
+    Si hay un resumen {"text", "covered"}, los primeros `covered` mensajes se
+    reemplazan por el resumen, que también cuenta contra el presupuesto.
+    """
+    covered = summary["covered"] if summary else 0
+    prefix = summary_messages(summary["text"]) if summary else []
+    summary_tokens = sum(message_tokens(m) for m in prefix)
+    max_tokens = max(max_tokens - summary_tokens, 0)
+
+    messages = list(messages)[covered:]
+    costs = [message_tokens(m) for m in messages]
+
+    start = len(messages)
+    used = 0
+    while start > 0 and used + costs[start - 1] <= max_tokens:
+        start -= 1
+        used += costs[start]
+
+    while start < len(messages) and messages[start].type != "human":
+        used -= costs[start]
+        start += 1
+
+    report = {
+        "kept_messages": len(messages) - start,
+        "dropped_messages": start,
+        "kept_tokens": used,
+        "dropped_tokens": sum(costs[:start]),
+        "summarized_messages": covered,
+        "summary_tokens": summary_tokens,
+        "budget": max_tokens + summary_tokens,
+    }
+    return prefix + messages[start:], report
+
+
+def _record(report):
+    _metrics.add(requests=1)
+    if report["dropped_messages"]:
+        _metrics.add(trimmed_requests=1, dropped_messages=report["dropped_messages"],
+                     dropped_tokens=report["dropped_tokens"])
+        logger.info("Historial recortado: %(dropped_messages)d mensajes / %(dropped_tokens)d tokens fuera de la ventana", report)
+
+
+def history_window(history_key: str = "history", max_tokens: int = HISTORY_TOKEN_BUDGET):
+    """
+    Runnable que recorta inputs[history_key] a la ventana y agrega el reporte
+    en inputs["history_window"]. Se coloca al inicio de la cadena RAG; si la
+    entrada trae inputs["summary"], el resumen reemplaza a los turnos que cubre.
+    """
+    def _apply(inputs: dict) -> dict:
+        kept, report = window_messages(inputs.get(history_key) or [], max_tokens, inputs.get("summary"))
+        _record(report)
+        return {**inputs, history_key: kept, "history_window": report}
+
+    return RunnableLambda(_apply, name="HistoryWindow")
+
+
+# ------------------------------------------------------
+# Resumen acumulado
+
+def to_chat_messages(stored_messages):
+    """Mensajes guardados (format_message) -> HumanMessage / AIMessage."""
+    return [
+        HumanMessage(content=m["data"]["content"]) if m["data"]["type"] == "human"
+        else AIMessage(content=m["data"]["content"])
+        for m in stored_messages
+    ]
+
+
+def get_summarizer(model_id: str):
+    """Cadena prompt | modelo | texto para resumir, compartida por proceso."""
+    return get_chain(
+        ("summarizer", model_id, SUMMARY_MODEL_KWARGS),
+        lambda: SUMMARY_PROMPT | get_chat_model(model_id, SUMMARY_MODEL_KWARGS) | StrOutputParser(),
+    )
+
+
+def summarize(summarizer, previous_summary: str, messages) -> str:
+    conversation = "\n".join(
+        f"{'Usuario' if m.type == 'human' else 'Asistente'}: {m.content}" for m in messages
+    )
+    return summarizer.invoke({
+        "summary": previous_summary or "(todavía no hay resumen)",
+        "conversation": conversation,
+    }).strip()
+
+
+def update_rolling_summary(history_cache, summarizer, max_tokens: int = HISTORY_TOKEN_BUDGET,
+                           trigger_tokens: int = SUMMARY_TRIGGER_TOKENS,
+                           keep_tokens: int = SUMMARY_KEEP_TOKENS) -> bool:
+    """
+    Integra al resumen de la sesión los mensajes que ya no caben en la ventana,
+    si suman al menos trigger_tokens; resume hasta que los mensajes sin resumir
+    quepan en keep_tokens. Devuelve True si el resumen cambió.
+    """
+    messages = to_chat_messages(history_cache.messages())
+    summary = history_cache.summary()
+    _, report = window_messages(messages, max_tokens, summary)
+    if report["dropped_messages"] < MIN_OVERFLOW_MESSAGES or report["dropped_tokens"] < trigger_tokens:
+        return False
+
+    covered = summary["covered"]
+    _, keep_report = window_messages(messages[covered:], keep_tokens)
+    new_covered = covered + max(keep_report["dropped_messages"], report["dropped_messages"])
+    text = summarize(summarizer, summary["text"], messages[covered:new_covered])
+    history_cache.save_summary(text, new_covered)
+    logger.info("Resumen actualizado: %d -> %d mensajes cubiertos", covered, new_covered)
+    return True
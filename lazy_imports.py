@@ -0,0 +1,74 @@
+# ------------------------------------------------------
+# Importaciones diferidas de módulos pesados
+# ------------------------------------------------------
+# Después de reiniciar el contenedor, la primera carga de cada página pagaba
+# la importación de langchain_aws (~1 s: ChatBedrock, el retriever de la KB y
+# los embeddings) y de numpy, aunque solo se usan al responder una pregunta y
+# no para dibujar el login, las sugerencias o el historial.
+#
+#   langchain_aws = lazy_module("langchain_aws")
+#   langchain_aws.ChatBedrock(...)      # aquí se importa de verdad
+#
+# El módulo real se importa en el primer acceso a un atributo (el sistema de
+# importación de Python ya es seguro entre hilos). lazy_import_stats() dice
+# qué módulos diferidos se cargaron y cuánto tardaron; startup_profile.py lo
+# reporta por página. CHH_LAZY_IMPORTS=off los importa de inmediato.
+
+import importlib
+import os
+import sys
+import threading
+import time
+import types
+
+
+LAZY_IMPORTS_ENABLED = os.environ.get("CHH_LAZY_IMPORTS", "on").lower() != "off"
+
+_lock = threading.Lock()
+_stats = {}
+
+
+class LazyModule(types.ModuleType):
+    """Módulo que se importa en el primer acceso a uno de sus atributos."""
+
+    def __init__(self, name: str):
+        super().__init__(name)
+        self.__dict__["_lazy_target"] = None
+
+    def _load(self):
+        module = self.__dict__["_lazy_target"]
+        if module is None:
+            start = time.perf_counter()
+            already_loaded = self.__name__ in sys.modules
+            module = importlib.import_module(self.__name__)
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            self.__dict__["_lazy_target"] = module
+            with _lock:
+                _stats.setdefault(self.__name__, {
+                    "ms": 0.0 if already_loaded else round(elapsed_ms, 1),
+                    "thread": threading.current_thread().name,
+                })
+        return module
+
+    def __getattr__(self, name):
+        return getattr(self._load(), name)
+
+    def __dir__(self):
+        return dir(self._load())
+
+    def __repr__(self):
+        state = "cargado" if self.__dict__["_lazy_target"] is not None else "diferido"
+        return f"<módulo {self.__name__!r} ({state})>"
+
+
+def lazy_module(name: str):
+    """El módulo si ya está importado (o si CHH_LAZY_IMPORTS=off); si no, uno diferido."""
+    if not LAZY_IMPORTS_ENABLED or name in sys.modules:
+        return importlib.import_module(name)
+    return LazyModule(name)
+
+
+def lazy_import_stats() -> dict:
+    """Módulos diferidos que ya se importaron: {nombre: {"ms", "thread"}}."""
+    with _lock:
+        return {name: dict(entry) for name, entry in _stats.items()}
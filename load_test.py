@@ -0,0 +1,300 @@
+# ------------------------------------------------------
+# Prueba de carga con usuarios concurrentes
+# ------------------------------------------------------
+# Simula una cohorte que entra a la vez: cada usuario es un hilo con su propia
+# sesión de Streamlit (BenchSession, ver chhbench/) que inicia sesión con el
+# formulario de stauth.Authenticate y luego hace --turns acciones entre Hayek,
+# Hazlitt y Mises: clic en una sugerencia al llegar a una página, preguntas
+# libres y cambios de página, con --think-ms de pausa entre acciones. Bedrock,
+# las KB y DynamoDB son los reemplazos locales de bench_e2e.py.
+#
+# Corre un nivel por cada valor de --users (de menor a mayor) y reporta por
+# nivel:
+#   - throughput: pasos/s y respuestas/min;
+#   - latencia: p50/p95 de la respuesta completa y del rerun de cada paso;
+#   - espera en cola: p95 de queue_ms de generation_service
+#     (CHH_GENERATION_CONCURRENCY);
+#   - memoria por sesión: RSS marginal por usuario respecto al nivel anterior;
+#   - hilos de script: promedio y pico de ScriptRunner.scriptThread vivos, y
+#     CPU del proceso (1.0 = un núcleo, el límite del GIL);
+#   - lock de moto: espera de las llamadas a DynamoDB por el lock que las
+#     serializa en moto (ver chhbench/backends.py). Es un costo del benchmark
+#     que queda incluido en las latencias; con DynamoDB Local es 0.
+#
+# Las preguntas libres son las de chhbench/questions.py, no las sugerencias,
+# para que pasen por la cadena y no por las caches de respuestas.
+#
+# La saturación es el primer nivel en el que menos de --saturation de los
+# usuarios agregados se traduce en throughput (respuestas/min).
+#
+#   python load_test.py --users 5 10 20 40
+#   python load_test.py --users 10 50 100 --turns 4 --think-ms 2000 --json carga.json
+
+import argparse
+import gc
+import json
+import os
+import random
+import resource
+import threading
+import time
+import warnings
+
+# Antes de importar streamlit: sin los avisos de cada rerun en la salida
+os.environ.setdefault("STREAMLIT_LOGGER_LEVEL", "error")
+
+from chhbench.backends import (BENCH_PASSWORD, MOTO_METRICS, StandInSettings, dynamodb_backend, install_stand_ins,
+                               users_file)
+from chhbench.questions import free_questions
+from chhbench.report import distribution
+from chhbench.session import BenchSession, allow_concurrent_sessions, install_counters
+from chhcore.registry import AUTHORS
+from generation_service import get_generation_service
+
+
+# Páginas por las que navegan los usuarios
+LOAD_PAGES = ("hayek", "hazlitt", "mises")
+
+# Probabilidad de cada acción después de la primera sugerencia en una página
+ACTIONS = (("question", 0.6), ("suggestion", 0.2), ("switch", 0.2))
+
+# Fracción mínima de los usuarios agregados que debe verse en el throughput
+DEFAULT_SATURATION = 0.5
+
+SCRIPT_THREAD_NAME = "ScriptRunner.scriptThread"
+SAMPLE_INTERVAL = 0.1
+
+
+def rss_mb() -> float:
+    """Memoria residente actual del proceso (pico, si no hay /proc)."""
+    try:
+        with open("/proc/self/status") as file:
+            for line in file:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def cpu_seconds() -> float:
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    return usage.ru_utime + usage.ru_stime
+
+
+class Sampler(threading.Thread):
+    """Muestrea hilos de script, generaciones activas y en cola, y RSS mientras corre un nivel."""
+
+    def __init__(self):
+        super().__init__(daemon=True)
+        self.samples = []
+        self._done = threading.Event()
+
+    def run(self):
+        while not self._done.is_set():
+            stats = get_generation_service().stats()
+            self.samples.append({
+                "script_threads": sum(thread.name == SCRIPT_THREAD_NAME for thread in threading.enumerate()),
+                "active": stats["active"],
+                "waiting": stats["waiting"],
+                "rss_mb": rss_mb(),
+            })
+            self._done.wait(SAMPLE_INTERVAL)
+
+    def stop(self) -> list:
+        self._done.set()
+        self.join()
+        return self.samples
+
+
+def username(level: int, index: int) -> str:
+    # level = usuarios del nivel (0 para el calentamiento)
+    return f"load-{level}-{index}@ufm.edu"
+
+
+def run_user(session: BenchSession, user: str, start: threading.Barrier, turns: int, think_ms: float,
+             rng: random.Random):
+    pages = [AUTHORS[key] for key in LOAD_PAGES]
+    # Todos los usuarios del nivel abren la app a la vez, como una cohorte en clase
+    start.wait()
+    session.open()
+    session.login(user, BENCH_PASSWORD)
+    if session.steps[-1]["errors"]:
+        return
+
+    author = rng.choice(pages)
+    session.switch_page(author)
+    session.click_suggestion(author, rng.randrange(4))
+    for _ in range(turns - 1):
+        time.sleep(rng.uniform(0.5, 1.5) * think_ms / 1000)
+        action = rng.choices([name for name, _ in ACTIONS], [weight for _, weight in ACTIONS])[0]
+        if action == "switch":
+            author = rng.choice([page for page in pages if page is not author])
+            session.switch_page(author)
+            session.click_suggestion(author, rng.randrange(4))
+        elif action == "suggestion":
+            session.click_suggestion(author, rng.randrange(4))
+        else:
+            session.ask(rng.choice(free_questions(author)))
+
+
+def run_level(users: int, turns: int, think_ms: float) -> dict:
+    sessions = [BenchSession(f"load-{users}-{i}") for i in range(users)]
+    start = threading.Barrier(users + 1)
+    threads = [
+        threading.Thread(target=run_user, name=f"load-user-{i}",
+                         args=(session, username(users, i), start, turns, think_ms, random.Random(users * 10000 + i)))
+        for i, session in enumerate(sessions)
+    ]
+    for thread in threads:
+        thread.start()
+
+    sampler = Sampler()
+    sampler.start()
+    start.wait()
+    begin, cpu_begin, moto_begin = time.perf_counter(), cpu_seconds(), MOTO_METRICS.snapshot()
+    for thread in threads:
+        thread.join()
+    duration = time.perf_counter() - begin
+    cpu = (cpu_seconds() - cpu_begin) / duration
+    moto = {key: value - moto_begin[key] for key, value in MOTO_METRICS.snapshot().items()}
+    samples = sampler.stop()
+
+    steps = [step for session in sessions for step in session.steps]
+    answers = [step for step in steps if step.get("latency")]
+    rss_peak = max([sample["rss_mb"] for sample in samples] + [rss_mb()])
+    result = {
+        "users": users,
+        "duration_s": round(duration, 2),
+        "steps": len(steps),
+        "answers": len(answers),
+        "answers_by_source": {source: sum(step["latency"]["source"] == source for step in answers)
+                              for source in sorted({step["latency"]["source"] for step in answers})},
+        "steps_per_second": round(len(steps) / duration, 2),
+        "answers_per_minute": round(len(answers) * 60 / duration, 1),
+        "answer_total_ms": distribution(step["latency"]["total_ms"] for step in answers),
+        "queue_ms": distribution((step.get("generation") or {}).get("queue_ms") for step in answers),
+        "login_ms": distribution(step["wall_ms"] for step in steps if step["step"] == "login"),
+        "rerun_ms": distribution(step["wall_ms"] for step in steps),
+        "script_threads": {"mean": round(sum(s["script_threads"] for s in samples) / len(samples), 1),
+                           "peak": max(s["script_threads"] for s in samples)} if samples else {},
+        "generation": {"peak_active": max((s["active"] for s in samples), default=0),
+                       "peak_waiting": max((s["waiting"] for s in samples), default=0),
+                       "max_concurrency": get_generation_service().stats()["max_concurrency"]},
+        "moto": {"calls": moto["calls"], "wait_ms": round(moto["wait_ms"], 1),
+                 "wait_ms_per_call": round(moto["wait_ms"] / moto["calls"], 2) if moto["calls"] else 0.0,
+                 "wait_ms_per_answer": round(moto["wait_ms"] / len(answers), 1) if answers else 0.0},
+        "cpu_cores": round(cpu, 2),
+        "rss_peak_mb": round(rss_peak, 1),
+        "errors": [error for step in steps for error in step["errors"]],
+    }
+    del sessions, threads
+    gc.collect()
+    return result
+
+
+def mark_saturation(levels: list, saturation: float):
+    """scaling = fracción de los usuarios agregados que se ve en respuestas/min."""
+    for previous, level in zip(levels, levels[1:]):
+        users_gain = level["users"] / previous["users"] - 1
+        throughput_gain = (level["answers_per_minute"] / previous["answers_per_minute"] - 1
+                           if previous["answers_per_minute"] else 0)
+        level["scaling"] = round(throughput_gain / users_gain, 2) if users_gain > 0 else None
+        level["saturated"] = level["scaling"] is not None and level["scaling"] < saturation
+    return next((level["users"] for level in levels if level.get("saturated")), None)
+
+
+def warm_up():
+    """Un usuario recorre las páginas antes de medir: imports, cadenas y clientes ya construidos."""
+    session = BenchSession("load-warmup")
+    session.open()
+    session.login(username(0, 0), BENCH_PASSWORD)
+    for key in LOAD_PAGES:
+        session.switch_page(AUTHORS[key])
+        session.click_suggestion(AUTHORS[key])
+
+
+def print_level(level: dict):
+    answer, queue = level["answer_total_ms"], level["queue_ms"]
+    print(f"\n== {level['users']} usuarios: {level['steps']} pasos, {level['answers']} respuestas "
+          f"{level['answers_by_source']} en {level['duration_s']:.1f} s")
+    print(f"  throughput       {level['steps_per_second']:.2f} pasos/s, {level['answers_per_minute']:.1f} respuestas/min"
+          + (f" (scaling={level['scaling']:.2f})" if level.get("scaling") is not None else ""))
+    if answer:
+        print(f"  respuesta        p50={answer['p50']:.0f} ms  p95={answer['p95']:.0f} ms")
+    if queue:
+        print(f"  cola generación  p50={queue['p50']:.0f} ms  p95={queue['p95']:.0f} ms  "
+              f"(pico {level['generation']['peak_active']} activas / {level['generation']['max_concurrency']}, "
+              f"{level['generation']['peak_waiting']} en espera)")
+    print(f"  rerun            p50={level['rerun_ms']['p50']:.0f} ms  p95={level['rerun_ms']['p95']:.0f} ms  "
+          f"login p95={level['login_ms'].get('p95', 0):.0f} ms")
+    print(f"  hilos de script  promedio={level['script_threads'].get('mean', 0)}  "
+          f"pico={level['script_threads'].get('peak', 0)}  CPU={level['cpu_cores']:.2f} núcleos")
+    print(f"  memoria          {level['mb_per_session']:.2f} MB/sesión (RSS pico {level['rss_peak_mb']:.0f} MB)")
+    if level["moto"]["calls"]:
+        print(f"  lock de moto     {level['moto']['calls']} llamadas, espera {level['moto']['wait_ms_per_call']:.2f} ms/llamada, "
+              f"{level['moto']['wait_ms_per_answer']:.1f} ms/respuesta (del benchmark, no de la app)")
+    for error in level["errors"][:5]:
+        print(f"  ERROR: {error}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Prueba de carga con usuarios concurrentes y backends locales")
+    parser.add_argument("--users", type=int, nargs="+", default=[5, 10, 20],
+                        help="Usuarios concurrentes de cada nivel")
+    parser.add_argument("--turns", type=int, default=5, help="Acciones por usuario después del login")
+    parser.add_argument("--think-ms", type=float, default=1000.0, help="Pausa media entre acciones de un usuario")
+    parser.add_argument("--ttft-ms", type=float, default=400.0)
+    parser.add_argument("--tokens-per-second", type=float, default=80.0)
+    parser.add_argument("--answer-tokens", type=int, default=250)
+    parser.add_argument("--retrieval-ms", type=float, default=250.0, help="Latencia de la API Retrieve de cada KB")
+    parser.add_argument("--saturation", type=float, default=DEFAULT_SATURATION,
+                        help="Fracción mínima de usuarios agregados que debe verse en el throughput")
+    parser.add_argument("--json", metavar="ARCHIVO", help="Guarda los niveles")
+    args = parser.parse_args()
+
+    levels = sorted(set(args.users))
+    settings = StandInSettings(ttft_ms=args.ttft_ms, tokens_per_second=args.tokens_per_second,
+                               answer_tokens=args.answer_tokens, retrieval_ms=args.retrieval_ms)
+    warnings.filterwarnings("ignore", category=DeprecationWarning)
+
+    # Antes del backend: install_stand_ins() descarta los recursos ya construidos
+    install_stand_ins(settings)
+    usernames = [username(0, 0)] + [username(level, i) for level in levels for i in range(level)]
+    with dynamodb_backend(), users_file(usernames):
+        install_counters()
+        allow_concurrent_sessions()
+        warm_up()
+        gc.collect()
+        print(f"TTFT={args.ttft_ms:.0f} ms, {args.tokens_per_second:.0f} tokens/s, retrieval={args.retrieval_ms:.0f} ms, "
+              f"{args.turns} acciones por usuario, pausa {args.think_ms:.0f} ms, "
+              f"CHH_GENERATION_CONCURRENCY={get_generation_service().stats()['max_concurrency']}")
+
+        results = []
+        # RSS marginal: la memoria que libera un nivel la reutiliza el siguiente, así que
+        # cada nivel se compara con el pico del anterior (el primero, con la app ya cargada)
+        previous = {"users": 0, "rss_peak_mb": rss_mb()}
+        for level in levels:
+            result = run_level(level, args.turns, args.think_ms)
+            result["mb_per_session"] = round(
+                (result["rss_peak_mb"] - previous["rss_peak_mb"]) / (level - previous["users"]), 2)
+            results.append(result)
+            previous = result
+        saturated_at = mark_saturation(results, args.saturation)
+        for result in results:
+            print_level(result)
+
+    if saturated_at:
+        print(f"\nSaturación: a partir de {saturated_at} usuarios concurrentes "
+              f"(scaling < {args.saturation:.2f})")
+    else:
+        print(f"\nSin saturación hasta {levels[-1]} usuarios concurrentes")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as file:
+            json.dump({"settings": vars(args), "levels": results, "saturated_at": saturated_at},
+                      file, ensure_ascii=False, indent=2, default=str)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+# ------------------------------------------------------
+# Formato compacto de los mensajes guardados en DynamoDB
+# ------------------------------------------------------
+# format_message produce por mensaje un mapa con muchos campos casi siempre
+# vacíos (additional_kwargs, example, name, response_metadata, tool_calls,
+# invalid_tool_calls, usage_metadata) que DynamoDB cobra en cada lectura y
+# escritura, con los nombres de atributo incluidos. El formato 2 guarda solo lo
+# que difiere de esos valores por defecto, con llaves cortas:
+#
+#   {"t": "human" | "ai", "c": contenido, "i": id, "r": citas, "x": {otros campos}}
+#
+# Si el JSON del mensaje pasa de MESSAGE_COMPRESS_MIN_BYTES se comprime (zstd si
+# está instalado, si no gzip) en el atributo binario Body; si no, va como mapa en
+# Msg. El item lleva Format = 2 y, si está comprimido, Codec. Los items antiguos
+# ({"Message": {...}}) se leen igual: decode_item devuelve siempre el mensaje con
+# la forma de format_message.
+
+import gzip
+import json
+import logging
+import os
+from decimal import Decimal
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+
+MESSAGE_FORMAT = 2
+
+# "auto": zstd si está instalado, si no gzip; "zstd", "gzip" o "none"
+MESSAGE_COMPRESSION = os.environ.get("CHH_MESSAGE_COMPRESSION", "auto").lower()
+MESSAGE_COMPRESS_MIN_BYTES = int(os.environ.get("CHH_MESSAGE_COMPRESS_MIN_BYTES", "1024"))
+
+# Campos de format_message con su valor por defecto; no se guardan si no cambian
+DEFAULT_FIELDS = {
+    "additional_kwargs": {},
+    "example": False,
+    "name": None,
+    "response_metadata": {},
+}
+DEFAULT_AI_FIELDS = {
+    "invalid_tool_calls": [],
+    "tool_calls": [],
+    "usage_metadata": None,
+}
+
+logger = logging.getLogger(__name__)
+
+
+def _defaults(message_type: str) -> dict:
+    return {**DEFAULT_FIELDS, **(DEFAULT_AI_FIELDS if message_type == "ai" else {})}
+
+
+def _json_default(value):
+    # DynamoDB devuelve los números como Decimal
+    if isinstance(value, Decimal):
+        return int(value) if value == value.to_integral_value() else float(value)
+    raise TypeError(f"{type(value).__name__} no se puede serializar")
+
+
+def compact_message(message: dict) -> dict:
+    """Mensaje de format_message -> mapa compacto (sin campos por defecto)."""
+    data = dict(message["data"])
+    message_type = data.pop("type", message.get("type"))
+    compact = {"t": message_type, "c": data.pop("content", "")}
+    if data.get("id"):
+        compact["i"] = data.pop("id")
+    else:
+        data.pop("id", None)
+    if data.get("citations"):
+        compact["r"] = data.pop("citations")
+    else:
+        data.pop("citations", None)
+
+    defaults = _defaults(message_type)
+    extra = {key: value for key, value in data.items() if key not in defaults or value != defaults[key]}
+    if extra:
+        compact["x"] = extra
+    return compact
+
+
+def expand_message(compact: dict) -> dict:
+    """Mapa compacto -> mensaje con la forma de format_message."""
+    message_type = compact["t"]
+    data = {**_defaults(message_type), "content": compact.get("c", ""), "id": compact.get("i"), "type": message_type}
+    data.update(compact.get("x", {}))
+    if compact.get("r"):
+        data["citations"] = compact["r"]
+    return {"data": data, "type": message_type}
+
+
+def _codec(mode: str = None):
+    mode = mode or MESSAGE_COMPRESSION
+    if mode == "auto":
+        return "zstd" if zstandard is not None else "gzip"
+    if mode == "zstd" and zstandard is None:
+        logger.warning("zstandard no está instalado: los mensajes se comprimen con gzip")
+        return "gzip"
+    return mode
+
+
+def compress(payload: bytes, codec: str) -> bytes:
+    if codec == "zstd":
+        return zstandard.ZstdCompressor(level=6).compress(payload)
+    return gzip.compress(payload, compresslevel=6)
+
+
+def decompress(body: bytes, codec: str) -> bytes:
+    if codec == "zstd":
+        if zstandard is None:
+            raise RuntimeError("Mensaje comprimido con zstd y zstandard no está instalado")
+        return zstandard.ZstdDecompressor().decompress(body)
+    return gzip.decompress(body)
+
+
+def encode_message(message: dict, compression: str = None) -> dict:
+    """Atributos del item para un mensaje (sin SessionId / MessageSeq)."""
+    compact = compact_message(message)
+    codec = _codec(compression)
+    if codec != "none":
+        payload = json.dumps(compact, ensure_ascii=False, separators=(",", ":"), default=_json_default).encode("utf-8")
+        if len(payload) >= MESSAGE_COMPRESS_MIN_BYTES:
+            return {"Format": MESSAGE_FORMAT, "Codec": codec, "Body": compress(payload, codec)}
+    return {"Format": MESSAGE_FORMAT, "Msg": compact}
+
+
+def decode_item(item: dict) -> dict:
+    """Mensaje de un item de la tabla, en formato 2 o en el formato original ("Message")."""
+    if "Message" in item:
+        return item["Message"]
+    if "Body" in item:
+        body = item["Body"]
+        body = getattr(body, "value", body)  # boto3 entrega Binary
+        return expand_message(json.loads(decompress(bytes(body), item["Codec"])))
+    return expand_message(item["Msg"])
@@ -0,0 +1,69 @@
+# ------------------------------------------------------
+# Métricas del proceso
+# ------------------------------------------------------
+# Cada componente (registro de recursos, cachés, reranking, ventana de
+# historial, servicio de generación...) suma sus contadores aquí en lugar de
+# llevar su propio lock y su propio dict. Los valores que se calculan al leer
+# (entradas de un LRU, preguntas activas, percentiles de latencia) se registran
+# con register_gauge(). snapshot() devuelve todo junto; lo muestra la página de
+# diagnóstico pages/Metricas.py (CHH_METRICS_PAGE=on) y lo leen los benchmarks.
+#
+# Solo usa la biblioteca estándar: lo importan módulos que se cargan al arrancar.
+
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+_lock = threading.Lock()
+_counters = {}
+_gauges = {}
+
+
+class Counters:
+    """Contadores con nombre de un componente; add() es seguro entre hilos."""
+
+    def __init__(self, names=()):
+        self._lock = threading.Lock()
+        self._values = dict.fromkeys(names, 0)
+
+    def add(self, **deltas):
+        with self._lock:
+            for name, value in deltas.items():
+                self._values[name] = self._values.get(name, 0) + value
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return dict(self._values)
+
+
+def counters(component: str, *names) -> Counters:
+    """Contadores del componente, los mismos para todo el proceso (names: los que empiezan en 0)."""
+    with _lock:
+        if component not in _counters:
+            _counters[component] = Counters(names)
+        return _counters[component]
+
+
+def register_gauge(component: str, read):
+    """read() -> dict con valores del componente que se calculan al leer."""
+    with _lock:
+        _gauges[component] = read
+
+
+def snapshot(component: str = None) -> dict:
+    """Contadores y gauges de todos los componentes (o solo de uno)."""
+    with _lock:
+        all_counters = dict(_counters)
+        gauges = dict(_gauges)
+    names = [component] if component else sorted({*all_counters, *gauges})
+    result = {}
+    for name in names:
+        values = all_counters[name].snapshot() if name in all_counters else {}
+        if name in gauges:
+            try:
+                values.update(gauges[name]())
+            except Exception:
+                logger.exception("No se pudo leer la métrica %s", name)
+        result[name] = values
+    return result[component] if component else result
@@ -0,0 +1,72 @@
+# ------------------------------------------------------
+# Migración de CHHSessionTable -> CHHMessageTable
+# ------------------------------------------------------
+# Recorre la tabla original (un item con todo el "History" por sesión) y escribe
+# cada mensaje como un item independiente en la tabla nueva.
+#
+#   python migrate_history.py --create-table
+#   python migrate_history.py --dry-run
+#   python migrate_history.py --session usuario@ufm.edu-hayek --overwrite
+
+import argparse
+import logging
+
+from aws_resources import get_dynamodb_resource
+from chat_history_store import (
+    LEGACY_TABLE_NAME,
+    MESSAGE_TABLE_NAME,
+    create_message_table,
+    migrate_item,
+)
+
+
+def scan_items(table):
+    """Itera todos los items de una tabla, paginando el Scan."""
+    kwargs = {}
+    while True:
+        response = table.scan(**kwargs)
+        yield from response.get("Items", [])
+        if "LastEvaluatedKey" not in response:
+            return
+        kwargs["ExclusiveStartKey"] = response["LastEvaluatedKey"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Divide los items de CHHSessionTable en un item por mensaje.")
+    parser.add_argument("--source", default=LEGACY_TABLE_NAME)
+    parser.add_argument("--target", default=MESSAGE_TABLE_NAME)
+    parser.add_argument("--session", action="append", help="Migrar solo estas sesiones (se puede repetir)")
+    parser.add_argument("--create-table", action="store_true", help="Crear la tabla destino antes de migrar")
+    parser.add_argument("--overwrite", action="store_true", help="Reescribir sesiones que ya existen en el destino")
+    parser.add_argument("--dry-run", action="store_true", help="Solo contar sesiones y mensajes")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s %(message)s")
+
+    dynamodb = get_dynamodb_resource()
+    source = dynamodb.Table(args.source)
+    target = create_message_table(dynamodb, args.target) if args.create_table else dynamodb.Table(args.target)
+
+    if args.session:
+        items = (source.get_item(Key={"SessionId": s}).get("Item") for s in args.session)
+        items = (item for item in items if item)
+    else:
+        items = scan_items(source)
+
+    sessions = 0
+    messages = 0
+    for item in items:
+        history = item.get("History", [])
+        sessions += 1
+        messages += len(history)
+        if args.dry_run:
+            logging.info("%s: %d mensajes", item["SessionId"], len(history))
+            continue
+        migrate_item(item, target, overwrite=args.overwrite)
+
+    logging.info("%d sesiones, %d mensajes %s", sessions, messages,
+                 "encontrados" if args.dry_run else "migrados")
+
+
+if __name__ == "__main__":
+    main()
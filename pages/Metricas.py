@@ -0,0 +1,38 @@
+# ------------------------------------------------------
+# Página de diagnóstico: métricas del proceso
+# ------------------------------------------------------
+# Muestra metrics.snapshot(): aciertos del registro de recursos y de las
+# cachés, tokens ahorrados, generaciones activas, latencias... de todas las
+# sesiones atendidas por este proceso. No aparece en el menú; solo responde con
+# CHH_METRICS_PAGE=on y a un usuario autenticado, si no vuelve al inicio.
+
+import os
+
+import streamlit as st
+
+from chhcore.layout import create_authenticator, hide_menu, load_users
+from metrics import snapshot
+
+
+METRICS_PAGE_ENABLED = os.environ.get("CHH_METRICS_PAGE", "off").lower() == "on"
+
+st.set_page_config(page_title='Chatbot CHH')
+
+hide_menu(st)
+
+if not METRICS_PAGE_ENABLED:
+    st.switch_page("app_autores2.py")
+
+create_authenticator(load_users())
+
+if not st.session_state.get("authentication_status"):
+    st.switch_page("app_autores2.py")
+
+st.subheader("Métricas del proceso")
+
+# Cada clic vuelve a ejecutar la página y a leer las métricas
+st.button("Actualizar")
+
+for component, values in snapshot().items():
+    with st.expander(component, expanded=True):
+        st.json(values)
@@ -0,0 +1,107 @@
+# ------------------------------------------------------
+# URL prefirmadas de S3 para las fuentes de las referencias
+# ------------------------------------------------------
+# create_presigned_url (en other_functions.py y copiado en cada página) creaba
+# un boto3.client('s3') nuevo en cada llamada y su except usaba un
+# NoCredentialsError sin importar. Aquí:
+#
+#   - el cliente de S3 es uno por proceso (aws_resources.get_s3_client);
+#   - cada URL se guarda por (bucket, key) y se reutiliza hasta
+#     PRESIGNED_URL_MARGIN segundos antes de vencer;
+#   - presigned_urls_for(uris) resuelve de una vez todas las fuentes de una
+#     respuesta, y las páginas la llaman solo al dibujar las referencias (al
+#     abrir el expander en el historial).
+
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from botocore.exceptions import BotoCoreError, ClientError, NoCredentialsError
+
+from aws_resources import get_or_create, get_s3_client
+from metrics import counters, register_gauge
+
+
+# Vigencia de cada URL: la de las páginas originales (5 min). Subirla da más
+# aciertos de cache, pero un enlace copiado de las referencias sigue abriendo el
+# documento sin sesión durante todo ese tiempo
+PRESIGNED_URL_EXPIRATION = int(os.environ.get("CHH_PRESIGNED_URL_EXPIRATION", "300"))
+# Segundos antes del vencimiento en que una URL ya no se entrega y se regenera
+PRESIGNED_URL_MARGIN = min(60, PRESIGNED_URL_EXPIRATION // 2)
+PRESIGNED_URL_CACHE_SIZE = 2048
+
+logger = logging.getLogger(__name__)
+
+
+def parse_s3_uri(uri: str) -> tuple:
+    """Parse S3 URI to extract bucket and key"""
+    bucket, _, key = uri.replace("s3://", "", 1).partition("/")
+    return bucket, key
+
+
+class PresignedUrlCache:
+    """URL prefirmadas por (bucket, key, expiración), vigentes hasta poco antes de vencer."""
+
+    def __init__(self, max_entries: int = PRESIGNED_URL_CACHE_SIZE, margin: float = PRESIGNED_URL_MARGIN):
+        self.max_entries = max_entries
+        self.margin = margin
+        self._entries = OrderedDict()  # (bucket, key, expiration) -> (url, vence)
+        self._lock = threading.Lock()
+        self._metrics = counters("presigned_urls", "hits", "generated", "errors")
+        register_gauge("presigned_urls", self._gauge)
+
+    def get(self, bucket: str, key: str, expiration: int = PRESIGNED_URL_EXPIRATION) -> str:
+        """URL vigente de la cache o una nueva; "" si no hay credenciales o falla la firma."""
+        cache_key = (bucket, key, expiration)
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(cache_key)
+            if entry and entry[1] - self.margin > now:
+                self._entries.move_to_end(cache_key)
+                self._metrics.add(hits=1)
+                return entry[0]
+
+        try:
+            url = get_s3_client().generate_presigned_url(
+                "get_object", Params={"Bucket": bucket, "Key": key}, ExpiresIn=expiration,
+            )
+        except NoCredentialsError:
+            logger.error("AWS credentials not available")
+            url = ""
+        except (BotoCoreError, ClientError):
+            logger.exception("No se pudo firmar s3://%s/%s", bucket, key)
+            url = ""
+
+        if not url:
+            self._metrics.add(errors=1)
+            return url
+        self._metrics.add(generated=1)
+        with self._lock:
+            self._entries[cache_key] = (url, now + expiration)
+            self._entries.move_to_end(cache_key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return url
+
+    def batch(self, uris, expiration: int = PRESIGNED_URL_EXPIRATION) -> dict:
+        """{uri: url} para todas las fuentes de una respuesta (cada uri distinta se firma una vez)."""
+        return {uri: self.get(*parse_s3_uri(uri), expiration) for uri in dict.fromkeys(u for u in uris if u)}
+
+    def _gauge(self) -> dict:
+        with self._lock:
+            return {"entries": len(self._entries)}
+
+
+def get_presigned_url_cache() -> PresignedUrlCache:
+    return get_or_create("presigned_urls", PRESIGNED_URL_CACHE_SIZE, PresignedUrlCache)
+
+
+def create_presigned_url(bucket_name: str, object_name: str, expiration: int = PRESIGNED_URL_EXPIRATION) -> str:
+    """Generate a presigned URL to share an S3 object"""
+    return get_presigned_url_cache().get(bucket_name, object_name, expiration)
+
+
+def presigned_urls_for(uris) -> dict:
+    return get_presigned_url_cache().batch(uris)
@@ -0,0 +1,117 @@
+# ------------------------------------------------------
+# Prompt caching de Amazon Bedrock para los prompts del sistema
+# ------------------------------------------------------
+# Los SYSTEM_PROMPT de cada página son varios KB de instrucciones fijas. El
+# system prompt se arma en dos bloques: primero las instrucciones (prefijo
+# estático, idéntico en todas las preguntas) y después la base de conocimientos
+# recuperada para la pregunta (sufijo dinámico). Así el prefijo puede marcarse
+# como punto de caché y Bedrock no vuelve a procesarlo en cada pregunta.
+#
+# Solo algunos modelos soportan prompt caching (Claude 3 Haiku no), y el
+# prefijo debe superar un mínimo de tokens (1024 en Sonnet, 2048 en Haiku)
+# para que Bedrock lo guarde. CHH_PROMPT_CACHE=auto|on|off controla la marca.
+#
+# PromptCacheUsage registra por pregunta los tokens de entrada leídos de la
+# caché, escritos en la caché y sin caché, a partir del usage_metadata del modelo.
+
+import logging
+import os
+
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
+
+from metrics import counters
+
+
+# Modelos de Bedrock con prompt caching (se compara por subcadena del model_id)
+PROMPT_CACHE_MODELS = (
+    "anthropic.claude-3-5-haiku",
+    "anthropic.claude-3-7-sonnet",
+    "anthropic.claude-sonnet-4",
+    "anthropic.claude-opus-4",
+    "amazon.nova",
+)
+
+PROMPT_CACHE_MODE = os.environ.get("CHH_PROMPT_CACHE", "auto").lower()
+
+# Sufijo dinámico: lo único que cambia entre preguntas dentro del system prompt
+CONTEXT_PROMPT = "### Base de conocimientos:\n{context}"
+
+logger = logging.getLogger(__name__)
+
+_metrics = counters("prompt_cache", "requests", "input_tokens", "cache_read", "cache_creation", "uncached", "output_tokens")
+
+
+def prompt_cache_enabled(model_id: str, mode: str = None) -> bool:
+    """True si el prefijo estático debe marcarse como punto de caché para model_id."""
+    mode = mode or PROMPT_CACHE_MODE
+    if mode == "on":
+        return True
+    if mode == "off":
+        return False
+    return any(name in model_id for name in PROMPT_CACHE_MODELS)
+
+
+def create_cached_prompt_template(system_prompt: str, history_key: str, cache_prefix: bool = False):
+    """
+    ChatPromptTemplate con el system prompt dividido en prefijo estático
+    (system_prompt, sin variables) y sufijo dinámico (CONTEXT_PROMPT), seguido
+    del historial y la pregunta. Con cache_prefix=True el prefijo lleva cache_control.
+    """
+    static_block = {"type": "text", "text": system_prompt.strip()}
+    if cache_prefix:
+        static_block["cache_control"] = {"type": "ephemeral"}
+
+    return ChatPromptTemplate.from_messages(
+        [
+            ("system", [static_block, {"type": "text", "text": CONTEXT_PROMPT}]),
+            MessagesPlaceholder(variable_name=history_key),
+            ("human", "{question}"),
+        ]
+    )
+
+
+# ------------------------------------------------------
+# Métricas de tokens en caché
+
+def usage_report(usage_metadata) -> dict:
+    """usage_metadata de LangChain -> tokens de entrada leídos / escritos / sin caché."""
+    usage_metadata = usage_metadata or {}
+    details = usage_metadata.get("input_token_details") or {}
+    cache_read = details.get("cache_read", 0) or 0
+    cache_creation = details.get("cache_creation", 0) or 0
+    input_tokens = usage_metadata.get("input_tokens", 0) or 0
+    return {
+        "input_tokens": input_tokens,
+        "cache_read": cache_read,
+        "cache_creation": cache_creation,
+        "uncached": max(input_tokens - cache_read - cache_creation, 0),
+        "output_tokens": usage_metadata.get("output_tokens", 0) or 0,
+    }
+
+
+def _record(report):
+    _metrics.add(requests=1, **{name: report[name] for name in
+                                ("input_tokens", "cache_read", "cache_creation", "uncached", "output_tokens")})
+    logger.info("Tokens de entrada: %(input_tokens)d (caché leída %(cache_read)d, "
+                "caché escrita %(cache_creation)d, sin caché %(uncached)d)", report)
+
+
+class PromptCacheUsage(BaseCallbackHandler):
+    """
+    Callback por pregunta: se pasa en config["callbacks"] al llamar a la cadena
+    y después de la respuesta deja en self.report el uso de tokens de esa llamada.
+    """
+
+    def __init__(self):
+        self.report = None
+
+    def on_llm_end(self, response, **kwargs):
+        for generations in response.generations:
+            for generation in generations:
+                message = getattr(generation, "message", None)
+                if message is None or not getattr(message, "usage_metadata", None):
+                    continue
+                self.report = usage_report(message.usage_metadata)
+                _record(self.report)
+                return
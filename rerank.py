@@ -0,0 +1,199 @@
+# ------------------------------------------------------
+# Reranking de los fragmentos recuperados antes del prompt
+# ------------------------------------------------------
+# El retriever devuelve 20 fragmentos y todos terminaban en {context}, lo que
+# infla los tokens de entrada y el tiempo al primer token. Esta etapa va entre
+# el retriever y el prompt: puntúa cada par (pregunta, fragmento), ordena y
+# conserva los mejores top_k que quepan en token_budget.
+#
+# Métodos:
+#   - "none": no reordena, solo aplica top_k / token_budget;
+#   - "bm25": puntuación léxica sin dependencias;
+#   - "cross-encoder": modelo pequeño en CPU. Requiere sentence-transformers: si
+#     no está instalado la cadena no se arma (no se cae a BM25 sin avisar).
+#
+# La etapa es opcional por página: sin "rerank" en authors.yaml el contexto
+# llega entero al prompt. Cualquier método cambia las respuestas (y las
+# referencias), así que una página solo lleva rerank después de medirlo con
+# bench_rerank.py --answers. CHH_RERANK=off desactiva la etapa en todas. El
+# reporte de cada pregunta (tokens antes/después/ahorrados) sale de la cadena en
+# la llave "rerank".
+
+import importlib.util
+import logging
+import math
+import os
+import re
+import time
+import unicodedata
+from collections import Counter
+
+from langchain_core.runnables import RunnableLambda
+
+from aws_resources import get_or_create
+from history_window import approx_token_count
+from metrics import counters
+
+
+CROSS_ENCODER_MODEL = os.environ.get("CHH_CROSS_ENCODER_MODEL", "cross-encoder/mmarco-mMiniLMv2-L12-H384-v1")
+
+RERANK_ENABLED = os.environ.get("CHH_RERANK", "on").lower() != "off"
+
+RERANK_METHODS = ("none", "bm25", "cross-encoder")
+
+# Valores de top_k y token_budget cuando la página no los indica; method es obligatorio
+RERANK_SETTING_DEFAULTS = {"top_k": 8, "token_budget": 3000}
+
+# Parámetros habituales de BM25
+BM25_K1 = 1.5
+BM25_B = 0.75
+
+STOPWORDS = frozenset(
+    "a al algo como con cual cuales de del el ella ellos en entre era es esa ese eso esta este esto fue "
+    "ha han hay la las le les lo los mas me mi muy no o para pero por que quien se segun ser si sin "
+    "sobre su sus te tiene un una uno y ya the of and to in is what who".split()
+)
+
+_WORD_RE = re.compile(r"\w+", re.UNICODE)
+
+logger = logging.getLogger(__name__)
+
+_metrics = counters("rerank", "requests", "tokens_before", "tokens_after", "tokens_saved", "documents_dropped")
+
+
+def tokenize(text: str) -> list:
+    """Palabras en minúsculas, sin tildes y sin stopwords (para BM25)."""
+    text = unicodedata.normalize("NFKD", text.casefold())
+    text = "".join(c for c in text if not unicodedata.combining(c))
+    return [w for w in _WORD_RE.findall(text) if w not in STOPWORDS]
+
+
+def bm25_scores(question: str, texts: list) -> list:
+    """BM25 de la pregunta contra los fragmentos candidatos (el IDF se calcula sobre ellos mismos)."""
+    documents = [tokenize(text) for text in texts]
+    if not documents:
+        return []
+    avg_length = sum(len(d) for d in documents) / len(documents) or 1.0
+    frequencies = Counter(term for d in documents for term in set(d))
+    n = len(documents)
+
+    scores = []
+    for document in documents:
+        counts = Counter(document)
+        score = 0.0
+        for term in set(tokenize(question)):
+            if term not in counts:
+                continue
+            idf = math.log(1 + (n - frequencies[term] + 0.5) / (frequencies[term] + 0.5))
+            tf = counts[term]
+            score += idf * tf * (BM25_K1 + 1) / (tf + BM25_K1 * (1 - BM25_B + BM25_B * len(document) / avg_length))
+        scores.append(score)
+    return scores
+
+
+def cross_encoder_available() -> bool:
+    return importlib.util.find_spec("sentence_transformers") is not None
+
+
+def get_cross_encoder(model_name: str = CROSS_ENCODER_MODEL):
+    """CrossEncoder en CPU compartido por proceso; ImportError si sentence-transformers no está instalado."""
+    def _load():
+        try:
+            from sentence_transformers import CrossEncoder
+        except ImportError as error:
+            raise ImportError('El reranking "cross-encoder" requiere sentence-transformers') from error
+        return CrossEncoder(model_name, device="cpu", max_length=512)
+
+    return get_or_create("cross_encoder", model_name, _load)
+
+
+def check_method(method: str):
+    """ValueError si method no es uno de RERANK_METHODS; carga el cross-encoder si se pide."""
+    if method not in RERANK_METHODS:
+        raise ValueError(f"Método de reranking desconocido: {method} (métodos: {', '.join(RERANK_METHODS)})")
+    if method == "cross-encoder":
+        get_cross_encoder()
+
+
+def check_settings(settings: dict) -> dict:
+    """rerank_settings de una página completados con RERANK_SETTING_DEFAULTS; ValueError si no son válidos."""
+    unknown = set(settings) - {"method", *RERANK_SETTING_DEFAULTS}
+    if unknown:
+        raise ValueError(f"Opciones de reranking desconocidas: {', '.join(sorted(unknown))} "
+                         f"(opciones: method, {', '.join(RERANK_SETTING_DEFAULTS)})")
+    if "method" not in settings:
+        raise ValueError(f"El reranking necesita method (métodos: {', '.join(RERANK_METHODS)})")
+    check_method(settings["method"])
+    return {**RERANK_SETTING_DEFAULTS, **settings}
+
+
+def score_documents(question: str, documents: list, method: str = "none") -> list:
+    """Puntuación de cada documento según method."""
+    check_method(method)
+    texts = [doc.page_content for doc in documents]
+    if method == "cross-encoder":
+        return [float(s) for s in get_cross_encoder().predict([(question, text) for text in texts])]
+    if method == "bm25":
+        return bm25_scores(question, texts)
+    # "none": conserva el orden del retriever
+    return [-float(i) for i in range(len(texts))]
+
+
+def rerank_documents(question: str, documents: list, method: str = "none",
+                     top_k: int = 8, token_budget: int = 3000):
+    """
+    Ordena los documentos por relevancia y conserva los top_k que caben en
+    token_budget (siempre al menos uno). Devuelve (documentos, reporte).
+    """
+    start = time.perf_counter()
+    scores = score_documents(question, documents, method)
+    costs = [approx_token_count(doc.page_content) for doc in documents]
+    ranked = sorted(range(len(documents)), key=lambda i: scores[i], reverse=True)
+
+    kept = []
+    used = 0
+    for i in ranked:
+        if len(kept) == top_k:
+            break
+        if kept and used + costs[i] > token_budget:
+            continue
+        documents[i].metadata = {**documents[i].metadata, "rerank_score": round(scores[i], 4)}
+        kept.append(documents[i])
+        used += costs[i]
+
+    tokens_before = sum(costs)
+    report = {
+        "method": method,
+        "candidates": len(documents),
+        "kept": len(kept),
+        "tokens_before": tokens_before,
+        "tokens_after": used,
+        "tokens_saved": tokens_before - used,
+        "ms": round((time.perf_counter() - start) * 1000, 1),
+    }
+    return kept, report
+
+
+def _record(report):
+    _metrics.add(requests=1, tokens_before=report["tokens_before"], tokens_after=report["tokens_after"],
+                 tokens_saved=report["tokens_saved"], documents_dropped=report["candidates"] - report["kept"])
+    logger.info("Reranking %(method)s: %(kept)d/%(candidates)d fragmentos, %(tokens_saved)d tokens ahorrados", report)
+
+
+def reranker(settings: dict = None):
+    """
+    Runnable que reordena y recorta inputs["context"] según settings
+    ({"method", "top_k", "token_budget"}) y agrega el reporte en inputs["rerank"].
+    Con settings=None o CHH_RERANK=off deja el contexto como está. Opciones o
+    métodos desconocidos, o sin sus dependencias, fallan al armar la cadena.
+    """
+    settings = check_settings(settings) if settings and RERANK_ENABLED else None
+
+    def _apply(inputs: dict) -> dict:
+        if not settings:
+            return {**inputs, "rerank": None}
+        kept, report = rerank_documents(inputs["question"], list(inputs["context"]), **settings)
+        _record(report)
+        return {**inputs, "context": kept, "rerank": report}
+
+    return RunnableLambda(_apply, name="Rerank")
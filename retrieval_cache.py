@@ -0,0 +1,202 @@
+# ------------------------------------------------------
+# Caché de resultados del retriever de Knowledge Bases
+# ------------------------------------------------------
+# La rama "context" de cada cadena llama a la API Retrieve de Bedrock en cada
+# pregunta, aunque sea la misma que otro usuario hizo minutos antes.
+# CachingRetriever envuelve al AmazonKnowledgeBasesRetriever y guarda los
+# documentos por (KB, pregunta normalizada, numberOfResults):
+#
+#   - memoria: LRU acotado (CHH_RETRIEVAL_CACHE_MAX_ENTRIES), compartido por
+#     todas las sesiones del proceso;
+#   - disco (opcional, CHH_RETRIEVAL_CACHE_DIR): un JSON por llave, compartido
+#     entre procesos y reinicios.
+#
+# Ambas capas expiran por TTL (CHH_RETRIEVAL_CACHE_TTL) para que una KB
+# re-sincronizada se vea a más tardar en ese plazo; invalidate() la descarta antes.
+
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, List
+
+from langchain_core.callbacks import CallbackManagerForRetrieverRun
+from langchain_core.documents import Document
+from langchain_core.retrievers import BaseRetriever
+
+from aws_resources import get_or_create, get_retriever
+from metrics import counters, register_gauge
+
+
+RETRIEVAL_CACHE_MAX_ENTRIES = int(os.environ.get("CHH_RETRIEVAL_CACHE_MAX_ENTRIES", "256"))
+RETRIEVAL_CACHE_TTL_SECONDS = int(os.environ.get("CHH_RETRIEVAL_CACHE_TTL", "3600"))
+
+# Sin directorio no hay capa en disco
+RETRIEVAL_CACHE_DIR = os.environ.get("CHH_RETRIEVAL_CACHE_DIR")
+
+_WHITESPACE_RE = re.compile(r"\s+")
+
+logger = logging.getLogger(__name__)
+
+
+def normalize_query(query: str) -> str:
+    return _WHITESPACE_RE.sub(" ", query).strip().casefold()
+
+
+def cache_key(knowledge_base_id: str, query: str, number_of_results: int) -> str:
+    return json.dumps([knowledge_base_id, normalize_query(query), number_of_results], ensure_ascii=False)
+
+
+class RetrievalCache:
+    """Documentos recuperados por llave, en memoria (LRU) y opcionalmente en disco, con TTL."""
+
+    def __init__(self, max_entries: int = RETRIEVAL_CACHE_MAX_ENTRIES,
+                 ttl_seconds: int = RETRIEVAL_CACHE_TTL_SECONDS, cache_dir: str = RETRIEVAL_CACHE_DIR):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.cache_dir = cache_dir
+        self._lock = threading.Lock()
+        self._memory = OrderedDict()  # llave -> (creado, documentos serializados)
+        self._metrics = counters("retrieval_cache", "memory_hits", "disk_hits", "misses",
+                                 "evictions", "expirations", "hit_ms", "miss_ms")
+        register_gauge("retrieval_cache", self._gauge)
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+
+    def _disk_path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, hashlib.sha256(key.encode("utf-8")).hexdigest() + ".json")
+
+    def _read_disk(self, key: str, now: float):
+        path = self._disk_path(key)
+        try:
+            with open(path, encoding="utf-8") as file:
+                data = json.load(file)
+        except (OSError, ValueError):
+            return None
+        if data.get("key") != key:
+            return None
+        if now - data["created"] > self.ttl_seconds:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            return None
+        return data["created"], data["documents"]
+
+    def _write_disk(self, key: str, created: float, documents: list):
+        path = self._disk_path(key)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as file:
+                json.dump({"key": key, "created": created, "documents": documents}, file,
+                          ensure_ascii=False, default=str)
+            os.replace(tmp_path, path)
+        except OSError:
+            logger.exception("No se pudo escribir la caché de retrieval en disco")
+
+    def _remember(self, key: str, created: float, documents: list):
+        self._memory[key] = (created, documents)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+            self._metrics.add(evictions=1)
+
+    def get(self, key: str):
+        """Documentos serializados de la llave o None; devuelve también la capa ("memory"/"disk")."""
+        now = time.time()
+        with self._lock:
+            cached = self._memory.get(key)
+            if cached and now - cached[0] > self.ttl_seconds:
+                del self._memory[key]
+                self._metrics.add(expirations=1)
+                cached = None
+            if cached:
+                self._memory.move_to_end(key)
+                return cached[1], "memory"
+
+        if self.cache_dir:
+            cached = self._read_disk(key, now)
+            if cached:
+                with self._lock:
+                    self._remember(key, *cached)
+                return cached[1], "disk"
+        return None, None
+
+    def put(self, key: str, documents: list):
+        created = time.time()
+        with self._lock:
+            self._remember(key, created, documents)
+        if self.cache_dir:
+            self._write_disk(key, created, documents)
+
+    def record(self, tier, elapsed_ms: float):
+        if tier:
+            self._metrics.add(**{f"{tier}_hits": 1, "hit_ms": elapsed_ms})
+        else:
+            self._metrics.add(misses=1, miss_ms=elapsed_ms)
+
+    def invalidate(self, knowledge_base_id: str = None):
+        """Descarta las entradas en memoria de una KB (o todas) y, si hay disco, sus archivos."""
+        with self._lock:
+            for key in [k for k in self._memory if knowledge_base_id is None or json.loads(k)[0] == knowledge_base_id]:
+                del self._memory[key]
+        if not self.cache_dir:
+            return
+        for name in os.listdir(self.cache_dir):
+            path = os.path.join(self.cache_dir, name)
+            try:
+                if knowledge_base_id is not None:
+                    with open(path, encoding="utf-8") as file:
+                        if json.loads(json.load(file)["key"])[0] != knowledge_base_id:
+                            continue
+                os.remove(path)
+            except (OSError, ValueError, KeyError):
+                pass
+
+    def _gauge(self) -> dict:
+        with self._lock:
+            return {"entries": len(self._memory)}
+
+
+class CachingRetriever(BaseRetriever):
+    """Retriever que consulta la caché antes de llamar al retriever de la KB."""
+
+    retriever: BaseRetriever
+    knowledge_base_id: str
+    number_of_results: int
+    cache: Any
+
+    def _get_relevant_documents(self, query: str, *, run_manager: CallbackManagerForRetrieverRun) -> List[Document]:
+        start = time.perf_counter()
+        key = cache_key(self.knowledge_base_id, query, self.number_of_results)
+        documents, tier = self.cache.get(key)
+        if documents is None:
+            results = self.retriever.invoke(query, config={"callbacks": run_manager.get_child()})
+            documents = [{"page_content": doc.page_content, "metadata": doc.metadata} for doc in results]
+            self.cache.put(key, documents)
+        self.cache.record(tier, (time.perf_counter() - start) * 1000)
+        # Copias nuevas: quien reciba los documentos puede modificarlos sin tocar la caché
+        return [Document(page_content=doc["page_content"], metadata=json.loads(json.dumps(doc["metadata"], default=str)))
+                for doc in documents]
+
+
+def get_retrieval_cache() -> RetrievalCache:
+    """Caché compartida por todos los retrievers del proceso."""
+    return get_or_create("retrieval_cache", (RETRIEVAL_CACHE_MAX_ENTRIES, RETRIEVAL_CACHE_TTL_SECONDS, RETRIEVAL_CACHE_DIR),
+                         RetrievalCache)
+
+
+def get_cached_retriever(knowledge_base_id: str, number_of_results: int = 20) -> CachingRetriever:
+    return get_or_create(
+        "cached_kb_retriever", (knowledge_base_id, number_of_results),
+        lambda: CachingRetriever(
+            retriever=get_retriever(knowledge_base_id, number_of_results),
+            knowledge_base_id=knowledge_base_id,
+            number_of_results=number_of_results,
+            cache=get_retrieval_cache(),
+        ),
+    )
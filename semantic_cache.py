@@ -0,0 +1,276 @@
+# ------------------------------------------------------
+# Caché semántica de respuestas del primer turno
+# ------------------------------------------------------
+# Muchos estudiantes abren la conversación con la misma pregunta escrita de
+# otra forma ("¿Quién fue Henry Hazlitt?" / "quien era hazlitt"). Antes de
+# llamar a la cadena, la pregunta del primer turno de una sesión se normaliza,
+# se convierte en embedding (Titan en Bedrock) y se busca la pregunta anterior
+# más parecida de la misma base de conocimientos; si la similitud supera el
+# umbral, se repite esa respuesta con sus documentos en lugar de hacer
+# retrieval y generación.
+#
+# Solo se cachean primeros turnos: sin historial la respuesta depende únicamente
+# de la pregunta, la KB y la versión de la cadena (modelo + prompt).
+#
+# El índice vive en memoria del proceso, uno por (KB, versión), con expulsión
+# LRU al llenarse y TTL por entrada. Es una búsqueda exacta por producto punto
+# sobre una matriz acotada (SEMANTIC_CACHE_MAX_ENTRIES), que a este tamaño
+# cuesta menos que un índice aproximado.
+#
+# Cuando una KB se vuelve a sincronizar hay que invalidar sus entradas:
+# invalidate_knowledge_base() dentro del proceso, o desde el job de ingesta
+#   python semantic_cache.py --invalidate HME7HA8YXX
+# que toca un archivo marcador que los procesos de Streamlit revisan.
+
+import argparse
+import logging
+import os
+import re
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+
+from aws_resources import get_embeddings, get_or_create
+from federated_retriever import knowledge_base_ids
+from lazy_imports import lazy_module
+from metrics import counters, register_gauge
+from retrieval_cache import get_retrieval_cache
+
+# numpy solo se importa en la primera búsqueda (ver lazy_imports.py)
+np = lazy_module("numpy")
+
+
+EMBEDDING_MODEL_ID = os.environ.get("CHH_EMBEDDING_MODEL_ID", "amazon.titan-embed-text-v2:0")
+
+# Similitud coseno mínima para considerar que dos preguntas son la misma
+SEMANTIC_CACHE_THRESHOLD = float(os.environ.get("CHH_SEMANTIC_CACHE_THRESHOLD", "0.92"))
+SEMANTIC_CACHE_MAX_ENTRIES = int(os.environ.get("CHH_SEMANTIC_CACHE_MAX_ENTRIES", "512"))
+SEMANTIC_CACHE_TTL_SECONDS = int(os.environ.get("CHH_SEMANTIC_CACHE_TTL", str(24 * 3600)))
+
+# Marcadores de re-sincronización de las KB (un archivo por KB, se compara su mtime)
+KB_SYNC_DIR = os.environ.get("CHH_KB_SYNC_DIR", "kb_sync")
+SYNC_CHECK_SECONDS = 30
+
+_PUNCTUATION_RE = re.compile(r"[^\w\s]", re.UNICODE)
+_WHITESPACE_RE = re.compile(r"\s+")
+
+logger = logging.getLogger(__name__)
+
+
+def normalize_question(question: str) -> str:
+    """Minúsculas, sin tildes, sin signos de puntuación y con espacios colapsados."""
+    text = unicodedata.normalize("NFKD", question.casefold())
+    text = "".join(c for c in text if not unicodedata.combining(c))
+    text = _PUNCTUATION_RE.sub(" ", text)
+    return _WHITESPACE_RE.sub(" ", text).strip()
+
+
+def sync_marker_path(knowledge_base_id: str) -> str:
+    return os.path.join(KB_SYNC_DIR, knowledge_base_id)
+
+
+def mark_knowledge_base_synced(knowledge_base_id: str):
+    """Para el job de ingesta: invalida la KB en todos los procesos que lean KB_SYNC_DIR."""
+    os.makedirs(KB_SYNC_DIR, exist_ok=True)
+    with open(sync_marker_path(knowledge_base_id), "a"):
+        pass
+    os.utime(sync_marker_path(knowledge_base_id))
+
+
+class _Index:
+    """Entradas de una (KB, versión) en orden LRU, con la matriz de embeddings construida a demanda."""
+
+    def __init__(self):
+        self.entries = OrderedDict()  # pregunta normalizada -> entrada
+        self._matrix = None
+        self._keys = None
+
+    def add(self, key, entry):
+        self.entries[key] = entry
+        self.entries.move_to_end(key)
+        self._matrix = None
+
+    def pop(self, key):
+        self.entries.pop(key, None)
+        self._matrix = None
+
+    def nearest(self, vector):
+        if not self.entries:
+            return None, 0.0
+        if self._matrix is None:
+            self._keys = list(self.entries)
+            self._matrix = np.stack([self.entries[k]["vector"] for k in self._keys])
+        scores = self._matrix @ vector
+        best = int(np.argmax(scores))
+        return self._keys[best], float(scores[best])
+
+
+class SemanticAnswerCache:
+    """
+    Respuestas de primer turno por (KB, versión), buscadas por similitud del
+    embedding de la pregunta. lookup() devuelve {"question", "answer", "context"},
+    el mismo formato que answer_cache.lookup_answer().
+    """
+
+    def __init__(self, embed_query, threshold: float = SEMANTIC_CACHE_THRESHOLD,
+                 max_entries: int = SEMANTIC_CACHE_MAX_ENTRIES, ttl_seconds: int = SEMANTIC_CACHE_TTL_SECONDS):
+        self.embed_query = embed_query
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._indexes = {}
+        self._vectors = OrderedDict()  # embeddings recientes, para no recalcularlos en store()
+        self._synced = {}  # KB -> (revisado_en, mtime del marcador)
+        self._metrics = counters("semantic_cache", "lookups", "hits", "exact_hits", "misses", "errors",
+                                 "stores", "evictions", "expirations", "invalidations")
+        register_gauge("semantic_cache", self._gauge)
+
+    # --------------------------------------------------
+    # Embeddings
+
+    def _vector(self, key: str):
+        with self._lock:
+            if key in self._vectors:
+                self._vectors.move_to_end(key)
+                return self._vectors[key]
+
+        vector = np.asarray(self.embed_query(key), dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        vector = vector / norm if norm else vector
+
+        with self._lock:
+            self._vectors[key] = vector
+            while len(self._vectors) > self.max_entries:
+                self._vectors.popitem(last=False)
+        return vector
+
+    # --------------------------------------------------
+    # Expiración e invalidación
+
+    def _expire(self, index: _Index, now: float):
+        expired = [k for k, e in index.entries.items() if now - e["created"] > self.ttl_seconds]
+        for key in expired:
+            index.pop(key)
+        self._metrics.add(expirations=len(expired))
+
+    def _check_sync_markers(self, knowledge_base_id: str, now: float):
+        # Un identificador federado ("KB1+KB2+KB3") depende del marcador de cada KB
+        for kb_id in knowledge_base_ids(knowledge_base_id):
+            self._check_sync_marker(kb_id, now)
+
+    def _check_sync_marker(self, knowledge_base_id: str, now: float):
+        seen = self._synced.get(knowledge_base_id)
+        if seen and now - seen[0] < SYNC_CHECK_SECONDS:
+            return
+        try:
+            mtime = os.path.getmtime(sync_marker_path(knowledge_base_id))
+        except OSError:
+            mtime = None
+        self._synced[knowledge_base_id] = (now, mtime)
+        # La primera revisión solo registra el marcador; después, cualquier cambio invalida
+        if seen and mtime != seen[1]:
+            self._invalidate_locked(knowledge_base_id)
+
+    def _invalidate_locked(self, knowledge_base_id: str = None):
+        for key in [k for k in self._indexes if knowledge_base_id is None or knowledge_base_id in knowledge_base_ids(k[0])]:
+            del self._indexes[key]
+        self._metrics.add(invalidations=1)
+        logger.info("Caché semántica invalidada (%s)", knowledge_base_id or "todas las KB")
+
+    def invalidate(self, knowledge_base_id: str = None):
+        """Descarta las respuestas de una KB (o de todas) después de re-sincronizarla."""
+        with self._lock:
+            self._invalidate_locked(knowledge_base_id)
+
+    # --------------------------------------------------
+    # Consulta y alta
+
+    def lookup(self, knowledge_base_id: str, question: str, version: str):
+        key = normalize_question(question)
+        now = time.time()
+        with self._lock:
+            self._metrics.add(lookups=1)
+            self._check_sync_markers(knowledge_base_id, now)
+            index = self._indexes.get((knowledge_base_id, version))
+            if index is None or not index.entries:
+                self._metrics.add(misses=1)
+                return None
+            self._expire(index, now)
+            entry = index.entries.get(key)
+            if entry:
+                # Misma pregunta normalizada: no hace falta el embedding
+                index.entries.move_to_end(key)
+                self._metrics.add(hits=1, exact_hits=1)
+                return entry
+
+        try:
+            vector = self._vector(key)
+        except Exception:
+            logger.exception("No se pudo calcular el embedding de la pregunta")
+            self._metrics.add(errors=1, misses=1)
+            return None
+
+        with self._lock:
+            index = self._indexes.get((knowledge_base_id, version))
+            match, score = index.nearest(vector) if index else (None, 0.0)
+            if match is None or score < self.threshold:
+                self._metrics.add(misses=1)
+                return None
+            index.entries.move_to_end(match)
+            self._metrics.add(hits=1)
+            logger.info("Caché semántica: %r ~ %r (%.3f)", question, index.entries[match]["question"], score)
+            return index.entries[match]
+
+    def store(self, knowledge_base_id: str, question: str, answer: str, context: list, version: str):
+        """Guarda la respuesta de un primer turno; context son los documentos serializados."""
+        if not answer:
+            return
+        key = normalize_question(question)
+        try:
+            vector = self._vector(key)
+        except Exception:
+            logger.exception("No se pudo calcular el embedding de la pregunta")
+            self._metrics.add(errors=1)
+            return
+
+        with self._lock:
+            index = self._indexes.setdefault((knowledge_base_id, version), _Index())
+            index.add(key, {"question": question, "answer": answer, "context": context,
+                            "vector": vector, "created": time.time()})
+            self._metrics.add(stores=1)
+            while len(index.entries) > self.max_entries:
+                index.pop(next(iter(index.entries)))
+                self._metrics.add(evictions=1)
+
+    def _gauge(self) -> dict:
+        with self._lock:
+            return {"entries": sum(len(index.entries) for index in self._indexes.values())}
+
+
+def get_semantic_cache(model_id: str = EMBEDDING_MODEL_ID) -> SemanticAnswerCache:
+    """Caché compartida por todas las sesiones del proceso."""
+    return get_or_create(
+        "semantic_cache", model_id,
+        lambda: SemanticAnswerCache(get_embeddings(model_id).embed_query),
+    )
+
+
+def invalidate_knowledge_base(knowledge_base_id: str = None):
+    """Hook para la re-sincronización de una KB dentro del proceso (respuestas y documentos)."""
+    get_semantic_cache().invalidate(knowledge_base_id)
+    get_retrieval_cache().invalidate(knowledge_base_id)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Invalida la caché semántica de una KB re-sincronizada")
+    parser.add_argument("--invalidate", action="append", required=True, metavar="KB_ID")
+    args = parser.parse_args()
+    for knowledge_base_id in args.invalidate:
+        mark_knowledge_base_synced(knowledge_base_id)
+        print(f"{knowledge_base_id}: marcador actualizado en {sync_marker_path(knowledge_base_id)}")
+
+
+if __name__ == "__main__":
+    main()
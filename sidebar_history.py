@@ -0,0 +1,66 @@
+# ------------------------------------------------------
+# HTML del historial de la barra lateral
+# ------------------------------------------------------
+# display_history armaba en cada rerun un <div> con estilos por mensaje y un
+# st.markdown por cada uno, aunque el expander "Ver historial de conversación"
+# estuviera cerrado. Ahora las páginas solo lo dibujan con el expander abierto
+# (transcript.lazy_expander) y en un solo st.markdown; el HTML de cada mensaje
+# se escapa y se arma una vez por id de mensaje (el uuid de format_message) y se
+# guarda en un LRU del proceso.
+
+import html
+import threading
+from collections import OrderedDict
+
+from metrics import counters, register_gauge
+
+
+SIDEBAR_HTML_CACHE_SIZE = 4096
+
+MESSAGE_STYLE = (
+    "padding: 10px; margin-bottom: 10px; background-color: #ffffff; border-radius: 8px; "
+    "border: 1px solid rgba(49, 51, 63, 0.2); color: #262730; font-size: 0.9em;"
+)
+
+_lock = threading.Lock()
+_cache = OrderedDict()
+_metrics = counters("sidebar_html", "hits", "misses")
+
+
+def _build(role_label: str, content: str) -> str:
+    body = html.escape(content).replace("\n", "<br>")
+    return f'<div style="{MESSAGE_STYLE}"><strong>{html.escape(role_label)}:</strong><br>{body}</div>'
+
+
+def message_html(message: dict, assistant_label: str) -> str:
+    """HTML de un mensaje guardado ({"data": {"id", "type", "content"}}), memoizado por id."""
+    data = message["data"]
+    role_label = "Usuario" if data["type"] == "human" else assistant_label
+    # Mensajes antiguos sin id: el propio contenido sirve de llave
+    key = (data.get("id") or data["content"], role_label)
+    with _lock:
+        cached = _cache.get(key)
+        if cached is not None:
+            _cache.move_to_end(key)
+            _metrics.add(hits=1)
+            return cached
+    _metrics.add(misses=1)
+
+    rendered = _build(role_label, data["content"])
+    with _lock:
+        _cache[key] = rendered
+        while len(_cache) > SIDEBAR_HTML_CACHE_SIZE:
+            _cache.popitem(last=False)
+    return rendered
+
+
+def history_html(messages: list, assistant_label: str) -> str:
+    return "".join(message_html(message, assistant_label) for message in messages)
+
+
+def _gauge() -> dict:
+    with _lock:
+        return {"entries": len(_cache)}
+
+
+register_gauge("sidebar_html", _gauge)
@@ -0,0 +1,261 @@
+# ------------------------------------------------------
+# Perfil de arranque de las páginas
+# ------------------------------------------------------
+# Cada página se abre en un proceso nuevo, como la primera visita después de
+# reiniciar el contenedor, y se mide:
+#
+#   - el tiempo de importación de cada módulo que carga la página (python -X
+#     importtime), agrupado por paquete, y las importaciones más caras
+#   - la latencia del primer render (importaciones incluidas) y de un rerun
+#   - qué módulos diferidos (lazy_imports.py) se cargaron durante el render
+#
+# Sin --user solo se mide la pantalla de login (app_autores2.py sin sesión).
+# Con --user se abre además cada página de autor con esa sesión iniciada; el
+# historial se lee de DynamoDB Local si DYNAMODB_ENDPOINT_URL está definido, si
+# no de moto en memoria (lo que se importa para crear las tablas, boto3 y
+# aws_resources, queda entonces fuera del perfil). El primer render no llama a
+# Bedrock.
+#
+#   python startup_profile.py
+#   python startup_profile.py --user perfil@ufm.edu --runs 3 --save-baseline startup_baseline.json
+#   python startup_profile.py --user perfil@ufm.edu --runs 3 --baseline startup_baseline.json
+#
+# Con --baseline sale con código 1 si el primer render o el tiempo de
+# importación de alguna página empeoró más que --threshold (por defecto 25 %,
+# CHH_STARTUP_THRESHOLD) y más de NOISE_FLOOR_MS.
+
+import argparse
+import contextlib
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from collections import defaultdict
+
+
+# Script con el que se levanta la app (streamlit run app_autores2.py); las páginas
+# de autor se abren desde aquí, como con page_link / switch_page
+ENTRYPOINT = "app_autores2.py"
+
+# Pantalla de login: app_autores2.py sin sesión iniciada
+LOGIN_PAGE = "login"
+
+# Línea que el proceso hijo escribe en stderr justo antes del primer render;
+# las importaciones anteriores (streamlit, AppTest, moto) no cuentan
+RENDER_MARKER = "startup_profile: render"
+
+DEFAULT_THRESHOLD = float(os.environ.get("CHH_STARTUP_THRESHOLD", "0.25"))
+
+# Diferencias menores que esto son ruido entre procesos y no cuentan como regresión
+NOISE_FLOOR_MS = 50.0
+
+# Métricas que se comparan con la línea base
+CHECKED_METRICS = ("first_render_ms", "import_ms")
+
+
+# ------------------------------------------------------
+# Proceso hijo: un render de una página
+
+
+def render_page(path: str, user: str = None) -> dict:
+    # Aquí solo se importa lo que no es de la página: el resto cuenta en el perfil
+    from streamlit.testing.v1 import AppTest
+
+    from chhbench.backends import dynamodb_backend
+    from lazy_imports import lazy_import_stats
+
+    backend = dynamodb_backend() if user else contextlib.nullcontext()
+    with backend:
+        app = AppTest.from_file(ENTRYPOINT, default_timeout=120)
+        if path != ENTRYPOINT:
+            app.switch_page(path)
+        if user:
+            app.session_state["authentication_status"] = True
+            app.session_state["username"] = user
+            app.session_state["name"] = user
+
+        print(RENDER_MARKER, file=sys.stderr, flush=True)
+        start = time.perf_counter()
+        app.run()
+        first_render_ms = (time.perf_counter() - start) * 1000
+
+        start = time.perf_counter()
+        app.run()
+        rerun_ms = (time.perf_counter() - start) * 1000
+
+        return {
+            "first_render_ms": round(first_render_ms, 1),
+            "rerun_ms": round(rerun_ms, 1),
+            "errors": [str(exception.value) for exception in app.exception],
+            "lazy_imports": lazy_import_stats(),
+        }
+
+
+# ------------------------------------------------------
+# Proceso padre: perfiles, resumen y comparación con la línea base
+
+
+def parse_importtime(stderr: str):
+    """Líneas de -X importtime después de RENDER_MARKER: [(módulo, self_us, cumulative_us, nivel)]."""
+    rows = []
+    lines = stderr.splitlines()
+    if RENDER_MARKER in lines:
+        lines = lines[lines.index(RENDER_MARKER) + 1:]
+    for line in lines:
+        if not line.startswith("import time:") or "imported package" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        name = name.rstrip()
+        # La indentación del nombre es la profundidad: " a" lo importa la página, "   b" lo importa a
+        level = (len(name) - len(name.lstrip()) - 1) // 2
+        rows.append((name.strip(), int(self_us), int(cumulative_us), level))
+    return rows
+
+
+def profile_once(page: str, path: str, user: str = None) -> dict:
+    command = [sys.executable, "-X", "importtime", os.path.abspath(__file__), "--child", path]
+    if user:
+        command += ["--user", user]
+    process = subprocess.run(command, capture_output=True, text=True, env={**os.environ, "PYTHONWARNINGS": "ignore"})
+    if process.returncode != 0:
+        raise RuntimeError(f"{page}: el proceso de perfil terminó con código {process.returncode}\n{process.stderr[-2000:]}")
+    result = {"page": page, **json.loads(process.stdout.strip().splitlines()[-1])}
+
+    imports = parse_importtime(process.stderr)
+    packages = defaultdict(int)
+    for name, self_us, _, _ in imports:
+        packages[name.split(".")[0]] += self_us
+    # Las importaciones que hace la página directamente (primer nivel) con su costo total
+    top_level = sorted((row for row in imports if row[3] == 0), key=lambda row: row[2], reverse=True)
+
+    result["import_ms"] = round(sum(packages.values()) / 1000, 1)
+    result["modules"] = len(imports)
+    result["packages_ms"] = {name: round(us / 1000, 1) for name, us in packages.items()}
+    result["top_imports_ms"] = {name: round(cumulative_us / 1000, 1) for name, _, cumulative_us, _ in top_level[:10]}
+    return result
+
+
+def profile_page(page: str, path: str, runs: int, user: str = None) -> dict:
+    results = [profile_once(page, path, user) for _ in range(runs)]
+    # Mediana de los procesos; el detalle de importaciones es el de la corrida mediana
+    median_run = sorted(results, key=lambda result: result["first_render_ms"])[len(results) // 2]
+    summary = dict(median_run)
+    for metric in ("first_render_ms", "rerun_ms", "import_ms"):
+        summary[metric] = round(statistics.median(result[metric] for result in results), 1)
+    summary["runs"] = runs
+    return summary
+
+
+def print_profile(profile: dict, top: int):
+    for page, summary in profile.items():
+        print(f"{page:<8} primer render {summary['first_render_ms']:7.0f} ms  rerun {summary['rerun_ms']:6.0f} ms  "
+              f"importaciones {summary['import_ms']:7.0f} ms ({summary['modules']} módulos)")
+        packages = sorted(summary["packages_ms"].items(), key=lambda item: item[1], reverse=True)[:top]
+        print("         por paquete: " + ", ".join(f"{name} {ms:.0f}" for name, ms in packages))
+        print("         más caras:   " + ", ".join(f"{name} {ms:.0f}" for name, ms in list(summary["top_imports_ms"].items())[:top]))
+        if summary["lazy_imports"]:
+            print("         diferidos:   " + ", ".join(f"{name} {entry['ms']:.0f}" for name, entry in summary["lazy_imports"].items()))
+        for error in summary["errors"]:
+            print(f"         ERROR: {error}")
+
+
+def regressions(profile: dict, baseline: dict, threshold: float) -> list:
+    found = []
+    for page, summary in profile.items():
+        if page not in baseline:
+            continue
+        for metric in CHECKED_METRICS:
+            before, after = baseline[page][metric], summary[metric]
+            if after > before * (1 + threshold) and after - before > NOISE_FLOOR_MS:
+                found.append(f"{page}: {metric} {before:.0f} -> {after:.0f} ms (+{100 * (after / before - 1):.0f}%)")
+    return found
+
+
+@contextlib.contextmanager
+def users_config(user: str = None):
+    """Usuarios del autenticador: CHH_USERS_CONFIG / userschh.yaml si existe, si no uno temporal."""
+    path = os.environ.get("CHH_USERS_CONFIG", "userschh.yaml")
+    if os.path.exists(path):
+        yield
+        return
+
+    import yaml
+
+    config = {
+        "credentials": {"usernames": {user: {"email": user, "name": user, "password": "-"}} if user else {}},
+        "cookie": {"name": "chh_startup_profile", "key": "startup_profile", "expiry_days": 1},
+    }
+    with tempfile.NamedTemporaryFile("w", suffix=".yaml", delete=False) as file:
+        yaml.dump(config, file)
+    os.environ["CHH_USERS_CONFIG"] = file.name
+    try:
+        yield
+    finally:
+        del os.environ["CHH_USERS_CONFIG"]
+        os.remove(file.name)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Tiempo de importación y primer render de cada página")
+    parser.add_argument("--page", action="append",
+                        help="login o un autor de chhcore/authors.yaml (se puede repetir); "
+                             "por defecto el login y, con --user, todos los autores")
+    parser.add_argument("--user", help="Abre las páginas de autor con la sesión de este usuario")
+    parser.add_argument("--runs", type=int, default=1, help="Procesos por página (se reporta la mediana)")
+    parser.add_argument("--top", type=int, default=6, help="Paquetes e importaciones a mostrar por página")
+    parser.add_argument("--json", metavar="ARCHIVO", help="Guarda el perfil completo")
+    parser.add_argument("--save-baseline", metavar="ARCHIVO", help="Guarda el perfil como línea base")
+    parser.add_argument("--baseline", metavar="ARCHIVO", help="Compara con una línea base guardada")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="Empeoramiento relativo que cuenta como regresión (0.25 = 25 %%)")
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(render_page(args.child, args.user), ensure_ascii=False, default=str))
+        return
+
+    # El registro se importa aquí y no arriba: en el proceso hijo importaría chhcore,
+    # boto3 y langchain_core antes del render y no contarían en el perfil
+    from chhcore.registry import AUTHORS
+
+    pages = args.page or [LOGIN_PAGE] + (list(AUTHORS) if args.user else [])
+    unknown = set(pages) - {LOGIN_PAGE} - set(AUTHORS)
+    if unknown:
+        parser.error(f"páginas desconocidas: {', '.join(sorted(unknown))}")
+    if not args.user and set(pages) - {LOGIN_PAGE}:
+        parser.error("las páginas de autor requieren --user")
+
+    with users_config(args.user):
+        profile = {
+            page: profile_page(page, ENTRYPOINT, args.runs) if page == LOGIN_PAGE
+            else profile_page(page, AUTHORS[page].page, args.runs, args.user)
+            for page in pages
+        }
+    print_profile(profile, args.top)
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as file:
+            json.dump(profile, file, ensure_ascii=False, indent=2)
+    if args.save_baseline:
+        with open(args.save_baseline, "w", encoding="utf-8") as file:
+            json.dump({page: {metric: summary[metric] for metric in CHECKED_METRICS + ("rerun_ms",)}
+                       for page, summary in profile.items()}, file, indent=2)
+
+    failed = any(summary["errors"] for summary in profile.values())
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as file:
+            found = regressions(profile, json.load(file), args.threshold)
+        for regression in found:
+            print(f"REGRESIÓN {regression}")
+        if not found:
+            print(f"sin regresiones respecto a {args.baseline} (umbral {100 * args.threshold:.0f}%)")
+        failed = failed or bool(found)
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
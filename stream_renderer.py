@@ -0,0 +1,141 @@
+# ------------------------------------------------------
+# Render incremental de la respuesta mientras llega por stream
+# ------------------------------------------------------
+# El bucle hacía placeholder.markdown(full_response) en cada chunk: Streamlit
+# reenviaba al navegador la respuesta completa por cada token, O(n²) bytes por
+# el websocket en una respuesta larga. StreamingMarkdown la reemplaza con la
+# misma llamada markdown(texto) y:
+#
+#   - agrupa los chunks: solo vuelve a dibujar cada RENDER_INTERVAL segundos o
+#     cuando se acumulan RENDER_MIN_CHARS caracteres nuevos;
+#   - envía deltas por bloque: los bloques terminados (separados por una línea
+#     en blanco, fuera de bloques de código y de listas) quedan fijos en su
+#     propio elemento y solo se reenvía el bloque en curso. Una lista cuyos items
+#     van separados por líneas en blanco se reenvía entera hasta que termina:
+#     partida en varios elementos, Markdown la dibujaría como listas sueltas.
+#
+# report() compara los bytes de markdown enviados con los que habría enviado el
+# render completo por chunk; st.session_state['render'] guarda el de la última
+# respuesta y metrics.snapshot("render") el acumulado del proceso.
+
+import os
+import re
+import time
+
+from metrics import counters
+
+
+RENDER_INTERVAL = float(os.environ.get("CHH_RENDER_INTERVAL", "0.075"))
+RENDER_MIN_CHARS = int(os.environ.get("CHH_RENDER_MIN_CHARS", "400"))
+
+# Item de lista: "- ", "* ", "+ ", "1. " o "1) "
+_LIST_ITEM_RE = re.compile(r"\s*([-*+]|\d+[.)])(\s|$)")
+
+_metrics = counters("render", "answers", "chunks", "renders", "bytes_sent", "bytes_full")
+
+
+def _split_point(text: str) -> int:
+    """
+    Fin del último bloque terminado de text (0 si no hay). Se corta en una línea
+    en blanco fuera de bloques de código, y solo si la línea que la sigue ya está
+    completa y no continúa el bloque: ni indentada ni, tras un item de lista,
+    otro item (una lista con líneas en blanco entre items es una sola lista).
+    """
+    end = 0
+    position = 0
+    fenced = False
+    in_list = False       # el bloque en curso tiene items de lista
+    candidate = 0         # fin de la última línea en blanco, aún sin decidir
+    for line in text.splitlines(keepends=True):
+        if candidate and line.strip():
+            if not line.endswith("\n"):
+                break
+            if not line[0].isspace() and not (in_list and _LIST_ITEM_RE.match(line)):
+                end = candidate
+                in_list = False
+            candidate = 0
+        position += len(line)
+        if line.lstrip().startswith("```"):
+            fenced = not fenced
+        elif not fenced and not line.strip():
+            candidate = position
+        elif not fenced and _LIST_ITEM_RE.match(line):
+            in_list = True
+    return end
+
+
+class StreamingMarkdown:
+    """Reemplazo de st.empty().markdown() para texto que crece por stream."""
+
+    def __init__(self, container, interval: float = RENDER_INTERVAL, min_chars: int = RENDER_MIN_CHARS):
+        self._container = container
+        self._interval = interval
+        self._min_chars = min_chars
+        self._blocks = []
+        self._tail = container.empty()
+        self._settled = 0          # caracteres ya fijos en bloques anteriores
+        self._text = ""
+        self._rendered = 0         # largo del texto en el último render
+        self._last_render = 0.0
+        self.chunks = 0
+        self.renders = 0
+        self.bytes_sent = 0
+        self.bytes_full = 0
+
+    def markdown(self, text: str):
+        """Nuevo texto completo de la respuesta; se dibuja si toca según el intervalo o el tamaño."""
+        self.chunks += 1
+        self.bytes_full += len(text.encode("utf-8"))
+        if not text.startswith(self._text[:self._settled]):
+            self._reset()
+        self._text = text
+        if (time.perf_counter() - self._last_render >= self._interval
+                or len(text) - self._rendered >= self._min_chars):
+            self._render()
+
+    def close(self) -> dict:
+        """Dibuja lo pendiente, registra las métricas y devuelve el reporte."""
+        if self._rendered != len(self._text) or not self.renders:
+            self._render()
+        report = self.report()
+        _metrics.add(answers=1, **{key: report[key] for key in ("chunks", "renders", "bytes_sent", "bytes_full")})
+        return report
+
+    def report(self) -> dict:
+        return {
+            "chunks": self.chunks,
+            "renders": self.renders,
+            "bytes_sent": self.bytes_sent,
+            "bytes_full": self.bytes_full,
+            "ratio": round(self.bytes_sent / self.bytes_full, 3) if self.bytes_full else None,
+        }
+
+    def _render(self):
+        pending = self._text[self._settled:]
+        split = _split_point(pending)
+        if split:
+            # El párrafo terminado queda fijo; el resto sigue en un elemento nuevo
+            self._send(self._tail, pending[:split])
+            self._blocks.append(self._tail)
+            self._tail = self._container.empty()
+            self._settled += split
+            pending = pending[split:]
+        self._send(self._tail, pending)
+        self._rendered = len(self._text)
+        self._last_render = time.perf_counter()
+
+    def _send(self, element, text: str):
+        element.markdown(text)
+        self.renders += 1
+        self.bytes_sent += len(text.encode("utf-8"))
+
+    def _reset(self):
+        # El texto no continúa al anterior: se vuelve a dibujar desde cero
+        for block in self._blocks:
+            block.empty()
+        self._tail.empty()
+        self._blocks = []
+        self._tail = self._container.empty()
+        self._settled = 0
+        self._rendered = 0
+
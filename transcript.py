@@ -0,0 +1,84 @@
+# ------------------------------------------------------
+# Transcript del chat paginado
+# ------------------------------------------------------
+# En cada rerun las páginas recorrían todo st.session_state.messages y dibujaban
+# cada mensaje con su expander de hasta 20 referencias. Con cientos de turnos
+# cada clic tardaba en dibujarse. render_transcript dibuja solo los últimos
+# TRANSCRIPT_PAGE_TURNS turnos; el botón "Cargar mensajes anteriores" agrega otra
+# página de turnos hacia atrás. Las referencias de cada respuesta se construyen
+# solo cuando el usuario abre su expander; las guardadas como referencias a la
+# tabla de fragmentos se resuelven en ese momento (ver chunk_store.py). Abrir un
+# expander vuelve a ejecutar el script; si había una respuesta en curso, el
+# rerun la sigue mostrando desde lo ya generado (chhcore.chat.stream_answer).
+
+import os
+
+from chunk_store import get_chunk_store
+from presigned_urls import presigned_urls_for
+
+
+TRANSCRIPT_PAGE_TURNS = int(os.environ.get("CHH_TRANSCRIPT_TURNS", "10"))
+
+
+def _shown_key(key: str) -> str:
+    return f"transcript_shown_{key}"
+
+
+def first_visible(state, key: str, total: int, page_turns: int = TRANSCRIPT_PAGE_TURNS) -> int:
+    """Índice del primer mensaje a dibujar: los últimos page_turns turnos (o más si se cargaron)."""
+    shown = state.get(_shown_key(key), page_turns * 2)
+    return max(total - shown, 0)
+
+
+def load_earlier(state, key: str, page_turns: int = TRANSCRIPT_PAGE_TURNS):
+    state[_shown_key(key)] = state.get(_shown_key(key), page_turns * 2) + page_turns * 2
+
+
+def lazy_expander(st, label: str, key: str):
+    """
+    Expander que avisa si está abierto (.open) para no construir su contenido
+    cerrado. En versiones de Streamlit sin on_change se dibuja siempre.
+    """
+    try:
+        expander = st.expander(label, key=key, on_change="rerun")
+    except TypeError:
+        return st.expander(label), True
+    return expander, bool(expander.open)
+
+
+def render_citations(st, citations):
+    # Las fuentes se firman al abrir el expander, todas las de la respuesta de una vez
+    urls = presigned_urls_for(citation["metadata"].get("uri") for citation in citations)
+    for citation in citations:
+        # Mostrar cada referencia con su contenido y fuente
+        source = citation["metadata"]["source"]
+        url = urls.get(citation["metadata"].get("uri"))
+        st.write(f" **Contenido:** {citation['page_content']} ")
+        st.write(f" **Fuente:** [{source}]({url})" if url else f" **Fuente:** {source}")
+        st.write("--------------")
+
+
+def render_transcript(st, messages: list, key: str, page_turns: int = TRANSCRIPT_PAGE_TURNS):
+    """Dibuja los mensajes del chat de la página key (st es el alias de streamlit de la página)."""
+    start = first_visible(st.session_state, key, len(messages), page_turns)
+    if start:
+        st.button(
+            f"Cargar mensajes anteriores ({start} ocultos)",
+            key=f"{key}_load_earlier",
+            on_click=load_earlier,
+            args=(st.session_state, key, page_turns),
+        )
+
+    for index in range(start, len(messages)):
+        message = messages[index]
+        with st.chat_message(message["role"]):
+            st.write(message["content"])
+
+            # Verificar si hay referencias y agregar un expander si existen
+            if message.get("citations"):
+                expander, is_open = lazy_expander(
+                    st, "Mostrar referencias >", f"{key}_refs_{message.get('id') or index}"
+                )
+                if is_open:
+                    with expander:
+                        render_citations(st, get_chunk_store().resolve(message["citations"]))
@@ -0,0 +1,90 @@
+# ------------------------------------------------------
+# Latencia de cada pregunta por etapa
+# ------------------------------------------------------
+# El contexto recuperado sale de la cadena en el primer chunk, antes del primer
+# token de la respuesta (el prompt lo necesita completo), y las páginas muestran
+# las referencias en ese momento mientras la respuesta sigue llegando. TurnTimer
+# mide por separado lo que antes se veía como una sola espera:
+#
+#   - retrieval_ms: envío de la pregunta -> llega el contexto (retriever, dedup, rerank)
+#   - ttft_ms: envío -> primer token de la respuesta
+#   - generation_ms: llega el contexto -> primer token (prompt + modelo)
+#   - total_ms: envío -> fin de la respuesta
+#
+# El reporte de la última pregunta queda en st.session_state['latency'];
+# latency_stats() resume p50/p95 de las últimas preguntas del proceso (métrica
+# "latency" de metrics.snapshot()).
+
+import logging
+import threading
+import time
+from collections import deque
+
+from metrics import register_gauge
+
+
+# Preguntas recientes que se usan para los percentiles
+LATENCY_WINDOW = 500
+
+logger = logging.getLogger(__name__)
+
+_lock = threading.Lock()
+_recent = deque(maxlen=LATENCY_WINDOW)
+
+
+class TurnTimer:
+    """Marca los momentos de una pregunta; solo cuenta la primera vez de cada marca."""
+
+    def __init__(self, source: str = "chain", start: float = None):
+        self.source = source
+        self.start = time.perf_counter() if start is None else start
+        self.marks = {}
+
+    def mark(self, name: str, at: float = None):
+        """Marca name ahora o en el instante at (time.perf_counter(), p. ej. la llegada de un chunk)."""
+        if name not in self.marks:
+            self.marks[name] = ((time.perf_counter() if at is None else at) - self.start) * 1000
+
+    def report(self) -> dict:
+        self.mark("done")
+        context = self.marks.get("context")
+        first_token = self.marks.get("first_token")
+        report = {
+            "source": self.source,
+            "retrieval_ms": _round(context),
+            "ttft_ms": _round(first_token),
+            "generation_ms": _round(first_token - context) if context is not None and first_token is not None else None,
+            "total_ms": _round(self.marks["done"]),
+        }
+        _record(report)
+        return report
+
+
+def _round(value):
+    return None if value is None else round(value, 1)
+
+
+def _record(report):
+    with _lock:
+        _recent.append(report)
+    logger.info("Latencia (%(source)s): contexto %(retrieval_ms)s ms, primer token %(ttft_ms)s ms, "
+                "total %(total_ms)s ms", report)
+
+
+def _percentile(values, p):
+    values = sorted(values)
+    return values[min(int(len(values) * p), len(values) - 1)] if values else None
+
+
+def latency_stats(source: str = None) -> dict:
+    """p50/p95 de cada etapa sobre las últimas LATENCY_WINDOW preguntas (opcionalmente de un origen)."""
+    with _lock:
+        reports = [r for r in _recent if source is None or r["source"] == source]
+    stats = {"requests": len(reports)}
+    for stage in ("retrieval_ms", "ttft_ms", "generation_ms", "total_ms"):
+        values = [r[stage] for r in reports if r[stage] is not None]
+        stats[stage] = {"p50": _percentile(values, 0.5), "p95": _percentile(values, 0.95)}
+    return stats
+
+
+register_gauge("latency", latency_stats)
@@ -0,0 +1,75 @@
+# ------------------------------------------------------
+# Job offline: precalcula las respuestas de las preguntas sugeridas
+# ------------------------------------------------------
+# Toma de cada autor del registro (chhcore/authors.yaml) el system prompt, el
+# modelo, la KB y las sugerencias, corre retrieval + generación para cada pregunta con
+# historial vacío y guarda el resultado en answer_cache/<KB>.json (ver
+# answer_cache.py). Las preguntas que ya están en un archivo de la misma
+# versión no se recalculan, salvo con --force.
+#
+#   python warm_answer_cache.py                  # todas las páginas
+#   python warm_answer_cache.py --page hayek --force
+#   python warm_answer_cache.py --dry-run
+
+import argparse
+import logging
+
+from langchain_core.output_parsers import StrOutputParser
+
+from answer_cache import load_answer_cache, normalize_question, save_answer_cache, serialize_documents
+from aws_resources import get_chat_model
+from chhcore import AUTHORS, AuthorConfig, answers_version, get_author_retriever
+from prompt_cache import create_cached_prompt_template
+from dedup import deduplicator
+from rerank import reranker
+
+
+logger = logging.getLogger("warm_answer_cache")
+
+
+def warm_page(author: AuthorConfig, force: bool = False, dry_run: bool = False):
+    knowledge_base_id = author.knowledge_base_id
+    version = answers_version(author)
+
+    current = load_answer_cache(knowledge_base_id)
+    answers = dict(current.get("answers", {})) if current.get("version") == version and not force else {}
+    pending = [q for q in author.questions if normalize_question(q) not in answers]
+    logger.info("%s (%s, versión %s): %d preguntas, %d por calcular",
+                author.key, knowledge_base_id, version, len(author.questions), len(pending))
+    if dry_run or not pending:
+        return
+
+    # Misma cadena que la página en el primer turno: historial vacío y sin resumen
+    retriever = get_author_retriever(author, cached=False)
+    compact = deduplicator() | reranker(author.rerank_settings)
+    prompt = create_cached_prompt_template(author.system_prompt, author.history_key)
+    generate = prompt | get_chat_model(author.model_id, author.model_kwargs) | StrOutputParser()
+
+    for i, question in enumerate(pending, 1):
+        inputs = compact.invoke({"context": retriever.invoke(question), "question": question, author.history_key: []})
+        documents = inputs["context"]
+        answer = generate.invoke(inputs)
+        answers[normalize_question(question)] = {
+            "question": question,
+            "answer": answer,
+            "context": serialize_documents(documents),
+        }
+        logger.info("  [%d/%d] %s", i, len(pending), question)
+        # Se guarda después de cada respuesta para poder retomar si el job se interrumpe
+        save_answer_cache(knowledge_base_id, version, answers, model_id=author.model_id, page=author.page)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Precalcula las respuestas de las preguntas sugeridas")
+    parser.add_argument("--page", action="append", choices=sorted(AUTHORS), help="Página a calcular (repetible)")
+    parser.add_argument("--force", action="store_true", help="Recalcula aunque la versión no haya cambiado")
+    parser.add_argument("--dry-run", action="store_true", help="Solo muestra cuántas preguntas faltan")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    for name in args.page or AUTHORS:
+        warm_page(AUTHORS[name], force=args.force, dry_run=args.dry_run)
+
+
+if __name__ == "__main__":
+    main()